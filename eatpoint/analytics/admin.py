@@ -0,0 +1,57 @@
+from django.contrib import admin
+
+from .models import AnalyticsExport, ReservationDailyStats, ZoneUtilization
+
+
+@admin.register(ReservationDailyStats)
+class ReservationDailyStatsAdmin(admin.ModelAdmin):
+    """Админка: статистика броней по дням"""
+
+    list_display = (
+        "id",
+        "establishment",
+        "date",
+        "created",
+        "accepted",
+        "visited",
+        "cancelled",
+        "guests",
+    )
+    list_filter = ("date",)
+    raw_id_fields = ("establishment",)
+
+
+@admin.register(AnalyticsExport)
+class AnalyticsExportAdmin(admin.ModelAdmin):
+    """Админка: выгрузки броней"""
+
+    list_display = (
+        "id",
+        "owner",
+        "establishment",
+        "source",
+        "format",
+        "status",
+        "rows",
+        "created_at",
+        "finished_at",
+    )
+    list_filter = ("status", "source", "format")
+    raw_id_fields = ("owner", "establishment")
+
+
+@admin.register(ZoneUtilization)
+class ZoneUtilizationAdmin(admin.ModelAdmin):
+    """Админка: загрузка зон по часам"""
+
+    list_display = (
+        "id",
+        "establishment",
+        "zone",
+        "date",
+        "hour",
+        "seat_minutes",
+        "booked_seat_minutes",
+    )
+    list_filter = ("date",)
+    raw_id_fields = ("establishment", "zone")
@@ -1,6 +1,12 @@
+# fmt: off
 from django.apps import AppConfig
 
 
 class AnalyticsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "analytics"
+
+    def ready(self):
+        """Слушатель сигнала"""
+        import analytics.signals
+# fmt: on
@@ -0,0 +1,93 @@
+from time import time
+
+from django.core.cache import caches
+
+from establishments.models import Establishment
+
+ANALYTICS_CACHE = "analytics"
+HITS_KEY = "analytics:hits"
+MISSES_KEY = "analytics:misses"
+
+
+def analytics_cache():
+    """Кэш ответов аналитики."""
+    return caches[ANALYTICS_CACHE]
+
+
+def version_key(owner_id: int) -> str:
+    """Ключ версии аналитики владельца."""
+    return f"analytics:version:{owner_id}"
+
+
+def owner_version(owner_id: int) -> int:
+    """
+    Текущая версия аналитики владельца.
+
+    Версия входит в ключи ответов, поэтому ее смена делает недоступными
+    все закэшированные ответы владельца. Начальная версия - текущее время,
+    чтобы после вытеснения ключа версии не вернулись старые ответы.
+    """
+    return analytics_cache().get_or_set(
+        version_key(owner_id), int(time() * 1000), None
+    )
+
+
+def count(key: str) -> None:
+    """Увеличивает счетчик попаданий или промахов."""
+    cache = analytics_cache()
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+def cached_analytics(owner_id: int, parts: tuple, build) -> dict:
+    """
+    Ответ аналитики из кэша или построенный build() и сохраненный в кэш.
+
+    parts - заведение, счетчик и период, которые определяют ответ.
+    """
+    cache = analytics_cache()
+    key = ":".join(
+        ["analytics", str(owner_id), str(owner_version(owner_id))]
+        + [str(part) for part in parts]
+    )
+    data = cache.get(key)
+    if data is not None:
+        count(HITS_KEY)
+        return data
+    count(MISSES_KEY)
+    data = build()
+    cache.set(key, data)
+    return data
+
+
+def invalidate_owners(owner_ids) -> None:
+    """Сбрасывает закэшированную аналитику владельцев."""
+    cache = analytics_cache()
+    for owner_id in set(owner_ids):
+        try:
+            cache.incr(version_key(owner_id))
+        except ValueError:
+            pass
+
+
+def invalidate_establishments(establishment_ids) -> None:
+    """Сбрасывает закэшированную аналитику владельцев заведений."""
+    invalidate_owners(
+        Establishment.objects.filter(
+            id__in=set(establishment_ids)
+        ).values_list("owner_id", flat=True)
+    )
+
+
+def cache_stats() -> dict:
+    """Количество попаданий и промахов кэша аналитики."""
+    values = analytics_cache().get_many([HITS_KEY, MISSES_KEY])
+    hits, misses = values.get(HITS_KEY, 0), values.get(MISSES_KEY, 0)
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / (hits + misses), 3) if hits + misses else 0,
+    }
@@ -0,0 +1,187 @@
+import csv
+import os
+import secrets
+from datetime import datetime, timedelta
+from importlib.util import find_spec
+
+from cachalot.api import cachalot_disabled
+from django.db.models import QuerySet
+
+from analytics.models import AnalyticsExport
+from core.constants import (
+    EXPORT_CHUNK_SIZE,
+    EXPORT_DONE,
+    EXPORT_FAILED,
+    EXPORT_HISTORY,
+    EXPORT_PARQUET,
+    EXPORT_RESERVATIONS,
+    EXPORT_RUNNING,
+    EXPORT_RUNNING_TIMEOUT,
+)
+from core.services import chunked, day_range
+from reservation.models import Reservation, ReservationHistory
+
+# Колонки выгрузки каждого источника и их типы в Parquet
+EXPORT_COLUMNS = {
+    EXPORT_HISTORY: (
+        ("id", "int"),
+        ("reservation_id", "int"),
+        ("establishment_id", "int"),
+        ("establishment_name", "str"),
+        ("reservation_date", "datetime"),
+        ("date_reservation", "date"),
+        ("start_time_reservation", "str"),
+        ("is_accepted", "bool"),
+        ("is_visited", "bool"),
+        ("first_name", "str"),
+        ("last_name", "str"),
+        ("email", "str"),
+        ("telephone", "str"),
+        ("comment", "str"),
+    ),
+    EXPORT_RESERVATIONS: (
+        ("id", "int"),
+        ("establishment_id", "int"),
+        ("reservation_date", "datetime"),
+        ("date_reservation", "date"),
+        ("start_time_reservation", "str"),
+        ("is_accepted", "bool"),
+        ("is_visited", "bool"),
+        ("is_deleted", "bool"),
+        ("first_name", "str"),
+        ("last_name", "str"),
+        ("email", "str"),
+        ("telephone", "str"),
+        ("comment", "str"),
+    ),
+}
+
+
+def parquet_available() -> bool:
+    """Установлен ли pyarrow, нужный для выгрузки в Parquet."""
+    return find_spec("pyarrow") is not None
+
+
+def export_queryset(export: AnalyticsExport) -> QuerySet:
+    """Брони или архивные записи владельца, попадающие в выгрузку."""
+    if export.source == EXPORT_HISTORY:
+        rows = ReservationHistory.objects.filter(owner_id=export.owner_id)
+    else:
+        rows = Reservation.objects.filter(
+            establishment__owner_id=export.owner_id
+        )
+    if export.establishment_id:
+        rows = rows.filter(establishment_id=export.establishment_id)
+    if export.start_date:
+        rows = rows.filter(
+            reservation_date__gte=day_range(export.start_date)[0]
+        )
+    if export.end_date:
+        rows = rows.filter(reservation_date__lt=day_range(export.end_date)[1])
+    return rows.order_by("reservation_date", "id")
+
+
+def export_rows(export: AnalyticsExport):
+    """Строки выгрузки, читаемые из базы порциями."""
+    columns = [name for name, _ in EXPORT_COLUMNS[export.source]]
+    return (
+        export_queryset(export)
+        .values_list(*columns)
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+
+
+def write_csv(path: str, columns, rows) -> int:
+    """Построчная запись выгрузки в CSV."""
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow([name for name, _ in columns])
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+def write_parquet(path: str, columns, rows) -> int:
+    """
+    Запись выгрузки в Parquet: каждая порция строк - отдельная
+    группа строк файла, в памяти держится только одна порция.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    types = {
+        "int": pa.int64(),
+        "str": pa.string(),
+        "bool": pa.bool_(),
+        "date": pa.date32(),
+        "datetime": pa.timestamp("us"),
+    }
+    schema = pa.schema([(name, types[kind]) for name, kind in columns])
+    count = 0
+    with pq.ParquetWriter(path, schema) as writer:
+        for chunk in chunked(rows, EXPORT_CHUNK_SIZE):
+            data = {
+                name: [
+                    str(row[index])
+                    if kind == "str" and row[index] is not None
+                    else row[index]
+                    for row in chunk
+                ]
+                for index, (name, kind) in enumerate(columns)
+            }
+            writer.write_table(pa.Table.from_pydict(data, schema=schema))
+            count += len(chunk)
+    return count
+
+
+def run_export(export: AnalyticsExport) -> AnalyticsExport:
+    """
+    Выполнение выгрузки: строки потоком пишутся в файл хранилища
+    выгрузок, в выгрузке сохраняются файл, число строк и статус.
+    Имя файла случайное и не связано с id выгрузки.
+    """
+    export.status = EXPORT_RUNNING
+    export.started_at = datetime.now()
+    export.save(update_fields=["status", "started_at"])
+    storage = export.file.storage
+    name = f"{secrets.token_urlsafe(24)}.{export.format}"
+    writer = write_parquet if export.format == EXPORT_PARQUET else write_csv
+    path = None
+    try:
+        path = storage.path(name)
+        os.makedirs(storage.location, exist_ok=True)
+        # cachalot сохраняет весь результат запроса, при потоковом
+        # чтении кэш отключается, чтобы память не росла с числом строк
+        with cachalot_disabled():
+            export.rows = writer(
+                path, EXPORT_COLUMNS[export.source], export_rows(export)
+            )
+    except Exception as error:
+        if path is not None and os.path.exists(path):
+            os.remove(path)
+        export.status = EXPORT_FAILED
+        export.error = repr(error)
+    else:
+        export.file.name = name
+        export.status = EXPORT_DONE
+    export.finished_at = datetime.now()
+    export.save()
+    return export
+
+
+def expire_running_exports() -> int:
+    """
+    Помечает ошибкой выгрузки, выполняющиеся дольше
+    EXPORT_RUNNING_TIMEOUT минут: их воркер прервался.
+    """
+    now = datetime.now()
+    return AnalyticsExport.objects.filter(
+        status=EXPORT_RUNNING,
+        started_at__lt=now - timedelta(minutes=EXPORT_RUNNING_TIMEOUT),
+    ).update(
+        status=EXPORT_FAILED,
+        error="Выгрузка прервана",
+        finished_at=now,
+    )
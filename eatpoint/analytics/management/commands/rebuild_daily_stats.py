@@ -0,0 +1,34 @@
+from datetime import date, datetime, timedelta
+
+from django.core.management.base import BaseCommand
+
+from analytics.services import reconcile_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Пересчитывает сводную статистику броней по дням "
+        "(по умолчанию за все время)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            help="Пересчитать только последние дни",
+        )
+
+    def handle(self, *args, **options):
+        today = datetime.now().date()
+        start_date = (
+            today - timedelta(days=options["days"])
+            if options["days"] is not None
+            else date.min
+        )
+        report = reconcile_stats(start_date, today)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Статистика пересчитана: дней {report['days']}, "
+                f"исправлено {report['fixed']}"
+            )
+        )
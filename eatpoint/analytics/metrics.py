@@ -0,0 +1,154 @@
+import numpy as np
+
+from core.constants import COHORT_MONTHS, LEAD_TIME_BINS
+
+
+def select(snapshot: dict, establishment_id: int | None = None) -> dict:
+    """Снимок, ограниченный одним заведением (если оно задано)."""
+    if establishment_id is None:
+        return snapshot
+    mask = snapshot["establishment"] == establishment_id
+    return {
+        name: values[mask] if values.ndim else values
+        for name, values in snapshot.items()
+    }
+
+
+def rate(part, whole):
+    """Доля part от whole, 0 при пустом whole."""
+    return np.round(
+        np.divide(
+            part,
+            whole,
+            out=np.zeros(np.shape(whole), dtype=float),
+            where=np.asarray(whole) > 0,
+        ),
+        3,
+    )
+
+
+def funnel_row(created, accepted, visited, cancelled, no_show) -> dict:
+    """Шаги воронки и конверсии между ними."""
+    return {
+        "created": int(created),
+        "accepted": int(accepted),
+        "visited": int(visited),
+        "cancelled": int(cancelled),
+        "no_show": int(no_show),
+        "acceptance_rate": float(rate(accepted, created)),
+        "visit_rate": float(rate(visited, accepted)),
+        "no_show_rate": float(rate(no_show, accepted)),
+    }
+
+
+def funnel(snapshot: dict) -> dict:
+    """
+    Воронка создана -> подтверждена -> посещена и неявки по каждому
+    заведению и в целом. Неявка - подтвержденная, не отмененная
+    и не посещенная бронь, время которой уже прошло.
+    """
+    establishments, index = np.unique(
+        snapshot["establishment"], return_inverse=True
+    )
+    no_show = (
+        snapshot["accepted"]
+        & ~snapshot["visited"]
+        & ~snapshot["cancelled"]
+        & (snapshot["starts"] < snapshot["snapshot_at"])
+    )
+    steps = [
+        np.ones(len(index), dtype=bool),
+        snapshot["accepted"],
+        snapshot["visited"],
+        snapshot["cancelled"],
+        no_show,
+    ]
+    counts = [
+        np.bincount(index, weights=step, minlength=len(establishments))
+        for step in steps
+    ]
+    return {
+        "total": funnel_row(*(step.sum() for step in steps)),
+        "establishments": [
+            {"establishment": int(establishment_id), **funnel_row(*row)}
+            for establishment_id, *row in zip(establishments, *counts)
+        ],
+    }
+
+
+def lead_time(snapshot: dict) -> dict:
+    """Распределение времени от создания брони до ее начала, в часах."""
+    known = ~np.isnat(snapshot["created"]) & ~np.isnat(snapshot["starts"])
+    hours = np.clip(
+        (snapshot["starts"][known] - snapshot["created"][known])
+        / np.timedelta64(1, "h"),
+        0,
+        None,
+    )
+    edges = np.array(LEAD_TIME_BINS + (np.inf,))
+    counts, _ = np.histogram(hours, bins=edges)
+    return {
+        "bookings": int(hours.size),
+        "median_hours": round(float(np.median(hours)), 1)
+        if hours.size
+        else None,
+        "p90_hours": round(float(np.percentile(hours, 90)), 1)
+        if hours.size
+        else None,
+        "bins": [
+            {
+                "from_hours": int(start),
+                "to_hours": None if np.isinf(end) else int(end),
+                "count": int(count),
+            }
+            for start, end, count in zip(edges[:-1], edges[1:], counts)
+        ],
+    }
+
+
+def cohorts(snapshot: dict, months: int = COHORT_MONTHS) -> dict:
+    """
+    Когорты гостей по месяцу первого визита: сколько гостей когорты
+    вернулось через 0..months месяцев, и доля гостей с повторными визитами.
+    """
+    visited = (
+        snapshot["visited"]
+        & (snapshot["guest"] >= 0)
+        & ~np.isnat(snapshot["starts"])
+    )
+    guest = snapshot["guest"][visited]
+    if not guest.size:
+        return {"guests": 0, "repeat_guests_rate": 0.0, "cohorts": []}
+    month = (
+        snapshot["starts"][visited].astype("datetime64[M]").astype(np.int64)
+    )
+    first = np.full(guest.max() + 1, np.iinfo(np.int64).max)
+    np.minimum.at(first, guest, month)
+    offset = month - first[guest]
+    in_range = offset <= months
+
+    # Каждый гость учитывается в месяце не больше одного раза
+    pairs = np.unique(guest[in_range] * (months + 1) + offset[in_range])
+    pair_guest, pair_offset = np.divmod(pairs, months + 1)
+    cohort = first[pair_guest]
+    oldest = cohort.min()
+    retention = np.bincount(
+        (cohort - oldest) * (months + 1) + pair_offset,
+        minlength=(cohort.max() - oldest + 1) * (months + 1),
+    ).reshape(-1, months + 1)
+
+    visits = np.bincount(guest)
+    guests = int((visits > 0).sum())
+    return {
+        "guests": guests,
+        "repeat_guests_rate": float(rate((visits > 1).sum(), guests)),
+        "cohorts": [
+            {
+                "cohort": str(np.datetime64(int(oldest + shift), "M")),
+                "guests": int(row[0]),
+                "retention": [int(count) for count in row],
+            }
+            for shift, row in enumerate(retention)
+            if row[0]
+        ],
+    }
@@ -0,0 +1,78 @@
+# Generated by Django 4.2.5 on 2026-10-18 16:50
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = [
+        ("establishments", "0009_table"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ReservationDailyStats",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField(verbose_name="Дата")),
+                (
+                    "created",
+                    models.IntegerField(
+                        default=0, verbose_name="Создано броней"
+                    ),
+                ),
+                (
+                    "accepted",
+                    models.IntegerField(
+                        default=0, verbose_name="Подтверждено броней"
+                    ),
+                ),
+                (
+                    "visited",
+                    models.IntegerField(
+                        default=0, verbose_name="Посещено броней"
+                    ),
+                ),
+                (
+                    "cancelled",
+                    models.IntegerField(
+                        default=0, verbose_name="Отменено броней"
+                    ),
+                ),
+                (
+                    "guests",
+                    models.IntegerField(default=0, verbose_name="Гостей"),
+                ),
+                (
+                    "establishment",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_stats",
+                        to="establishments.establishment",
+                        verbose_name="Заведение",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Статистика броней за день",
+                "verbose_name_plural": "Статистика броней по дням",
+                "ordering": ["-date"],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="reservationdailystats",
+            constraint=models.UniqueConstraint(
+                fields=("establishment", "date"), name="unique_daily_stats"
+            ),
+        ),
+    ]
@@ -0,0 +1,137 @@
+# Generated by Django 4.2.5 on 2026-10-18 16:54
+
+import analytics.models
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("establishments", "0009_table"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("analytics", "0001_reservationdailystats"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AnalyticsExport",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "source",
+                    models.CharField(
+                        choices=[
+                            ("history", "архив броней"),
+                            ("reservations", "брони"),
+                        ],
+                        default="history",
+                        max_length=20,
+                        verbose_name="Источник",
+                    ),
+                ),
+                (
+                    "format",
+                    models.CharField(
+                        choices=[("csv", "CSV"), ("parquet", "Parquet")],
+                        default="csv",
+                        max_length=10,
+                        verbose_name="Формат",
+                    ),
+                ),
+                (
+                    "start_date",
+                    models.DateField(
+                        blank=True, null=True, verbose_name="Начало периода"
+                    ),
+                ),
+                (
+                    "end_date",
+                    models.DateField(
+                        blank=True, null=True, verbose_name="Конец периода"
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "ожидает"),
+                            ("running", "выполняется"),
+                            ("done", "готова"),
+                            ("failed", "ошибка"),
+                        ],
+                        default="pending",
+                        max_length=10,
+                        verbose_name="Статус",
+                    ),
+                ),
+                (
+                    "file",
+                    models.FileField(
+                        blank=True,
+                        storage=analytics.models.export_storage,
+                        upload_to="",
+                        verbose_name="Файл",
+                    ),
+                ),
+                (
+                    "rows",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Строк выгружено"
+                    ),
+                ),
+                ("error", models.TextField(blank=True, verbose_name="Ошибка")),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="Создана"
+                    ),
+                ),
+                (
+                    "started_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Начата"
+                    ),
+                ),
+                (
+                    "finished_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Завершена"
+                    ),
+                ),
+                (
+                    "establishment",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="analytics_exports",
+                        to="establishments.establishment",
+                        verbose_name="Заведение",
+                    ),
+                ),
+                (
+                    "owner",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="analytics_exports",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Владелец",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Выгрузка броней",
+                "verbose_name_plural": "Выгрузки броней",
+                "ordering": ["-created_at"],
+            },
+        ),
+    ]
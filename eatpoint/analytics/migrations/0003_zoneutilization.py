@@ -0,0 +1,83 @@
+# Generated by Django 4.2.5 on 2026-10-18 17:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("establishments", "0009_table"),
+        ("analytics", "0002_analyticsexport"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ZoneUtilization",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField(verbose_name="Дата")),
+                (
+                    "weekday",
+                    models.PositiveSmallIntegerField(
+                        verbose_name="День недели (0 - понедельник)"
+                    ),
+                ),
+                ("hour", models.PositiveSmallIntegerField(verbose_name="Час")),
+                (
+                    "seat_minutes",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Места-минуты по расписанию"
+                    ),
+                ),
+                (
+                    "booked_seat_minutes",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Занятые места-минуты"
+                    ),
+                ),
+                (
+                    "establishment",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="zone_utilization",
+                        to="establishments.establishment",
+                        verbose_name="Заведение",
+                    ),
+                ),
+                (
+                    "zone",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="utilization",
+                        to="establishments.zoneestablishment",
+                        verbose_name="Зона заведения",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Загрузка зоны за час",
+                "verbose_name_plural": "Загрузка зон по часам",
+                "ordering": ["-date", "hour"],
+                "indexes": [
+                    models.Index(
+                        fields=["establishment", "date"],
+                        name="utilization_est_date_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="zoneutilization",
+            constraint=models.UniqueConstraint(
+                fields=("zone", "date", "hour"), name="unique_zone_utilization"
+            ),
+        ),
+    ]
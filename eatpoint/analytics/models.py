@@ -0,0 +1,197 @@
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.db import models
+
+from core.choices import EXPORT_FORMATS, EXPORT_SOURCES, EXPORT_STATUS
+from core.constants import EXPORT_CSV, EXPORT_HISTORY, EXPORT_PENDING
+from establishments.models import Establishment, ZoneEstablishment
+from users.models import User
+
+
+class ReservationDailyStats(models.Model):
+    """Сводная статистика броней заведения за день создания брони"""
+
+    establishment = models.ForeignKey(
+        Establishment,
+        on_delete=models.CASCADE,
+        verbose_name="Заведение",
+        related_name="daily_stats",
+    )
+    date = models.DateField(
+        verbose_name="Дата",
+    )
+    created = models.IntegerField(
+        verbose_name="Создано броней",
+        default=0,
+    )
+    accepted = models.IntegerField(
+        verbose_name="Подтверждено броней",
+        default=0,
+    )
+    visited = models.IntegerField(
+        verbose_name="Посещено броней",
+        default=0,
+    )
+    cancelled = models.IntegerField(
+        verbose_name="Отменено броней",
+        default=0,
+    )
+    guests = models.IntegerField(
+        verbose_name="Гостей",
+        default=0,
+    )
+
+    class Meta:
+        verbose_name = "Статистика броней за день"
+        verbose_name_plural = "Статистика броней по дням"
+        ordering = ["-date"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["establishment", "date"],
+                name="unique_daily_stats",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.establishment_id}: {self.date}"
+
+
+class ZoneUtilization(models.Model):
+    """Загрузка зоны заведения за час дня: места-минуты всего и занятые"""
+
+    establishment = models.ForeignKey(
+        Establishment,
+        on_delete=models.CASCADE,
+        verbose_name="Заведение",
+        related_name="zone_utilization",
+    )
+    zone = models.ForeignKey(
+        ZoneEstablishment,
+        on_delete=models.CASCADE,
+        verbose_name="Зона заведения",
+        related_name="utilization",
+    )
+    date = models.DateField(
+        verbose_name="Дата",
+    )
+    weekday = models.PositiveSmallIntegerField(
+        verbose_name="День недели (0 - понедельник)",
+    )
+    hour = models.PositiveSmallIntegerField(
+        verbose_name="Час",
+    )
+    seat_minutes = models.PositiveIntegerField(
+        verbose_name="Места-минуты по расписанию",
+        default=0,
+    )
+    booked_seat_minutes = models.PositiveIntegerField(
+        verbose_name="Занятые места-минуты",
+        default=0,
+    )
+
+    class Meta:
+        verbose_name = "Загрузка зоны за час"
+        verbose_name_plural = "Загрузка зон по часам"
+        ordering = ["-date", "hour"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["zone", "date", "hour"],
+                name="unique_zone_utilization",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["establishment", "date"],
+                name="utilization_est_date_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.zone_id}: {self.date} {self.hour}:00"
+
+
+def export_storage():
+    """Хранилище файлов выгрузок вне MEDIA_ROOT."""
+    return FileSystemStorage(location=settings.ANALYTICS_EXPORT_ROOT)
+
+
+class AnalyticsExport(models.Model):
+    """Выгрузка броней владельца в файл"""
+
+    owner = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        verbose_name="Владелец",
+        related_name="analytics_exports",
+    )
+    establishment = models.ForeignKey(
+        Establishment,
+        on_delete=models.CASCADE,
+        verbose_name="Заведение",
+        related_name="analytics_exports",
+        blank=True,
+        null=True,
+    )
+    source = models.CharField(
+        verbose_name="Источник",
+        max_length=20,
+        choices=EXPORT_SOURCES,
+        default=EXPORT_HISTORY,
+    )
+    format = models.CharField(
+        verbose_name="Формат",
+        max_length=10,
+        choices=EXPORT_FORMATS,
+        default=EXPORT_CSV,
+    )
+    start_date = models.DateField(
+        verbose_name="Начало периода",
+        blank=True,
+        null=True,
+    )
+    end_date = models.DateField(
+        verbose_name="Конец периода",
+        blank=True,
+        null=True,
+    )
+    status = models.CharField(
+        verbose_name="Статус",
+        max_length=10,
+        choices=EXPORT_STATUS,
+        default=EXPORT_PENDING,
+    )
+    file = models.FileField(
+        verbose_name="Файл",
+        storage=export_storage,
+        blank=True,
+    )
+    rows = models.PositiveIntegerField(
+        verbose_name="Строк выгружено",
+        default=0,
+    )
+    error = models.TextField(
+        verbose_name="Ошибка",
+        blank=True,
+    )
+    created_at = models.DateTimeField(
+        verbose_name="Создана",
+        auto_now_add=True,
+    )
+    started_at = models.DateTimeField(
+        verbose_name="Начата",
+        blank=True,
+        null=True,
+    )
+    finished_at = models.DateTimeField(
+        verbose_name="Завершена",
+        blank=True,
+        null=True,
+    )
+
+    class Meta:
+        verbose_name = "Выгрузка броней"
+        verbose_name_plural = "Выгрузки броней"
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.owner_id}: {self.source}.{self.format}"
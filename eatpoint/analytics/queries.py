@@ -0,0 +1,109 @@
+from datetime import date
+
+from django.db.models import Q, QuerySet, Sum
+from django.db.models.functions import Coalesce
+
+from analytics.models import ReservationDailyStats
+from core.services import week_range
+
+
+class AnalyticsQuery:
+    """
+    Построитель аналитики по сводной статистике броней.
+
+    Все скалярные показатели считаются одним aggregate() с условными
+    суммами, ряд по дням - одним запросом с группировкой. Месяцы
+    и годы собираются из ряда по дням.
+    """
+
+    def __init__(
+        self,
+        stats: QuerySet[ReservationDailyStats],
+        counter: str,
+        start_date: date | None = None,
+        end_date: date | None = None,
+    ):
+        if start_date and end_date:
+            stats = stats.filter(date__range=(start_date, end_date))
+        self.stats = stats
+        self.counter = counter
+
+    def total(self, **periods: Q) -> dict:
+        """Сумма счетчика за все время и за каждый из периодов."""
+        return self.stats.aggregate(
+            total=Coalesce(Sum(self.counter), 0),
+            **{
+                name: Coalesce(Sum(self.counter, filter=period), 0)
+                for name, period in periods.items()
+            },
+        )
+
+    def series(self) -> list[tuple[date, int]]:
+        """Ненулевые значения счетчика по дням."""
+        rows = (
+            self.stats.values("date")
+            .annotate(count=Sum(self.counter))
+            .order_by("date")
+            .values_list("date", "count")
+        )
+        return [(day, count) for day, count in rows if count]
+
+    @staticmethod
+    def by_month(series) -> list[dict]:
+        """Суммы ряда по месяцам."""
+        monthly = {}
+        for day, count in series:
+            monthly[day.month] = monthly.get(day.month, 0) + count
+        return [
+            {"month": month, "monthly_count": count}
+            for month, count in sorted(monthly.items())
+        ]
+
+    @staticmethod
+    def by_year(series) -> list[dict]:
+        """Суммы ряда по годам."""
+        yearly = {}
+        for day, count in series:
+            yearly[day.year] = yearly.get(day.year, 0) + count
+        return [
+            {"reservation_date__year": year, "yearly_count": count}
+            for year, count in yearly.items()
+        ]
+
+    @staticmethod
+    def by_day(series) -> list[dict]:
+        """Ряд по дням в формате ответа."""
+        return [
+            {"reservation_date__date": day, "reservation_count": count}
+            for day, count in series
+        ]
+
+    def static(self, today: date) -> dict:
+        """Аналитика за все время, день, календарную неделю, год по месяцам."""
+        week_start, week_end = week_range(today)
+        totals = self.total(
+            daily=Q(date=today),
+            weekly=Q(date__gte=week_start.date(), date__lt=week_end.date()),
+        )
+        series = self.series()
+        this_year = [
+            (day, count) for day, count in series if day.year == today.year
+        ]
+        return {
+            "total_reservation": totals["total"],
+            "daily_reservation": totals["daily"],
+            "weekly_reservation": totals["weekly"],
+            "monthly_reservation": self.by_month(this_year),
+            "yearly_reservation": self.by_year(this_year),
+            "daily_reservations_by_day": self.by_day(series),
+        }
+
+    def dynamic(self) -> dict:
+        """Аналитика за выбранный период по дням, месяцам и годам."""
+        series = self.series()
+        return {
+            "total_reservation": self.total()["total"],
+            "daily_reservations_by_day": self.by_day(series),
+            "monthly_reservations_by_month": self.by_month(series),
+            "yearly_reservation": self.by_year(series),
+        }
@@ -0,0 +1,235 @@
+from datetime import date, datetime, timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Exists, F, OuterRef, Q, Sum
+from django.db.models.functions import TruncDate
+
+from analytics.cache import invalidate_establishments
+from analytics.models import ReservationDailyStats
+from core.services import day_range
+from reservation.models import Reservation, ReservationHistory, Slot
+
+STATS_FIELDS = ("created", "accepted", "visited", "cancelled", "guests")
+
+# Признак брони, учитываемый в каждом счетчике статистики
+STATS_FLAGS = {
+    "accepted": "is_accepted",
+    "visited": "is_visited",
+    "cancelled": "is_deleted",
+}
+
+
+def reservation_flags(reservation) -> dict:
+    """Вклад брони в счетчики подтвержденных, посещенных и отмененных."""
+    return {
+        counter: int(bool(getattr(reservation, flag)))
+        for counter, flag in STATS_FLAGS.items()
+    }
+
+
+def count_guests(slot_ids) -> int:
+    """Количество гостей по слотам: места каждого столика учитываются раз."""
+    return sum(
+        seats
+        for _, seats in Slot.objects.filter(id__in=slot_ids)
+        .values_list("table_id", "seats")
+        .distinct()
+    )
+
+
+def apply_delta(establishment_id: int, day: date, delta: dict) -> None:
+    """
+    Изменяет счетчики статистики заведения за день на delta.
+
+    Счетчики меняются выражением F() в базе, поэтому параллельные
+    изменения не теряются. Строка дня создается при первом изменении.
+    """
+    delta = {counter: value for counter, value in delta.items() if value}
+    if not delta or establishment_id is None or day is None:
+        return
+    transaction.on_commit(
+        lambda: invalidate_establishments([establishment_id])
+    )
+    stats = ReservationDailyStats.objects.filter(
+        establishment_id=establishment_id, date=day
+    )
+    changes = {counter: F(counter) + value for counter, value in delta.items()}
+    if stats.update(**changes):
+        return
+    try:
+        with transaction.atomic():
+            ReservationDailyStats.objects.create(
+                establishment_id=establishment_id, date=day, **delta
+            )
+    except IntegrityError:
+        stats.update(**changes)
+
+
+def track_reservation(reservation, before: dict | None = None) -> None:
+    """
+    Учитывает в статистике создание брони (before не задан)
+    или изменение ее статусов относительно before.
+    """
+    after = reservation_flags(reservation)
+    if before is None:
+        delta = {"created": 1, **after}
+    else:
+        delta = {
+            counter: after[counter] - before[counter] for counter in after
+        }
+    apply_delta(
+        reservation.establishment_id,
+        reservation.reservation_date.date(),
+        delta,
+    )
+
+
+def track_guests(reservation, slot_ids, sign: int = 1) -> None:
+    """Учитывает в статистике гостей добавленных (удаленных) слотов брони."""
+    apply_delta(
+        reservation.establishment_id,
+        reservation.reservation_date.date(),
+        {"guests": sign * count_guests(slot_ids)},
+    )
+
+
+def untrack_reservation(reservation) -> None:
+    """Убирает из статистики удаляемую бронь."""
+    delta = {
+        counter: -value
+        for counter, value in reservation_flags(reservation).items()
+    }
+    delta["created"] = -1
+    delta["guests"] = -count_guests(
+        reservation.slots.values_list("id", flat=True)
+    )
+    apply_delta(
+        reservation.establishment_id,
+        reservation.reservation_date.date(),
+        delta,
+    )
+
+
+def collect_stats(start_date: date, end_date: date) -> dict:
+    """
+    Статистика броней, созданных с start_date по end_date, по данным
+    самих броней: {(id заведения, дата): {счетчик: значение}}.
+
+    Брони, которые уже удалены после переноса в архив, учитываются
+    по архиву на дату создания брони.
+    """
+    stats = {}
+    period = {
+        "reservation_date__gte": day_range(start_date)[0],
+        "reservation_date__lt": day_range(end_date)[1],
+    }
+    reservations = Reservation.objects.filter(
+        establishment__isnull=False, **period
+    )
+    rows = (
+        reservations.annotate(day=TruncDate("reservation_date"))
+        .values("establishment_id", "day")
+        .annotate(
+            created=Count("id"),
+            accepted=Count("id", filter=Q(is_accepted=True)),
+            visited=Count("id", filter=Q(is_visited=True)),
+            cancelled=Count("id", filter=Q(is_deleted=True)),
+        )
+        .order_by()
+    )
+    for row in rows:
+        key = (row.pop("establishment_id"), row.pop("day"))
+        stats[key] = {**row, "guests": 0}
+
+    booked = (
+        Reservation.slots.through.objects.filter(reservation__in=reservations)
+        .values_list(
+            "reservation__establishment_id",
+            "reservation__reservation_date__date",
+            "reservation_id",
+            "slot__table_id",
+            "slot__seats",
+        )
+        .distinct()
+    )
+    for establishment_id, day, _, _, seats in booked:
+        stats[(establishment_id, day)]["guests"] += seats
+
+    archived = (
+        ReservationHistory.objects.filter(
+            establishment__isnull=False, **period
+        )
+        .alias(
+            live=Exists(
+                Reservation.objects.filter(pk=OuterRef("reservation_id"))
+            )
+        )
+        .filter(live=False)
+        .annotate(day=TruncDate("reservation_date"))
+        .values("establishment_id", "day")
+        .annotate(
+            created=Count("id"),
+            accepted=Count("id", filter=Q(is_accepted=True)),
+            visited=Count("id", filter=Q(is_visited=True)),
+            guests=Sum("guests"),
+        )
+        .order_by()
+    )
+    for row in archived:
+        day_stats = stats.setdefault(
+            (row["establishment_id"], row["day"]),
+            dict.fromkeys(STATS_FIELDS, 0),
+        )
+        for counter in ("created", "accepted", "visited", "guests"):
+            day_stats[counter] += row[counter]
+    return stats
+
+
+def reconcile_stats(start_date: date, end_date: date) -> dict:
+    """
+    Сверка статистики за дни с start_date по end_date с бронями.
+
+    Пересчитанные значения сравниваются с сохраненными, перезаписываются
+    только разошедшиеся дни. Возвращает количество проверенных
+    и исправленных дней.
+    """
+    fresh = collect_stats(start_date, end_date)
+    with transaction.atomic():
+        stored = {
+            (row.pop("establishment_id"), row.pop("date")): row
+            for row in ReservationDailyStats.objects.select_for_update()
+            .filter(date__range=(start_date, end_date))
+            .values("id", "establishment_id", "date", *STATS_FIELDS)
+        }
+        stale = [
+            key
+            for key in stored.keys() | fresh.keys()
+            if key not in stored
+            or {counter: stored[key][counter] for counter in STATS_FIELDS}
+            != fresh.get(key, dict.fromkeys(STATS_FIELDS, 0))
+        ]
+        ReservationDailyStats.objects.filter(
+            id__in=[stored[key]["id"] for key in stale if key in stored]
+        ).delete()
+        ReservationDailyStats.objects.bulk_create(
+            [
+                ReservationDailyStats(
+                    establishment_id=establishment_id,
+                    date=day,
+                    **fresh[(establishment_id, day)],
+                )
+                for establishment_id, day in stale
+                if (establishment_id, day) in fresh
+            ]
+        )
+    if stale:
+        invalidate_establishments(
+            establishment_id for establishment_id, _ in stale
+        )
+    return {"days": len(stored.keys() | fresh.keys()), "fixed": len(stale)}
+
+
+def reconcile_recent(days: int, today: date | None = None) -> dict:
+    """Сверка статистики за последние days дней."""
+    today = today or datetime.now().date()
+    return reconcile_stats(today - timedelta(days=days), today)
@@ -0,0 +1,44 @@
+from django.db.models.signals import m2m_changed, post_save, pre_save
+from django.dispatch import receiver
+
+from analytics.services import (
+    STATS_FLAGS,
+    track_guests,
+    track_reservation,
+)
+from reservation.models import Reservation
+
+
+@receiver(pre_save, sender=Reservation)
+def remember_reservation_flags(sender, instance, raw=False, **kwargs):
+    """Запоминает статусы брони до сохранения"""
+    if raw or instance.pk is None:
+        return
+    instance._stats_before = (
+        Reservation.objects.filter(pk=instance.pk)
+        .values(*STATS_FLAGS.values())
+        .first()
+    )
+
+
+@receiver(post_save, sender=Reservation)
+def update_reservation_stats(sender, instance, created, raw=False, **kwargs):
+    """Обновляет статистику при создании брони и смене ее статусов"""
+    if raw:
+        return
+    before = getattr(instance, "_stats_before", None)
+    if created or before is None:
+        track_reservation(instance)
+        return
+    track_reservation(
+        instance,
+        {counter: int(before[flag]) for counter, flag in STATS_FLAGS.items()},
+    )
+
+
+@receiver(m2m_changed, sender=Reservation.slots.through)
+def update_guests_stats(sender, instance, action, reverse, pk_set, **kwargs):
+    """Обновляет количество гостей при изменении слотов брони"""
+    if reverse or action not in ("post_add", "pre_remove") or not pk_set:
+        return
+    track_guests(instance, pk_set, 1 if action == "post_add" else -1)
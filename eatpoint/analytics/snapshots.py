@@ -0,0 +1,184 @@
+import logging
+import os
+from datetime import datetime
+from time import monotonic
+
+import numpy as np
+from cachalot.api import cachalot_disabled
+from django.conf import settings
+from django.db.models import Exists, OuterRef
+
+from core.constants import EXPORT_CHUNK_SIZE
+from core.services import chunked, combine_date_time
+from establishments.models import Establishment
+from reservation.models import Reservation, ReservationHistory
+
+logger = logging.getLogger(__name__)
+
+# Колонки снимка и их типы. created - время создания брони (у архивных
+# записей - reservation_date, скопированное из брони), guest - номер
+# гостя по email внутри снимка (-1 - без email)
+SNAPSHOT_COLUMNS = {
+    "establishment": "int64",
+    "created": "datetime64[s]",
+    "starts": "datetime64[s]",
+    "accepted": "bool",
+    "visited": "bool",
+    "cancelled": "bool",
+    "guest": "int64",
+}
+
+
+def snapshot_path(owner_id: int) -> str:
+    """Файл снимка броней владельца."""
+    return os.path.join(
+        settings.ANALYTICS_SNAPSHOT_ROOT, f"owner_{owner_id}.npz"
+    )
+
+
+def owner_bookings(owner_id: int):
+    """
+    Брони заведений владельца: живые брони и архивные записи броней,
+    уже удаленных после переноса в архив. Архивные записи удаленных
+    заведений не учитываются.
+
+    Возвращает кортежи (заведение, создана, начало, подтверждена,
+    посещена, отменена, email).
+    """
+    reservations = Reservation.objects.filter(
+        establishment__owner_id=owner_id
+    ).values_list(
+        "establishment_id",
+        "reservation_date",
+        "starts_at",
+        "is_accepted",
+        "is_visited",
+        "is_deleted",
+        "email",
+    )
+    yield from reservations.iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+    archived = (
+        ReservationHistory.objects.filter(
+            owner_id=owner_id, establishment__isnull=False
+        )
+        .alias(
+            live=Exists(
+                Reservation.objects.filter(pk=OuterRef("reservation_id"))
+            )
+        )
+        .filter(live=False)
+        .values_list(
+            "establishment_id",
+            "reservation_date",
+            "date_reservation",
+            "start_time_reservation",
+            "is_accepted",
+            "is_visited",
+            "email",
+        )
+    )
+    for row in archived.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        establishment_id, created, day, time, accepted, visited, email = row
+        yield (
+            establishment_id,
+            created,
+            combine_date_time(day, time),
+            bool(accepted),
+            bool(visited),
+            False,
+            email,
+        )
+
+
+def build_snapshot(owner_id: int) -> dict:
+    """
+    Снимок броней владельца в виде массивов NumPy по колонкам.
+
+    Брони читаются порциями, каждая порция сразу переводится
+    в массивы, в памяти не держатся объекты моделей.
+    """
+    guests = {}
+    parts = {name: [] for name in SNAPSHOT_COLUMNS}
+    with cachalot_disabled():
+        for chunk in chunked(owner_bookings(owner_id), EXPORT_CHUNK_SIZE):
+            columns = list(zip(*chunk))
+            emails = columns.pop()
+            columns.append(
+                [
+                    guests.setdefault(email.lower(), len(guests))
+                    if email
+                    else -1
+                    for email in emails
+                ]
+            )
+            for (name, dtype), values in zip(
+                SNAPSHOT_COLUMNS.items(), columns
+            ):
+                parts[name].append(np.array(values, dtype=dtype))
+    return {
+        name: np.concatenate(parts[name])
+        if parts[name]
+        else np.empty(0, dtype=dtype)
+        for name, dtype in SNAPSHOT_COLUMNS.items()
+    }
+
+
+def save_snapshot(owner_id: int, snapshot: dict) -> str:
+    """Атомарная запись снимка в файл (.npz)."""
+    path = snapshot_path(owner_id)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary = f"{path[:-4]}.tmp.npz"
+    np.savez_compressed(
+        temporary,
+        snapshot_at=np.datetime64(datetime.now(), "s"),
+        **snapshot,
+    )
+    os.replace(temporary, path)
+    return path
+
+
+def load_snapshot(owner_id: int) -> dict | None:
+    """Снимок броней владельца или None, если он еще не построен."""
+    path = snapshot_path(owner_id)
+    if not os.path.exists(path):
+        return None
+    with np.load(path, allow_pickle=False) as data:
+        return {name: data[name] for name in data.files}
+
+
+def refresh_snapshot(owner_id: int) -> dict:
+    """Строит, сохраняет и возвращает снимок владельца."""
+    save_snapshot(owner_id, build_snapshot(owner_id))
+    return load_snapshot(owner_id)
+
+
+def refresh_snapshots() -> dict:
+    """
+    Обновление снимков всех владельцев заведений. Ошибка снимка одного
+    владельца пишется в лог и не останавливает обновление остальных.
+    """
+    started = monotonic()
+    owners = (
+        Establishment.objects.order_by()
+        .values_list("owner_id", flat=True)
+        .distinct()
+    )
+    rows, failed = 0, 0
+    for owner_id in owners:
+        try:
+            snapshot = build_snapshot(owner_id)
+            save_snapshot(owner_id, snapshot)
+        except Exception:
+            logger.exception(
+                "Снимок броней владельца %s не построен", owner_id
+            )
+            failed += 1
+            continue
+        rows += len(snapshot["establishment"])
+    return {
+        "owners": len(owners),
+        "failed": failed,
+        "rows": rows,
+        "elapsed": round(monotonic() - started, 2),
+    }
@@ -0,0 +1,217 @@
+from datetime import date, datetime, timedelta
+
+from cachalot.api import cachalot_disabled
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Sum
+
+from analytics.models import ZoneUtilization
+from core.constants import (
+    DAYS,
+    INTERVAL_MINUTES,
+    SLOTS_ENGINE_COMPUTED,
+    SLOTS_TABLES_CHUNK,
+    UTILIZATION_KEEP_DAYS,
+)
+from core.models import TaskWatermark
+from core.services import chunked
+from reservation.models import Slot
+from reservation.occupancy import (
+    mask_to_bits,
+    occupancy_masks,
+    time_to_bit,
+    times_to_mask,
+)
+from reservation.services import active_tables, get_work_schedule
+
+UTILIZATION_WATERMARK = "refresh_zone_utilization"
+
+
+def interval_hour(bit: int) -> int:
+    """Час дня, к которому относится интервал бронирования."""
+    return bit * INTERVAL_MINUTES // 60
+
+
+def slot_cells(dates):
+    """
+    Интервалы дней из созданных слотов: (заведение, зона, дата,
+    номер интервала, места, занят ли слот).
+    """
+    slots = Slot.objects.filter(date__in=dates).values_list(
+        "establishment_id", "zone_id", "date", "time", "seats", "is_active"
+    )
+    for (
+        establishment_id,
+        zone_id,
+        day,
+        time,
+        seats,
+        is_active,
+    ) in slots.iterator(chunk_size=SLOTS_TABLES_CHUNK):
+        yield (
+            establishment_id,
+            zone_id,
+            day,
+            time_to_bit(time),
+            seats,
+            not is_active,
+        )
+
+
+def schedule_cells(dates):
+    """
+    Интервалы дней без созданных слотов (SLOTS_ENGINE = "computed"):
+    часы работы заведений по активным столикам, занятость - из индекса
+    занятости столиков.
+    """
+    tables = active_tables().order_by("id")
+    schedule = {
+        key: times_to_mask(times)
+        for key, times in get_work_schedule(
+            tables.values("zone__establishment_id")
+        ).items()
+    }
+    rows = tables.values_list(
+        "id", "zone__establishment_id", "zone_id", "seats"
+    ).iterator(chunk_size=SLOTS_TABLES_CHUNK)
+    for chunk in chunked(rows, SLOTS_TABLES_CHUNK):
+        booked = occupancy_masks([row[0] for row in chunk], dates)
+        for table_id, establishment_id, zone_id, seats in chunk:
+            for day in dates:
+                mask = schedule.get((establishment_id, DAYS[day.weekday()]))
+                taken = booked.get((table_id, day), 0)
+                for bit in mask_to_bits(mask or 0):
+                    yield (
+                        establishment_id,
+                        zone_id,
+                        day,
+                        bit,
+                        seats,
+                        bool(taken >> bit & 1),
+                    )
+
+
+def collect_utilization(dates) -> dict:
+    """
+    Загрузка зон за дни dates:
+    {(заведение, зона, дата, час): [места-минуты, занятые места-минуты]}.
+    """
+    cells = (
+        schedule_cells
+        if settings.SLOTS_ENGINE == SLOTS_ENGINE_COMPUTED
+        else slot_cells
+    )
+    hours = {}
+    with cachalot_disabled():
+        for establishment_id, zone_id, day, bit, seats, booked in cells(dates):
+            minutes = hours.setdefault(
+                (establishment_id, zone_id, day, interval_hour(bit)), [0, 0]
+            )
+            minutes[0] += seats * INTERVAL_MINUTES
+            if booked:
+                minutes[1] += seats * INTERVAL_MINUTES
+    return hours
+
+
+def refresh_days(dates) -> int:
+    """Пересчитывает загрузку зон за дни dates, возвращает число строк."""
+    hours = collect_utilization(dates)
+    with transaction.atomic():
+        ZoneUtilization.objects.filter(date__in=dates).delete()
+        ZoneUtilization.objects.bulk_create(
+            [
+                ZoneUtilization(
+                    establishment_id=establishment_id,
+                    zone_id=zone_id,
+                    date=day,
+                    weekday=day.weekday(),
+                    hour=hour,
+                    seat_minutes=seat_minutes,
+                    booked_seat_minutes=booked_seat_minutes,
+                )
+                for (establishment_id, zone_id, day, hour), (
+                    seat_minutes,
+                    booked_seat_minutes,
+                ) in hours.items()
+                if establishment_id is not None
+            ],
+            batch_size=SLOTS_TABLES_CHUNK,
+        )
+    return len(hours)
+
+
+def refresh_utilization(today: date | None = None) -> dict:
+    """
+    Инкрементальное обновление загрузки зон.
+
+    Пересчитываются дни от отметки прошлого запуска до сегодняшнего:
+    прошедшие дни в последний раз, сегодняшний - с текущими бронями.
+    Слоты и индекс занятости прошлых дней удаляются по ночам, поэтому
+    обновление должно пройти до их удаления. Загрузка старше
+    UTILIZATION_KEEP_DAYS удаляется.
+    """
+    today = today or datetime.now().date()
+    watermark, _ = TaskWatermark.objects.get_or_create(
+        name=UTILIZATION_WATERMARK
+    )
+    start = watermark.value.date() if watermark.value else today
+    dates = [
+        start + timedelta(days=offset)
+        for offset in range(max((today - start).days, 0) + 1)
+    ]
+    rows = refresh_days(dates)
+    ZoneUtilization.objects.filter(
+        date__lt=today - timedelta(days=UTILIZATION_KEEP_DAYS)
+    ).delete()
+    watermark.value = datetime.combine(today, datetime.min.time())
+    watermark.save()
+    return {"days": len(dates), "rows": rows}
+
+
+def utilization_heatmap(utilization) -> list[dict]:
+    """
+    Карта загрузки зон по часам недели из строк ZoneUtilization.
+
+    Для каждой зоны - итоги в место-часах и матрица 7 x 24 (день недели
+    x час) с долей занятых мест, None - зона в этот час не работает.
+    """
+    rows = (
+        utilization.values(
+            "establishment_id", "zone_id", "zone__zone", "weekday", "hour"
+        )
+        .annotate(seats=Sum("seat_minutes"), booked=Sum("booked_seat_minutes"))
+        .order_by("establishment_id", "zone_id")
+    )
+    zones = {}
+    for row in rows:
+        zone = zones.setdefault(
+            row["zone_id"],
+            {
+                "establishment": row["establishment_id"],
+                "zone": row["zone_id"],
+                "name": row["zone__zone"],
+                "seats": 0,
+                "booked": 0,
+                "matrix": [[None] * 24 for _ in DAYS],
+            },
+        )
+        zone["seats"] += row["seats"]
+        zone["booked"] += row["booked"]
+        if row["seats"]:
+            zone["matrix"][row["weekday"]][row["hour"]] = round(
+                row["booked"] / row["seats"], 3
+            )
+    return [
+        {
+            "establishment": zone["establishment"],
+            "zone": zone["zone"],
+            "name": zone["name"],
+            "seat_hours": round(zone["seats"] / 60, 1),
+            "booked_seat_hours": round(zone["booked"] / 60, 1),
+            "occupancy": round(zone["booked"] / zone["seats"], 3)
+            if zone["seats"]
+            else 0,
+            "matrix": zone["matrix"],
+        }
+        for zone in zones.values()
+    ]
@@ -0,0 +1,252 @@
+import tempfile
+from datetime import date, datetime, timedelta
+from unittest import mock
+
+import pyarrow.parquet as pq
+from django.core.files.storage import FileSystemStorage
+from django.conf import settings
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from analytics.exports import expire_running_exports, run_export
+from analytics.cache import analytics_cache, cache_stats
+from analytics.metrics import lead_time
+from analytics.models import AnalyticsExport, ReservationDailyStats
+from analytics.services import STATS_FIELDS, reconcile_stats
+from analytics.snapshots import build_snapshot
+from api.tests.test_slots import SlotsTestCase
+from core.constants import (
+    EXPORT_DONE,
+    EXPORT_FAILED,
+    EXPORT_PARQUET,
+    EXPORT_RUNNING,
+    EXPORT_RUNNING_TIMEOUT,
+    RESTORATEUR,
+)
+from establishments.models import City, Establishment
+from reservation.models import ReservationHistory, Slot
+from reservation.services import (
+    create_reservation,
+    delete_reservation,
+    generate_slots,
+)
+from users.models import User
+
+
+class AnalyticsExportTest(TestCase):
+    """
+    Выгрузка броней пишет файл во временное хранилище, прерванные
+    выгрузки не остаются в статусе "выполняется".
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create(
+            email="owner@test.ru", telephone="+79990000001", role=RESTORATEUR
+        )
+        ReservationHistory.objects.create(
+            reservation_id=1,
+            owner=cls.owner,
+            establishment_name="Заведение",
+            date_reservation=date(2026, 1, 10),
+            start_time_reservation="18:00",
+            email="guest@test.ru",
+        )
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.storage = FileSystemStorage(location=directory.name)
+        patcher = mock.patch.object(
+            AnalyticsExport._meta.get_field("file"), "storage", self.storage
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_parquet(self):
+        export = run_export(
+            AnalyticsExport.objects.create(
+                owner=self.owner, format=EXPORT_PARQUET
+            )
+        )
+        self.assertEqual(export.status, EXPORT_DONE, export.error)
+        self.assertEqual(export.rows, 1)
+        table = pq.read_table(self.storage.path(export.file.name))
+        self.assertEqual(table.column("email").to_pylist(), ["guest@test.ru"])
+
+    def test_storage_error(self):
+        export = AnalyticsExport.objects.create(owner=self.owner)
+        with mock.patch.object(self.storage, "path", side_effect=OSError):
+            run_export(export)
+        export.refresh_from_db()
+        self.assertEqual(export.status, EXPORT_FAILED)
+        self.assertIsNotNone(export.finished_at)
+
+    def test_expire_running(self):
+        started_at = datetime.now() - timedelta(minutes=EXPORT_RUNNING_TIMEOUT)
+        stale, running = AnalyticsExport.objects.bulk_create(
+            [
+                AnalyticsExport(
+                    owner=self.owner,
+                    status=EXPORT_RUNNING,
+                    started_at=started_at - timedelta(minutes=1),
+                ),
+                AnalyticsExport(
+                    owner=self.owner,
+                    status=EXPORT_RUNNING,
+                    started_at=datetime.now(),
+                ),
+            ]
+        )
+        self.assertEqual(expire_running_exports(), 1)
+        stale.refresh_from_db()
+        running.refresh_from_db()
+        self.assertEqual(stale.status, EXPORT_FAILED)
+        self.assertEqual(running.status, EXPORT_RUNNING)
+
+
+class SnapshotTest(TestCase):
+    """
+    Брони, оставшиеся только в архиве, попадают в снимок со временем
+    создания и учитываются в распределении времени до брони.
+    """
+
+    def test_archived_created(self):
+        owner = User.objects.create(
+            email="owner@test.ru", telephone="+79990000001", role=RESTORATEUR
+        )
+        # bulk_create без сигналов сохранения заведения
+        (establishment,) = Establishment.objects.bulk_create(
+            [
+                Establishment(
+                    owner=owner,
+                    cities=City.objects.create(name="Москва", slug="moscow"),
+                    name="Заведение",
+                    address="Улица, 1",
+                    email="establishment@test.ru",
+                    telephone="+79880000001",
+                )
+            ]
+        )
+        ReservationHistory.objects.create(
+            reservation_id=1,
+            reservation_date=datetime(2026, 1, 9, 18, 0),
+            establishment=establishment,
+            owner=owner,
+            date_reservation=date(2026, 1, 10),
+            start_time_reservation="18:00",
+            is_visited=True,
+        )
+        snapshot = build_snapshot(owner.id)
+        self.assertEqual(
+            snapshot["created"].tolist(), [datetime(2026, 1, 9, 18, 0)]
+        )
+        report = lead_time(snapshot)
+        self.assertEqual(report["bookings"], 1)
+        self.assertEqual(report["median_hours"], 24.0)
+
+
+class BookingTestCase(SlotsTestCase):
+    """Заведение со слотами и бронирование всех столиков на время."""
+
+    def setUp(self):
+        super().setUp()
+        generate_slots()
+
+    def book(self, time):
+        return create_reservation(
+            self.establishment,
+            {
+                "slots": list(
+                    Slot.objects.filter(date=self.now.date(), time=time)
+                ),
+                "first_name": "Гость",
+                "email": "guest@test.ru",
+            },
+        )
+
+
+class ReservationStatsTest(BookingTestCase):
+    """
+    Сводная статистика броней меняется вместе с бронями: создание,
+    смена статусов и удаление. Сверка исправляет разошедшиеся дни.
+    """
+
+    def stats(self):
+        return ReservationDailyStats.objects.values(*STATS_FIELDS).get(
+            establishment=self.establishment
+        )
+
+    def test_deltas(self):
+        reservation = self.book("18:00")
+        self.assertEqual(
+            self.stats(),
+            {
+                "created": 1,
+                "accepted": 0,
+                "visited": 0,
+                "cancelled": 0,
+                "guests": 6,
+            },
+        )
+        reservation.is_accepted = True
+        reservation.save()
+        reservation.is_visited = True
+        reservation.save()
+        self.assertEqual(
+            (self.stats()["accepted"], self.stats()["visited"]), (1, 1)
+        )
+        delete_reservation(reservation)
+        self.assertEqual(self.stats(), dict.fromkeys(STATS_FIELDS, 0))
+
+    def test_reconcile(self):
+        self.book("18:00")
+        fresh = self.stats()
+        ReservationDailyStats.objects.update(created=10, guests=0)
+        day = ReservationDailyStats.objects.get().date
+        self.assertEqual(reconcile_stats(day, day), {"days": 1, "fixed": 1})
+        self.assertEqual(self.stats(), fresh)
+        self.assertEqual(reconcile_stats(day, day), {"days": 1, "fixed": 0})
+
+
+# Кэш аналитики в памяти процесса вместо Redis
+@override_settings(
+    CACHES={
+        **settings.CACHES,
+        "analytics": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "analytics-test",
+        },
+    }
+)
+class AnalyticsCacheTest(BookingTestCase):
+    """
+    Ответ аналитики берется из кэша, пока брони заведения не меняются;
+    изменение статистики после коммита сбрасывает кэш владельца.
+    """
+
+    def setUp(self):
+        super().setUp()
+        analytics_cache().clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.establishment.owner)
+        self.url = reverse(
+            "api_v2:establishment-analytics", args=[self.establishment.id]
+        )
+
+    def get(self):
+        response = self.client.get(self.url, secure=True)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_hit_and_invalidation(self):
+        first = self.get()
+        self.assertEqual(self.get(), first)
+        self.assertEqual(
+            (cache_stats()["hits"], cache_stats()["misses"]), (1, 1)
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.book("18:00")
+        self.assertNotEqual(self.get(), first)
+        self.assertEqual(cache_stats()["misses"], 2)
@@ -0,0 +1,282 @@
+from unittest import mock
+
+from cachalot.api import cachalot_disabled
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from api.v2.views.establishments import EstablishmentViewSet
+from core.constants import CHECKS, CLIENT, DAYS, RESTORATEUR
+from establishments.models import (
+    City,
+    Establishment,
+    Favorite,
+    Kitchen,
+    TypeEst,
+    WorkEstablishment,
+    ZoneEstablishment,
+)
+from users.models import User
+
+ESTABLISHMENTS = 120
+
+
+class EstablishmentListQueriesTest(TestCase):
+    """
+    Количество запросов каталога заведений не зависит от размера
+    страницы: связи и is_favorited не запрашиваются по каждому заведению.
+    Кэш запросов cachalot отключается, иначе повторные запросы не видны.
+    """
+
+    url = reverse("api_v2:establishments-list")
+
+    @classmethod
+    def setUpTestData(cls):
+        owner = User.objects.create(
+            email="owner@test.ru", telephone="+79990000001", role=RESTORATEUR
+        )
+        cls.client_user = User.objects.create(
+            email="client@test.ru", telephone="+79990000002", role=CLIENT
+        )
+        city = City.objects.create(name="Москва", slug="moscow")
+        kitchen = Kitchen.objects.create(name="Русская", slug="russian")
+        type_est = TypeEst.objects.create(name="Ресторан", slug="restaurant")
+
+        # bulk_create без сигналов сохранения: они геокодируют адрес
+        # и строят слоты, для проверки списка это не нужно
+        establishments = Establishment.objects.bulk_create(
+            [
+                Establishment(
+                    owner=owner,
+                    cities=city,
+                    name=f"Заведение {number}",
+                    address=f"Улица, {number}",
+                    average_check=CHECKS[0],
+                    email=f"establishment{number}@test.ru",
+                    telephone=f"+7988{number:07d}",
+                    is_verified=True,
+                )
+                for number in range(ESTABLISHMENTS)
+            ]
+        )
+        Establishment.kitchens.through.objects.bulk_create(
+            [
+                Establishment.kitchens.through(
+                    establishment=establishment, kitchen=kitchen
+                )
+                for establishment in establishments
+            ]
+        )
+        Establishment.types.through.objects.bulk_create(
+            [
+                Establishment.types.through(
+                    establishment=establishment, typeest=type_est
+                )
+                for establishment in establishments
+            ]
+        )
+        ZoneEstablishment.objects.bulk_create(
+            [
+                ZoneEstablishment(
+                    establishment=establishment, zone="Зал", seats=10
+                )
+                for establishment in establishments
+            ]
+        )
+        WorkEstablishment.objects.bulk_create(
+            [
+                WorkEstablishment(
+                    establishment=establishment,
+                    day=DAYS[0],
+                    start="10:00",
+                    end="22:00",
+                )
+                for establishment in establishments
+            ]
+        )
+        Favorite.objects.bulk_create(
+            [
+                Favorite(user=cls.client_user, establishment=establishment)
+                for establishment in establishments[::3]
+            ]
+        )
+
+    def count_queries(self, client, page_size, **params):
+        with cachalot_disabled():
+            with CaptureQueriesContext(connection) as queries:
+                response = client.get(
+                    self.url, {"page_size": page_size, **params}, secure=True
+                )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["results"]), page_size)
+        return len(queries)
+
+    def assert_constant_queries(self, client, **params):
+        queries = self.count_queries(client, 10, **params)
+        with self.assertNumQueries(queries):
+            self.count_queries(client, 100, **params)
+
+    def test_anonymous(self):
+        self.assert_constant_queries(APIClient())
+
+    def test_authenticated(self):
+        client = APIClient()
+        client.force_authenticate(self.client_user)
+        self.assert_constant_queries(client)
+
+    def test_authenticated_is_favorited(self):
+        client = APIClient()
+        client.force_authenticate(self.client_user)
+        response = client.get(self.url, {"page_size": 100}, secure=True)
+        favorited = {
+            item["id"]
+            for item in response.data["results"]
+            if item["is_favorited"]
+        }
+        self.assertEqual(
+            favorited,
+            set(
+                Favorite.objects.filter(
+                    user=self.client_user,
+                    establishment__id__in=[
+                        item["id"] for item in response.data["results"]
+                    ],
+                ).values_list("establishment_id", flat=True)
+            ),
+        )
+
+    def test_full_list_by_default(self):
+        response = APIClient().get(self.url, secure=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertLessEqual(
+            {"images", "worked", "zones", "kitchens", "types"},
+            set(response.data["results"][0]),
+        )
+
+    def test_compact_view(self):
+        response = APIClient().get(
+            self.url, {"view": "compact", "expand": "worked"}, secure=True
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            set(response.data["results"][0]),
+            set(EstablishmentViewSet.compact_fields) | {"worked"},
+        )
+        self.assert_constant_queries(APIClient(), view="compact")
+
+    def test_unknown_fields(self):
+        for params in (
+            {"fields": "id,unknown"},
+            {"view": "compact", "expand": "unknown"},
+            {"view": "unknown"},
+        ):
+            with self.subTest(**params):
+                response = APIClient().get(self.url, params, secure=True)
+                self.assertEqual(response.status_code, 400)
+
+    def test_fields_resolved_once(self):
+        with mock.patch.object(
+            EstablishmentViewSet,
+            "get_serializer_class",
+            autospec=True,
+            side_effect=EstablishmentViewSet.get_serializer_class,
+        ) as get_serializer_class:
+            response = APIClient().get(
+                self.url,
+                {"view": "compact", "expand": "worked,zones"},
+                secure=True,
+            )
+        self.assertEqual(response.status_code, 200)
+        # Имена полей сериализатора и сам сериализатор ответа
+        self.assertEqual(get_serializer_class.call_count, 2)
+
+
+class EstablishmentLocationFilterTest(TestCase):
+    """
+    Поиск рядом на SQLite (формула гаверсинуса): только заведения
+    в радиусе, расстояние в ответе, сортировка от ближних к дальним.
+    """
+
+    url = reverse("api_v2:establishments-list")
+    center = "55.7558,37.6173"
+
+    @classmethod
+    def setUpTestData(cls):
+        owner = User.objects.create(
+            email="owner@test.ru", telephone="+79990000001", role=RESTORATEUR
+        )
+        city = City.objects.create(name="Москва", slug="moscow")
+        # Центр, 3 км и 8 км к северу, другой город
+        points = {
+            "center": (55.7558, 37.6173),
+            "near": (55.7828, 37.6173),
+            "far": (55.8278, 37.6173),
+            "other": (59.9386, 30.3141),
+        }
+        establishments = Establishment.objects.bulk_create(
+            [
+                Establishment(
+                    owner=owner,
+                    cities=city,
+                    name=name,
+                    address="Улица, 1",
+                    average_check=CHECKS[0],
+                    email=f"{name}@test.ru",
+                    telephone=f"+7988000000{number}",
+                    is_verified=True,
+                    latitude=latitude,
+                    longitude=longitude,
+                )
+                for number, (name, (latitude, longitude)) in enumerate(
+                    points.items()
+                )
+            ]
+        )
+        cls.ids = {
+            name: establishment.id
+            for name, establishment in zip(points, establishments)
+        }
+
+    def get(self, **params):
+        return APIClient().get(
+            self.url, {"location": self.center, **params}, secure=True
+        )
+
+    def results(self, **params):
+        response = self.get(**params)
+        self.assertEqual(response.status_code, 200)
+        return {
+            item["id"]: item["distance"] for item in response.data["results"]
+        }
+
+    def test_default_radius(self):
+        self.assertEqual(
+            set(self.results()), {self.ids["center"], self.ids["near"]}
+        )
+
+    def test_radius(self):
+        distances = self.results(radius=10)
+        self.assertEqual(
+            set(distances),
+            {self.ids["center"], self.ids["near"], self.ids["far"]},
+        )
+        self.assertEqual(distances[self.ids["center"]], 0)
+        self.assertAlmostEqual(distances[self.ids["near"]], 3, delta=0.1)
+        self.assertAlmostEqual(distances[self.ids["far"]], 8, delta=0.1)
+
+    def test_order_distance(self):
+        self.assertEqual(
+            list(self.results(radius=10, order="distance")),
+            [self.ids["center"], self.ids["near"], self.ids["far"]],
+        )
+
+    def test_invalid(self):
+        for params in (
+            {"location": "55.7558"},
+            {"location": "91,37"},
+            {"radius": 1000},
+        ):
+            with self.subTest(**params):
+                self.assertEqual(self.get(**params).status_code, 400)
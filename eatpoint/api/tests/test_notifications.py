@@ -0,0 +1,134 @@
+from datetime import datetime, timedelta
+from unittest import mock
+
+from django.core import mail
+from django.test import TestCase
+
+from api.tests.test_reservations import create_establishment
+from core.constants import (
+    NOTIFICATION_MAX_ATTEMPTS,
+    NOTIFICATION_PENDING,
+    NOTIFICATION_SENT,
+    REMINDER_THREE_HOURS,
+    RESTORATEUR,
+)
+from core.models import Notification, NotificationDeadLetter
+from core.notifications import (
+    claim_pending,
+    plan_reminders,
+    send_pending,
+    window_reminders,
+)
+from reservation.models import ReminderSchedule, Reservation
+from users.models import User
+
+
+class NotificationOutboxTest(TestCase):
+    """
+    Очередь писем: повтор с задержкой после ошибки отправки и перенос
+    в архив ошибок после NOTIFICATION_MAX_ATTEMPTS попыток, в том числе
+    если воркер падал, не записав результат.
+    """
+
+    def setUp(self):
+        self.notification = Notification.objects.create(
+            subject="Бронь", message="Текст", recipient="guest@test.ru"
+        )
+
+    def expire(self):
+        """Время следующей попытки (или закрепления) уже наступило"""
+        Notification.objects.update(
+            next_attempt_at=datetime.now() - timedelta(seconds=1)
+        )
+
+    def test_sent(self):
+        self.assertEqual(send_pending()["sent"], 1)
+        self.notification.refresh_from_db()
+        self.assertEqual(self.notification.status, NOTIFICATION_SENT)
+        self.assertEqual(self.notification.attempts, 1)
+        self.assertEqual(len(mail.outbox), 1)
+
+    @mock.patch("core.notifications.deliver")
+    def test_retry_and_dead_letter(self, deliver):
+        deliver.side_effect = lambda messages: {
+            key: "SMTPError" for key in messages
+        }
+        self.assertEqual(send_pending()["failed"], 1)
+        self.notification.refresh_from_db()
+        self.assertEqual(self.notification.status, NOTIFICATION_PENDING)
+        self.assertEqual(self.notification.attempts, 1)
+        self.assertGreater(self.notification.next_attempt_at, datetime.now())
+        # Письмо не отправляется повторно до наступления задержки
+        self.assertEqual(send_pending(), {"sent": 0, "failed": 0, "dead": 0})
+
+        for _ in range(NOTIFICATION_MAX_ATTEMPTS - 2):
+            self.expire()
+            self.assertEqual(send_pending()["failed"], 1)
+        self.expire()
+        self.assertEqual(send_pending()["dead"], 1)
+        self.assertFalse(Notification.objects.exists())
+        dead = NotificationDeadLetter.objects.get()
+        self.assertEqual(dead.attempts, NOTIFICATION_MAX_ATTEMPTS)
+        self.assertEqual(dead.last_error, "SMTPError")
+
+    def test_crashed_worker(self):
+        for attempt in range(1, NOTIFICATION_MAX_ATTEMPTS + 1):
+            self.assertEqual(
+                [notification.attempts for notification in claim_pending(10)],
+                [attempt],
+            )
+            self.expire()
+        self.assertEqual(claim_pending(10), [])
+        self.assertFalse(Notification.objects.exists())
+        self.assertEqual(
+            NotificationDeadLetter.objects.get().attempts,
+            NOTIFICATION_MAX_ATTEMPTS,
+        )
+
+
+class PlanRemindersTest(TestCase):
+    """
+    Повторное планирование не отправляет напоминание второй раз:
+    к отправке возвращаются только строки, вставленные этим запуском.
+    """
+
+    start = datetime(2026, 10, 20, 12, 0)
+
+    @classmethod
+    def setUpTestData(cls):
+        owner = User.objects.create(
+            email="owner@test.ru", telephone="+79990000001", role=RESTORATEUR
+        )
+        (cls.booking,) = Reservation.objects.bulk_create(
+            [
+                Reservation(
+                    establishment=create_establishment(owner),
+                    date_reservation=cls.start.date(),
+                    start_time_reservation="15:00",
+                    starts_at=cls.start.replace(hour=15),
+                    email="guest@test.ru",
+                    is_accepted=True,
+                    reminder_three_hours=True,
+                    reminder_half_on_hour=True,
+                )
+            ]
+        )
+
+    def reminders(self):
+        return list(
+            window_reminders(self.start, self.start + timedelta(hours=1))
+        )
+
+    def test_window(self):
+        self.assertEqual(
+            self.reminders(),
+            [(self.booking.id, REMINDER_THREE_HOURS, self.start)],
+        )
+
+    def test_planned_once(self):
+        self.assertEqual(
+            plan_reminders(self.reminders()),
+            {self.start: [self.booking.id]},
+        )
+        self.assertEqual(plan_reminders(self.reminders()), {})
+        self.assertEqual(ReminderSchedule.objects.count(), 1)
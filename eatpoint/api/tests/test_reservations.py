@@ -0,0 +1,137 @@
+from datetime import date, datetime
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.constants import RESTORATEUR
+from establishments.models import City, Establishment
+from reservation.models import Reservation, ReservationHistory
+from reservation.services import archive_visited, purge_archived
+from users.models import User
+
+
+def create_establishment(owner: User, **fields) -> Establishment:
+    """Заведение без сигналов сохранения (геокодирование, слоты)."""
+    (establishment,) = Establishment.objects.bulk_create(
+        [
+            Establishment(
+                owner=owner,
+                cities=City.objects.get_or_create(
+                    name="Москва", slug="moscow"
+                )[0],
+                name="Заведение",
+                address="Улица, 1",
+                email="establishment@test.ru",
+                telephone="+79880000001",
+                is_verified=True,
+                **fields,
+            )
+        ]
+    )
+    return establishment
+
+
+class OwnerReservationsPaginationTest(TestCase):
+    """
+    Курсор списка броней владельца учитывает обе колонки ключа
+    (starts_at, id): брони с одинаковым временем не теряются.
+    """
+
+    url = reverse("api_v2:reservations-business-list")
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create(
+            email="owner@test.ru", telephone="+79990000001", role=RESTORATEUR
+        )
+        establishment = create_establishment(cls.owner)
+        Reservation.objects.bulk_create(
+            [
+                Reservation(
+                    establishment=establishment,
+                    date_reservation=date(2026, 10, 20),
+                    start_time_reservation=time,
+                    starts_at=datetime.combine(
+                        date(2026, 10, 20),
+                        datetime.strptime(time, "%H:%M").time(),
+                    ),
+                    email=f"guest{number}@test.ru",
+                )
+                for number, time in enumerate(["18:00"] * 5 + ["19:00"] * 2)
+            ]
+        )
+
+    def test_same_starts_at(self):
+        client = APIClient()
+        client.force_authenticate(self.owner)
+        page = client.get(self.url, {"page_size": 2}, secure=True).data
+        pages = [page]
+        while page["next"]:
+            page = client.get(page["next"], secure=True).data
+            pages.append(page)
+        ids = [row["id"] for page in pages for row in page["results"]]
+        self.assertEqual(
+            ids,
+            list(
+                Reservation.objects.order_by("starts_at", "id").values_list(
+                    "id", flat=True
+                )
+            ),
+        )
+        previous = client.get(pages[-1]["previous"], secure=True).data
+        self.assertEqual(previous["results"], pages[-2]["results"])
+
+
+class ArchiveTest(TestCase):
+    """
+    Архивация посещенных броней и удаление заархивированных идут
+    пакетами по id: каждая бронь обрабатывается ровно один раз.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        owner = User.objects.create(
+            email="owner@test.ru", telephone="+79990000001", role=RESTORATEUR
+        )
+        establishment = create_establishment(owner)
+        cls.visited = Reservation.objects.bulk_create(
+            [
+                Reservation(
+                    establishment=establishment,
+                    date_reservation=date(2026, 10, 10),
+                    start_time_reservation="18:00",
+                    starts_at=datetime(2026, 10, 10, 18, 0),
+                    email=f"guest{number}@test.ru",
+                    is_accepted=True,
+                    is_visited=is_visited,
+                )
+                for number, is_visited in enumerate([True] * 5 + [False])
+            ]
+        )
+        cls.visited.pop()
+
+    def test_archive(self):
+        self.assertEqual(archive_visited(batch_size=2)["archived"], 5)
+        self.assertEqual(archive_visited(batch_size=2)["archived"], 0)
+        self.assertEqual(
+            list(
+                ReservationHistory.objects.order_by(
+                    "reservation_id"
+                ).values_list("reservation_id", "reservation_date")
+            ),
+            [
+                (reservation.id, reservation.reservation_date)
+                for reservation in self.visited
+            ],
+        )
+
+    def test_purge(self):
+        archive_visited()
+        report = purge_archived(Reservation.objects.all(), batch_size=2)
+        self.assertEqual(report["deleted"], 5)
+        self.assertEqual(
+            list(Reservation.objects.values_list("is_visited", flat=True)),
+            [False],
+        )
+        self.assertEqual(ReservationHistory.objects.count(), 5)
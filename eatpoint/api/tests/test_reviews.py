@@ -0,0 +1,94 @@
+from unittest import mock
+
+from django.db import DatabaseError, connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from api.tests.test_reservations import create_establishment
+from core.constants import CHECKS, CLIENT, RESTORATEUR
+from establishments.models import Establishment
+from reviews.models import Review
+from users.models import User
+
+
+class ReviewRatingTest(TestCase):
+    """
+    Рейтинг заведения меняется в одной транзакции с отзывом:
+    при ошибке обновления рейтинга отзыв не сохраняется и не удаляется.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        owner = User.objects.create(
+            email="owner@test.ru", telephone="+79990000001", role=RESTORATEUR
+        )
+        cls.author = User.objects.create(
+            email="client@test.ru", telephone="+79990000002", role=CLIENT
+        )
+        cls.establishment = create_establishment(
+            owner, average_check=CHECKS[0]
+        )
+
+    def rating(self):
+        return Establishment.objects.values_list(
+            "rating_sum", "review_count", "rating"
+        ).get(id=self.establishment.id)
+
+    def create_review(self, score):
+        return Review.objects.create(
+            establishment=self.establishment,
+            author=self.author,
+            text="Отзыв",
+            score=score,
+        )
+
+    def test_create_update_delete(self):
+        review = self.create_review(4)
+        self.assertEqual(self.rating(), (4, 1, 4.0))
+        review.score = 2
+        review.save()
+        self.assertEqual(self.rating(), (2, 1, 2.0))
+        review.delete()
+        self.assertEqual(self.rating(), (0, 0, 0.0))
+
+    @mock.patch("reviews.signals.apply_rating", side_effect=DatabaseError)
+    def test_rating_error_rolls_back_create(self, apply_rating):
+        with self.assertRaises(DatabaseError):
+            self.create_review(5)
+        self.assertFalse(Review.objects.exists())
+
+    def test_rating_error_rolls_back_update_and_delete(self):
+        review = self.create_review(4)
+        with mock.patch(
+            "reviews.signals.apply_rating", side_effect=DatabaseError
+        ):
+            review.score = 1
+            with self.assertRaises(DatabaseError):
+                review.save()
+            with self.assertRaises(DatabaseError):
+                review.delete()
+        self.assertEqual(
+            Review.objects.values_list("score", flat=True).get(), 4
+        )
+        self.assertEqual(self.rating(), (4, 1, 4.0))
+
+    # Координаты и свободные дни заведения для проверки не нужны
+    @mock.patch("establishments.signals.days_available")
+    @mock.patch("establishments.signals.Nominatim")
+    def test_establishment_save_keeps_rating(self, nominatim, *mocks):
+        nominatim.return_value.geocode.return_value = None
+        establishment = Establishment.objects.defer("description").get(
+            id=self.establishment.id
+        )
+        self.create_review(5)
+        establishment.name = "Новое название"
+        with CaptureQueriesContext(connection) as queries:
+            establishment.save()
+        self.assertFalse(
+            [query for query in queries if "description" in query["sql"]]
+        )
+        self.assertEqual(self.rating(), (5, 1, 5.0))
+        self.assertEqual(
+            Establishment.objects.get(id=establishment.id).name,
+            "Новое название",
+        )
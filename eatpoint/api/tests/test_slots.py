@@ -0,0 +1,333 @@
+from contextlib import ExitStack
+from datetime import datetime
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from api.v2.serializers.establishments import EstablishmentEditSerializer
+from core.constants import (
+    CHECKS,
+    CLIENT,
+    DAYS,
+    RESTORATEUR,
+    SLOTS_ENGINE_COMPUTED,
+    SLOTS_ENGINE_MATERIALIZED,
+)
+from establishments.models import (
+    City,
+    Establishment,
+    Table,
+    WorkEstablishment,
+    ZoneEstablishment,
+)
+from reservation.availability import available_slots
+from reservation.models import Reservation, Slot
+from reservation.occupancy import occupy_slots
+from reservation.services import generate_slots, sync_establishment_slots
+from users.models import User
+
+NOW = datetime(2026, 10, 19, 17, 35)
+
+
+def freeze(now: datetime):
+    """Подменяет текущее время в расчете свободных слотов."""
+
+    class FrozenDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return now
+
+    stack = ExitStack()
+    for module in (
+        "api.v2.views.reservation",
+        "reservation.availability",
+        "reservation.services",
+    ):
+        stack.enter_context(mock.patch(f"{module}.datetime", FrozenDatetime))
+    return stack
+
+
+class SlotsTestCase(TestCase):
+    """
+    Заведение с двумя столиками, работающее каждый день с 10:00 до 22:00.
+    Объекты создаются через bulk_create: сигналы сохранения ставят
+    в очередь пересчет слотов, для проверок он не нужен.
+    """
+
+    now = NOW
+
+    @classmethod
+    def setUpTestData(cls):
+        owner = User.objects.create(
+            email="owner@test.ru", telephone="+79990000001", role=RESTORATEUR
+        )
+        (cls.establishment,) = Establishment.objects.bulk_create(
+            [
+                Establishment(
+                    owner=owner,
+                    cities=City.objects.create(name="Москва", slug="moscow"),
+                    name="Заведение",
+                    address="Улица, 1",
+                    email="establishment@test.ru",
+                    telephone="+79880000001",
+                    average_check=CHECKS[0],
+                    is_verified=True,
+                )
+            ]
+        )
+        (cls.zone,) = ZoneEstablishment.objects.bulk_create(
+            [
+                ZoneEstablishment(
+                    establishment=cls.establishment, zone="Зал", seats=6
+                )
+            ]
+        )
+        cls.tables = Table.objects.bulk_create(
+            [
+                Table(
+                    establishment=cls.establishment,
+                    zone=cls.zone,
+                    number=number,
+                    seats=seats,
+                )
+                for number, seats in ((1, 2), (2, 4))
+            ]
+        )
+        WorkEstablishment.objects.bulk_create(
+            [
+                WorkEstablishment(
+                    establishment=cls.establishment,
+                    day=day,
+                    start="10:00",
+                    end="22:00",
+                )
+                for day in DAYS
+            ]
+        )
+
+    def setUp(self):
+        self.enterContext(freeze(self.now))
+
+    def reserve(self, data, email="client@test.ru"):
+        client = APIClient()
+        client.force_authenticate(
+            User.objects.get_or_create(
+                email=email,
+                defaults={
+                    "telephone": f"+7999{User.objects.count() + 1:07d}",
+                    "role": CLIENT,
+                },
+            )[0]
+        )
+        return client.post(
+            reverse("api_v2:reservations-list", args=[self.establishment.id]),
+            data,
+            format="json",
+            secure=True,
+        )
+
+    def get(self, url=None, **params):
+        url = url or reverse(
+            "api_v2:availability-list", args=[self.establishment.id]
+        )
+        response = APIClient().get(url, params, secure=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.data), ["next", "previous", "results"])
+        return response.data
+
+
+class AvailableSlotsTest(SlotsTestCase):
+    """Свободные слоты, вычисляемые из расписания и индекса занятости."""
+
+    def test_started_interval_hidden(self):
+        rows = available_slots(
+            self.establishment.id, slot_date=self.now.date()
+        )
+        self.assertEqual(next(rows)["time"], "18:00")
+
+    def test_interval_start_offered(self):
+        with freeze(self.now.replace(minute=30)):
+            rows = available_slots(
+                self.establishment.id, slot_date=self.now.date()
+            )
+            self.assertEqual(next(rows)["time"], "17:30")
+
+    @override_settings(SLOTS_ENGINE=SLOTS_ENGINE_MATERIALIZED)
+    def test_materialized_from_occupancy(self):
+        generate_slots()
+        booked = Slot.objects.filter(
+            table=self.tables[0], date=self.now.date(), time="18:00"
+        )
+        occupy_slots(booked)
+        results = self.get(date=self.now.date(), seats=2)["results"]
+        self.assertEqual(results[0]["time"], "18:30")
+        slots = Slot.objects.filter(
+            table=self.tables[0], date=self.now.date()
+        ).values_list("time", "id")
+        self.assertEqual(
+            {row["time"]: row["id"] for row in results},
+            {time: slot_id for time, slot_id in slots if time >= "18:30"},
+        )
+
+
+class SlotsPaginationTest(SlotsTestCase):
+    """
+    Оба движка слотов отдают одинаковый курсорный ответ и листают
+    страницы по (starts_at, table_id) без пропусков и повторов.
+    """
+
+    def walk(self):
+        page = self.get(date=self.now.date(), page_size=3)
+        pages = [page]
+        while page["next"]:
+            page = self.get(page["next"])
+            pages.append(page)
+        return pages
+
+    def assert_pages(self):
+        pages = self.walk()
+        rows = [
+            (row["time"], row["table"])
+            for page in pages
+            for row in page["results"]
+        ]
+        # 18:00 - 22:00 по 30 минут на двух столиках
+        self.assertEqual(len(rows), 9 * 2)
+        self.assertEqual(rows, sorted(rows))
+        self.assertIsNone(pages[0]["previous"])
+        self.assertEqual(
+            self.get(pages[1]["previous"])["results"],
+            pages[0]["results"],
+        )
+
+    @override_settings(SLOTS_ENGINE=SLOTS_ENGINE_MATERIALIZED)
+    def test_materialized(self):
+        generate_slots()
+        self.assert_pages()
+
+    @override_settings(SLOTS_ENGINE=SLOTS_ENGINE_COMPUTED)
+    def test_computed(self):
+        self.assert_pages()
+
+
+@override_settings(SLOTS_ENGINE=SLOTS_ENGINE_MATERIALIZED)
+class DoubleBookingTest(SlotsTestCase):
+    """Занятый слот нельзя забронировать повторно: ответ 409."""
+
+    def test_double_booking(self):
+        generate_slots()
+        slot = Slot.objects.get(
+            table=self.tables[0], date=self.now.date(), time="18:00"
+        )
+        response = self.reserve({"slots": [slot.id]})
+        self.assertEqual(response.status_code, 201, response.data)
+        response = self.reserve({"slots": [slot.id]}, email="other@test.ru")
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(Reservation.objects.filter(slots=slot).count(), 1)
+        slot.refresh_from_db()
+        self.assertFalse(slot.is_active)
+
+
+@override_settings(SLOTS_ENGINE=SLOTS_ENGINE_COMPUTED)
+class ComputedBookingTest(SlotsTestCase):
+    """
+    Список слотов только читает записи слотов, запись для интервала
+    создается при бронировании.
+    """
+
+    def book(self, **interval):
+        return self.reserve({"intervals": [interval]})
+
+    def test_list_is_read_only(self):
+        results = self.get(date=self.now.date())["results"]
+        self.assertIsNone(results[0]["id"])
+        self.assertFalse(Slot.objects.exists())
+
+    def test_book_interval(self):
+        row = self.get(date=self.now.date(), seats=4)["results"][0]
+        interval = {
+            "table_id": row["table_id"],
+            "date": row["date"],
+            "time": row["time"],
+        }
+        response = self.book(**interval)
+        self.assertEqual(response.status_code, 201, response.data)
+        slot = Slot.objects.get()
+        self.assertFalse(slot.is_active)
+        self.assertEqual(
+            self.get(date=self.now.date(), seats=4)["results"][0]["time"],
+            "18:30",
+        )
+        self.assertEqual(self.book(**interval).status_code, 409)
+
+    def test_unavailable_interval(self):
+        for interval in (
+            {"time": "17:30"},
+            {"time": "23:00"},
+            {"table_id": 0},
+        ):
+            with self.subTest(**interval):
+                response = self.book(
+                    **{
+                        "table_id": self.tables[0].id,
+                        "date": str(self.now.date()),
+                        "time": "18:00",
+                        **interval,
+                    }
+                )
+                self.assertEqual(response.status_code, 409)
+        self.assertFalse(Slot.objects.exists())
+
+    def test_incomplete_interval(self):
+        response = self.book(table_id=self.tables[0].id)
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(SLOTS_ENGINE=SLOTS_ENGINE_MATERIALIZED)
+class EstablishmentSlotsSyncTest(SlotsTestCase):
+    """Обновление слотов заведения при смене расписания и верификации."""
+
+    # Свободные дни и координаты заведения для проверки не нужны
+    @mock.patch("api.v2.serializers.establishments.days_available")
+    @mock.patch("establishments.signals.days_available")
+    @mock.patch("establishments.signals.Nominatim")
+    @mock.patch("core.tasks.sync_establishment_slots.delay")
+    def test_schedule_edit_single_task(self, delay, nominatim, *mocks):
+        nominatim.return_value.geocode.return_value = None
+        serializer = EstablishmentEditSerializer(
+            self.establishment,
+            data={
+                "worked": [
+                    {
+                        "day": day,
+                        "start": "12:00",
+                        "end": "20:00",
+                        "day_off": False,
+                    }
+                    for day in DAYS
+                ]
+            },
+            partial=True,
+        )
+        serializer.is_valid(raise_exception=True)
+        with self.captureOnCommitCallbacks(execute=True):
+            serializer.save()
+        delay.assert_called_once_with(self.establishment.id, None)
+
+    def test_unverified_retires_free_slots(self):
+        generate_slots()
+        booked = Slot.objects.filter(
+            table=self.tables[0], date=self.now.date(), time="18:00"
+        )
+        occupy_slots(booked)
+        Establishment.objects.filter(id=self.establishment.id).update(
+            is_verified=False
+        )
+        report = sync_establishment_slots(self.establishment.id)
+        self.assertGreater(report["retired"], 0)
+        self.assertEqual(
+            list(Slot.objects.filter(starts_at__gte=self.now)),
+            list(booked),
+        )
@@ -2,7 +2,13 @@ from django_filters.rest_framework import filters, FilterSet
 from rest_framework.filters import SearchFilter
 from rest_framework.validators import ValidationError
 
-from core.choices import CHECK_CHOICES
+from core.choices import CHECK_CHOICES, LOCATION_ORDERS
+from core.constants import (
+    LOCATION_MAX_RADIUS_KM,
+    LOCATION_ORDER_DISTANCE,
+    LOCATION_RADIUS_KM,
+)
+from establishments.geo import nearby
 from establishments.models import (
     Establishment,
     Service,
@@ -44,6 +50,17 @@ class EstablishmentFilter(FilterSet):
     location = filters.CharFilter(
         label="Местоположение", method="filter_location"
     )
+    radius = filters.NumberFilter(
+        label="Радиус поиска рядом, км", method="filter_nearby_options"
+    )
+    order = filters.ChoiceFilter(
+        label="Сортировка заведений рядом",
+        choices=LOCATION_ORDERS,
+        method="filter_nearby_options",
+    )
+    rating = filters.NumberFilter(
+        field_name="rating", lookup_expr="gte", label="Рейтинг не ниже"
+    )
 
     class Meta:
         model = Establishment
@@ -55,6 +72,9 @@ class EstablishmentFilter(FilterSet):
             "cities",
             "is_favorited",
             "location",
+            "radius",
+            "order",
+            "rating",
         ]
 
     def filters_favorited(self, queryset, name, value):
@@ -66,18 +86,39 @@ class EstablishmentFilter(FilterSet):
         return Establishment.objects.all()
 
     def filter_location(self, queryset, name, value):
+        """
+        Заведения в радиусе radius км (по умолчанию LOCATION_RADIUS_KM)
+        от точки "широта,долгота" с расстоянием distance, при order=distance
+        - от ближних к дальним.
+        """
         try:
-            lat, lon = map(float, value.split(","))
-            return queryset.filter(
-                latitude__range=(lat - 0.05, lat + 0.05),
-                longitude__range=(lon - 0.05, lon + 0.05),
-            )
+            latitude, longitude = map(float, value.split(","))
         except ValueError:
             raise ValidationError(
                 {
                     "location": "Введите корректную позицию в формате широта,долгота"
                 }
             )
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            raise ValidationError(
+                {"location": "Широта или долгота вне допустимых значений"}
+            )
+        radius = self.form.cleaned_data.get("radius") or LOCATION_RADIUS_KM
+        if not 0 < radius <= LOCATION_MAX_RADIUS_KM:
+            raise ValidationError(
+                {
+                    "radius": f"Радиус должен быть от 0 "
+                    f"до {LOCATION_MAX_RADIUS_KM} км"
+                }
+            )
+        queryset = nearby(queryset, latitude, longitude, float(radius))
+        if self.form.cleaned_data.get("order") == LOCATION_ORDER_DISTANCE:
+            return queryset.order_by("distance", "id")
+        return queryset
+
+    def filter_nearby_options(self, queryset, name, value):
+        """radius и order применяются в filter_location"""
+        return queryset
 
 
 class CityFilter(SearchFilter):
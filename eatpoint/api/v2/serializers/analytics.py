@@ -1,4 +1,15 @@
 from rest_framework import serializers
+from rest_framework.reverse import reverse
+
+from analytics.exports import parquet_available
+from analytics.models import AnalyticsExport
+from core.constants import (
+    EXPORT_DONE,
+    EXPORT_PARQUET,
+    UTILIZATION_DAYS,
+    UTILIZATION_KEEP_DAYS,
+)
+from establishments.models import Establishment
 
 from django.utils.timezone import now
 
@@ -97,3 +108,198 @@ class AnalyticsDynamicSerializer(serializers.Serializer):
             "yearly_reservation": instance.get("yearly_reservation"),
         }
         return representation
+
+
+class AnalyticsCacheSerializer(serializers.Serializer):
+    """Статистика кэша аналитики"""
+
+    hits = serializers.IntegerField(help_text="Попаданий в кэш")
+    misses = serializers.IntegerField(help_text="Промахов кэша")
+    hit_rate = serializers.FloatField(help_text="Доля попаданий")
+
+
+class AnalyticsExportSerializer(serializers.ModelSerializer):
+    """Выгрузка броней: параметры, статус и ссылка на файл"""
+
+    establishment = serializers.PrimaryKeyRelatedField(
+        queryset=Establishment.objects.all(),
+        required=False,
+        allow_null=True,
+    )
+    download = serializers.SerializerMethodField(
+        help_text="Ссылка на скачивание файла (только владельцу)"
+    )
+
+    class Meta:
+        model = AnalyticsExport
+        fields = (
+            "id",
+            "establishment",
+            "source",
+            "format",
+            "start_date",
+            "end_date",
+            "status",
+            "download",
+            "rows",
+            "error",
+            "created_at",
+            "started_at",
+            "finished_at",
+        )
+        read_only_fields = (
+            "status",
+            "rows",
+            "error",
+            "created_at",
+            "started_at",
+            "finished_at",
+        )
+
+    def get_download(self, export) -> str | None:
+        if export.status != EXPORT_DONE or not export.file:
+            return None
+        return reverse(
+            "api_v2:analytics-exports-download",
+            args=[export.id],
+            request=self.context.get("request"),
+        )
+
+    def validate_establishment(self, establishment):
+        if (
+            establishment is not None
+            and establishment.owner != self.context["request"].user
+        ):
+            raise serializers.ValidationError(
+                "Вы не являетесь владельцем этого заведения"
+            )
+        return establishment
+
+    def validate_format(self, value):
+        if value == EXPORT_PARQUET and not parquet_available():
+            raise serializers.ValidationError(
+                "Выгрузка в Parquet недоступна на сервере"
+            )
+        return value
+
+    def validate(self, data):
+        start_date, end_date = data.get("start_date"), data.get("end_date")
+        if start_date and end_date and start_date > end_date:
+            raise serializers.ValidationError("Начало периода позже его конца")
+        return data
+
+
+class SnapshotQuerySerializer(serializers.Serializer):
+    """Параметры аналитики по снимку броней"""
+
+    establishment = serializers.IntegerField(
+        required=False, help_text="Заведение (по умолчанию все)"
+    )
+
+
+class FunnelStepsSerializer(serializers.Serializer):
+    """Шаги воронки бронирования"""
+
+    created = serializers.IntegerField(help_text="Создано броней")
+    accepted = serializers.IntegerField(help_text="Подтверждено")
+    visited = serializers.IntegerField(help_text="Посещено")
+    cancelled = serializers.IntegerField(help_text="Отменено")
+    no_show = serializers.IntegerField(help_text="Неявки")
+    acceptance_rate = serializers.FloatField(help_text="Доля подтвержденных")
+    visit_rate = serializers.FloatField(
+        help_text="Доля посещенных среди подтвержденных"
+    )
+    no_show_rate = serializers.FloatField(
+        help_text="Доля неявок среди подтвержденных"
+    )
+
+
+class FunnelEstablishmentSerializer(FunnelStepsSerializer):
+    """Воронка бронирования заведения"""
+
+    establishment = serializers.IntegerField(help_text="Заведение")
+
+
+class AnalyticsFunnelSerializer(serializers.Serializer):
+    """Воронка бронирования по заведениям"""
+
+    snapshot_at = serializers.DateTimeField(help_text="Время снимка")
+    total = FunnelStepsSerializer(help_text="По всем заведениям")
+    establishments = FunnelEstablishmentSerializer(many=True)
+
+
+class LeadTimeBinSerializer(serializers.Serializer):
+    """Интервал распределения времени до брони"""
+
+    from_hours = serializers.IntegerField(help_text="От, часов")
+    to_hours = serializers.IntegerField(
+        allow_null=True, help_text="До, часов (null - без ограничения)"
+    )
+    count = serializers.IntegerField(help_text="Броней")
+
+
+class AnalyticsLeadTimeSerializer(serializers.Serializer):
+    """Распределение времени от создания брони до визита"""
+
+    snapshot_at = serializers.DateTimeField(help_text="Время снимка")
+    bookings = serializers.IntegerField(help_text="Учтено броней")
+    median_hours = serializers.FloatField(
+        allow_null=True, help_text="Медиана, часов"
+    )
+    p90_hours = serializers.FloatField(
+        allow_null=True, help_text="90-й перцентиль, часов"
+    )
+    bins = LeadTimeBinSerializer(many=True)
+
+
+class CohortSerializer(serializers.Serializer):
+    """Когорта гостей по месяцу первого визита"""
+
+    cohort = serializers.CharField(help_text="Месяц первого визита")
+    guests = serializers.IntegerField(help_text="Гостей в когорте")
+    retention = serializers.ListField(
+        child=serializers.IntegerField(),
+        help_text="Гостей, пришедших через 0, 1, 2... месяцев",
+    )
+
+
+class AnalyticsCohortsSerializer(serializers.Serializer):
+    """Когорты гостей и повторные визиты"""
+
+    snapshot_at = serializers.DateTimeField(help_text="Время снимка")
+    guests = serializers.IntegerField(help_text="Гостей с визитами")
+    repeat_guests_rate = serializers.FloatField(
+        help_text="Доля гостей с повторными визитами"
+    )
+    cohorts = CohortSerializer(many=True)
+
+
+class UtilizationQuerySerializer(SnapshotQuerySerializer):
+    """Параметры карты загрузки зон"""
+
+    days = serializers.IntegerField(
+        min_value=1,
+        max_value=UTILIZATION_KEEP_DAYS,
+        default=UTILIZATION_DAYS,
+        help_text="За сколько последних дней строится карта",
+    )
+
+
+class ZoneUtilizationSerializer(serializers.Serializer):
+    """Загрузка зоны заведения по часам недели"""
+
+    establishment = serializers.IntegerField(help_text="Заведение")
+    zone = serializers.IntegerField(help_text="Зона")
+    name = serializers.CharField(help_text="Название зоны")
+    seat_hours = serializers.FloatField(help_text="Место-часы по расписанию")
+    booked_seat_hours = serializers.FloatField(help_text="Занятые место-часы")
+    occupancy = serializers.FloatField(help_text="Доля занятых мест")
+    matrix = serializers.ListField(
+        child=serializers.ListField(
+            child=serializers.FloatField(allow_null=True)
+        ),
+        help_text=(
+            "Доля занятых мест: 7 дней недели (с понедельника) x 24 часа, "
+            "null - зона не работает"
+        ),
+    )
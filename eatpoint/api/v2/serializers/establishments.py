@@ -1,3 +1,4 @@
+from django.db import transaction
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import (
     extend_schema_field,
@@ -6,6 +7,7 @@ from drf_spectacular.utils import (
 from rest_framework import serializers
 
 from core.choices import DAY_CHOICES
+from core.mixins import SparseFieldsSerializerMixin
 from core.services import days_available
 from core.validators import validate_uniq
 from establishments.models import (
@@ -19,6 +21,8 @@ from establishments.models import (
     TypeEst,
     City,
 )
+from establishments.signals import enqueue_establishment_slots
+from reservation.models import Availability
 
 
 class KitchenSerializer(serializers.ModelSerializer):
@@ -187,7 +191,9 @@ class ZoneSmallSerializer(serializers.ModelSerializer):
         fields = ("zone", "seats")
 
 
-class EstablishmentSerializer(serializers.ModelSerializer):
+class EstablishmentSerializer(
+    SparseFieldsSerializerMixin, serializers.ModelSerializer
+):
     """Сериализация данных: Заведение"""
 
     owner = serializers.CharField(source="email")
@@ -223,6 +229,7 @@ class EstablishmentSerializer(serializers.ModelSerializer):
     is_favorited = serializers.SerializerMethodField("get_is_favorited")
     rating = serializers.SerializerMethodField("get_rating")
     review_count = serializers.SerializerMethodField("get_review_count")
+    distance = serializers.SerializerMethodField("get_distance")
 
     class Meta:
         model = Establishment
@@ -248,27 +255,38 @@ class EstablishmentSerializer(serializers.ModelSerializer):
             "images",
             "rating",
             "review_count",
+            "distance",
         ]
 
     @extend_schema_field(OpenApiTypes.BOOL)
     def get_is_favorited(self, instance):
-        """Отображение заведения в избранном"""
+        """
+        Отображение заведения в избранном: аннотация is_favorited
+        из вьюсета, без нее - отдельный запрос.
+        """
+        if hasattr(instance, "is_favorited"):
+            return instance.is_favorited
         request = self.context.get("request")
-        user = request.user
-        if request is None or user.is_anonymous:
+        if request is None or request.user.is_anonymous:
             return False
-        return instance.favorite.filter(user=user).exists()
+        return instance.favorite.filter(user=request.user).exists()
 
     @extend_schema_field(OpenApiTypes.FLOAT)
     def get_rating(self, instance):
         """Отображение среднего рейтинга заведения"""
-        return instance.rating
+        return instance.rating if instance.review_count else None
 
     @extend_schema_field(OpenApiTypes.INT)
     def get_review_count(self, instance):
         """Отображение количества отзывов заведения"""
         return instance.review_count
 
+    @extend_schema_field(OpenApiTypes.FLOAT)
+    def get_distance(self, instance):
+        """Расстояние до заведения в км (при поиске по location)"""
+        distance = getattr(instance, "distance", None)
+        return None if distance is None else round(distance, 2)
+
 
 class EstablishmentEditSerializer(serializers.ModelSerializer):
     """Сериализация данных(запись): Заведение"""
@@ -360,7 +378,9 @@ class EstablishmentEditSerializer(serializers.ModelSerializer):
             )
 
     def __create_availavle(self, establishment):
-        days_available(establishment, ZoneEstablishment, WorkEstablishment)
+        days_available(
+            establishment, ZoneEstablishment, WorkEstablishment, Availability
+        )
 
     def __create_social(self, socials, establishment):
         """Создание соц.сетей"""
@@ -392,12 +412,16 @@ class EstablishmentEditSerializer(serializers.ModelSerializer):
         self.__create_availavle(establishment)
         return establishment
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         if "worked" in validated_data:
             worked = validated_data.pop("worked")
             WorkEstablishment.objects.filter(establishment=instance).delete()
             instance.worked.clear()
             self.__create_work(worked, instance)
+            # Новое расписание создается bulk_create без сигналов:
+            # одна задача на заведение вместе с днями удаленных записей
+            enqueue_establishment_slots(instance.id)
         if "zones" in validated_data:
             zones = validated_data.pop("zones")
             ZoneEstablishment.objects.filter(establishment=instance).delete()
@@ -1,6 +1,6 @@
 from rest_framework import serializers
 
-from core.choices import RESERVATION_STATUS
+from core.choices import RESERVATION_STATUS, TIME_CHOICES
 from establishments.models import ZoneEstablishment, Establishment
 from reservation.models import (
     Reservation,
@@ -15,6 +15,24 @@ class SlotSerializer(serializers.ModelSerializer):
         fields = ("id",)
 
 
+class SlotIntervalSerializer(serializers.Serializer):
+    """Свободный интервал столика без записи слота"""
+
+    table_id = serializers.IntegerField()
+    date = serializers.DateField()
+    time = serializers.ChoiceField(choices=TIME_CHOICES)
+
+    def validate(self, attrs):
+        # Форма брони проверяется с partial=True, он действует
+        # и на вложенные интервалы: обязательность проверяется здесь
+        missing = set(self.fields) - set(attrs)
+        if missing:
+            raise serializers.ValidationError(
+                {name: "Обязательное поле." for name in sorted(missing)}
+            )
+        return attrs
+
+
 class ReservationsUnregUserSerializer(serializers.ModelSerializer):
     """Сериализация данных:
     форма бронирования для не авторизованного пользователя"""
@@ -22,12 +40,16 @@ class ReservationsUnregUserSerializer(serializers.ModelSerializer):
     slots = serializers.PrimaryKeyRelatedField(
         many=True, queryset=Slot.objects.all()
     )
+    intervals = SlotIntervalSerializer(
+        many=True, required=False, write_only=True
+    )
 
     class Meta:
         model = Reservation
         fields = (
             "id",
             "slots",
+            "intervals",
             "first_name",
             "last_name",
             "email",
@@ -49,6 +71,9 @@ class ReservationsUserSerializer(serializers.ModelSerializer):
     slots = serializers.PrimaryKeyRelatedField(
         many=True, queryset=Slot.objects.all()
     )
+    intervals = SlotIntervalSerializer(
+        many=True, required=False, write_only=True
+    )
 
     class Meta:
         model = Reservation
@@ -58,6 +83,7 @@ class ReservationsUserSerializer(serializers.ModelSerializer):
             "start_time_reservation",
             "establishment",
             "slots",
+            "intervals",
             "comment",
             "reminder_one_day",
             "reminder_three_hours",
@@ -76,6 +102,10 @@ class UpdateReservationActionSerializer(serializers.ModelSerializer):
 class ReservationsHistoryEditSerializer(serializers.ModelSerializer):
     """История бронирования"""
 
+    establishment = serializers.CharField(
+        source="establishment_name", read_only=True
+    )
+
     class Meta:
         model = ReservationHistory
         fields = (
@@ -88,9 +118,7 @@ class ReservationsHistoryEditSerializer(serializers.ModelSerializer):
 class ZoneReservationsListSerializer(serializers.ModelSerializer):
     class Meta:
         model = ZoneEstablishment
-        fields = (
-            "zone",
-        )
+        fields = ("zone",)
 
 
 class SpecialEstablishmentSerializer(serializers.ModelSerializer):
@@ -200,6 +228,7 @@ class AvailableSlotsSerializer(serializers.ModelSerializer):
     establishment = serializers.CharField(source="establishment__name")
     zone = serializers.CharField(source="zone__zone")
     table = serializers.CharField(source="table__number")
+    table_id = serializers.IntegerField()
     seats = serializers.CharField(source="table__seats")
 
     class Meta:
@@ -211,5 +240,6 @@ class AvailableSlotsSerializer(serializers.ModelSerializer):
             "establishment",
             "zone",
             "table",
+            "table_id",
             "seats",
         )
@@ -2,8 +2,14 @@ from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
 from api.v2.views.analytics import (
+    AnalyticsCacheStatsView,
+    AnalyticsCohortsView,
+    AnalyticsExportViewSet,
+    AnalyticsFunnelView,
     AnalyticsHistoryListViewSet,
     AnalyticsHistoryViewSet,
+    AnalyticsLeadTimeView,
+    AnalyticsUtilizationView,
     AnalyticsViewSet,
     AnalyticsListViewSet,
 )
@@ -79,6 +85,11 @@ router_v2.register(
     ReservationsRestorateurListViewSet,
     basename="reservations-business",
 )
+router_v2.register(
+    "business/analytics/exports",
+    AnalyticsExportViewSet,
+    basename="analytics-exports",
+)
 router_v2.register(
     "business/establishments",
     EstablishmentBusinessViewSet,
@@ -140,6 +151,11 @@ urlpatterns = [
         DjoserUserViewSet.as_view({"post": "reset_password_confirm"}),
         name="reset_password_confirm",
     ),
+    path(
+        "business/analytics/cache/",
+        AnalyticsCacheStatsView.as_view(),
+        name="establishment-analytics-cache",
+    ),
     path(
         "business/analytics/<int:establishment_id>/",
         AnalyticsViewSet.as_view(),
@@ -150,6 +166,26 @@ urlpatterns = [
         AnalyticsListViewSet.as_view(),
         name="establishment-analytics-list",
     ),
+    path(
+        "business/analytics/funnel/",
+        AnalyticsFunnelView.as_view(),
+        name="establishment-analytics-funnel",
+    ),
+    path(
+        "business/analytics/lead-time/",
+        AnalyticsLeadTimeView.as_view(),
+        name="establishment-analytics-lead-time",
+    ),
+    path(
+        "business/analytics/cohorts/",
+        AnalyticsCohortsView.as_view(),
+        name="establishment-analytics-cohorts",
+    ),
+    path(
+        "business/analytics/utilization/",
+        AnalyticsUtilizationView.as_view(),
+        name="establishment-analytics-utilization",
+    ),
     path(
         "business/analytics/history/<int:establishment_id>/",
         AnalyticsHistoryViewSet.as_view(),
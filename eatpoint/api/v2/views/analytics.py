@@ -1,26 +1,107 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 
+from django.db import transaction
+from django.http import FileResponse
 from drf_spectacular.utils import extend_schema, extend_schema_view
-from rest_framework import status
+from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
 from rest_framework.views import APIView
-from rest_framework.permissions import IsAuthenticated
-from rest_framework.exceptions import PermissionDenied
-from django.utils.timezone import now
-from django.db.models import Count
-from django.db.models.functions import ExtractWeek, ExtractMonth
-from django.db.models import Q
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.exceptions import NotFound, PermissionDenied
 
 
+from analytics import metrics
+from analytics.cache import cache_stats, cached_analytics
+from analytics.models import (
+    AnalyticsExport,
+    ReservationDailyStats,
+    ZoneUtilization,
+)
+from analytics.queries import AnalyticsQuery
+from analytics.snapshots import load_snapshot, refresh_snapshot
+from analytics.utilization import utilization_heatmap
 from api.permissions import IsRestorateur
 from api.v2.serializers.analytics import (
+    AnalyticsCacheSerializer,
+    AnalyticsCohortsSerializer,
+    AnalyticsExportSerializer,
+    AnalyticsFunnelSerializer,
+    AnalyticsLeadTimeSerializer,
     AnalyticsStaticSerializer,
     AnalyticsDynamicSerializer,
+    SnapshotQuerySerializer,
+    UtilizationQuerySerializer,
+    ZoneUtilizationSerializer,
 )
+from core.constants import EXPORT_DONE
+from core.tasks import export_analytics
 from establishments.models import Establishment
-from reservation.models import Reservation, ReservationHistory
 from rest_framework.response import Response
 
 
+class BaseAnalyticsView(APIView):
+    """
+    Общая логика аналитики: выборка сводной статистики владельца
+    и построение ответа через AnalyticsQuery.
+
+    counter - счетчик статистики, по которому строится аналитика.
+    """
+
+    permission_classes = (IsAuthenticated, IsRestorateur)
+    counter = "created"
+
+    def get_stats(self, establishment_id=None):
+        stats = ReservationDailyStats.objects.filter(
+            establishment__owner=self.request.user
+        )
+        if establishment_id is not None:
+            stats = stats.filter(establishment_id=establishment_id)
+        return stats
+
+    def cached(self, establishment_id, period, build):
+        """Ответ из кэша аналитики владельца."""
+        return cached_analytics(
+            self.request.user.id,
+            (establishment_id or "all", self.counter, *period),
+            build,
+        )
+
+    def static_response(self, establishment_id=None):
+        query = AnalyticsQuery(self.get_stats(establishment_id), self.counter)
+        today = datetime.now().date()
+        data = self.cached(
+            establishment_id,
+            ("static", today),
+            lambda: AnalyticsStaticSerializer(query.static(today)).data,
+        )
+        return Response(data, status=status.HTTP_200_OK)
+
+    def dynamic_response(self, request, establishment_id=None):
+        serializer = AnalyticsDynamicSerializer(data=request.data)
+        if not serializer.is_valid():
+            error_message = (
+                "Некорректные данные. Пожалуйста, проверьте запрос."
+            )
+            return Response(
+                {"error": error_message}, status=status.HTTP_400_BAD_REQUEST
+            )
+        start_date = serializer.validated_data["start_date"]
+        end_date = serializer.validated_data["end_date"]
+        period = (
+            start_date and start_date.date(),
+            end_date and end_date.date(),
+        )
+        query = AnalyticsQuery(
+            self.get_stats(establishment_id), self.counter, *period
+        )
+        data = self.cached(
+            establishment_id,
+            ("dynamic", *period),
+            lambda: AnalyticsDynamicSerializer(query.dynamic()).data,
+        )
+        return Response(data, status=status.HTTP_200_OK)
+
+
 @extend_schema(
     tags=["Бизнес(аналитика заведения)"],
     description="Ресторатор",
@@ -34,7 +115,7 @@ from rest_framework.response import Response
         summary="Получить историю бронирования за день, неделю и год",
     ),
 )
-class AnalyticsHistoryViewSet(APIView):
+class AnalyticsHistoryViewSet(BaseAnalyticsView):
     """
     Аналитика для 1 заведения.
 
@@ -53,7 +134,7 @@ class AnalyticsHistoryViewSet(APIView):
 
     """
 
-    permission_classes = (IsAuthenticated, IsRestorateur)
+    counter = "visited"
 
     @extend_schema(
         responses=AnalyticsStaticSerializer,
@@ -72,64 +153,7 @@ class AnalyticsHistoryViewSet(APIView):
                 "Вы не являетесь владельцем этого заведения"
             )
 
-        now_date = datetime.now().date()
-
-        total_reservation = ReservationHistory.objects.filter(
-            establishment=establishment_id
-        ).count()
-
-        daily_reservation = ReservationHistory.objects.filter(
-            establishment=establishment_id,
-            reservation_date__year=now_date.year,
-            reservation_date__month=now_date.month,
-            reservation_date__day=now_date.day,
-        ).count()
-
-        weekly_reservation = ReservationHistory.objects.filter(
-            establishment=establishment_id,
-            reservation_date__week=ExtractWeek(now_date),
-        ).count()
-
-        monthly_reservation = (
-            ReservationHistory.objects.filter(
-                establishment=establishment_id,
-                reservation_date__year=now_date.year,
-            )
-            .annotate(month=ExtractMonth("reservation_date"))
-            .values("month")
-            .annotate(monthly_count=Count("id"))
-        )
-
-        yearly_reservation = (
-            ReservationHistory.objects.filter(
-                establishment=establishment_id,
-                reservation_date__year=now_date.year,
-            )
-            .values(
-                "reservation_date__year",
-            )
-            .annotate(yearly_count=Count("id"))
-        )
-
-        daily_reservations_by_day = (
-            ReservationHistory.objects.filter(
-                establishment=establishment_id,
-            )
-            .values("reservation_date__date")
-            .annotate(reservation_count=Count("id"))
-        )
-
-        aggregated_data = {
-            "total_reservation": total_reservation,
-            "daily_reservation": daily_reservation,
-            "weekly_reservation": weekly_reservation,
-            "monthly_reservation": list(monthly_reservation),
-            "yearly_reservation": yearly_reservation,
-            "daily_reservations_by_day": list(daily_reservations_by_day),
-        }
-
-        serializer = AnalyticsStaticSerializer(aggregated_data)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return self.static_response(establishment_id)
 
     @extend_schema(
         responses=AnalyticsDynamicSerializer,
@@ -142,69 +166,7 @@ class AnalyticsHistoryViewSet(APIView):
         :param request: Объект запроса REST API.
         :return: Данные динамической аналитики или сообщение об ошибке.
         """
-        user = self.request.user
-        serializer = AnalyticsDynamicSerializer(data=request.data)
-        if serializer.is_valid():
-            start_date = serializer.validated_data["start_date"]
-            end_date = serializer.validated_data["end_date"]
-
-            filters = Q(establishment__owner=user)
-            if start_date and end_date:
-                filters &= Q(reservation_date__range=[start_date, end_date])
-
-            total_reservation = ReservationHistory.objects.filter(
-                filters,
-                establishment=establishment_id,
-            ).count()
-
-            daily_reservations_by_day = (
-                ReservationHistory.objects.filter(
-                    filters,
-                    establishment=establishment_id,
-                )
-                .values("reservation_date__date")
-                .annotate(reservation_count=Count("id"))
-            )
-
-            monthly_reservations_by_month = (
-                ReservationHistory.objects.filter(
-                    filters,
-                    establishment=establishment_id,
-                )
-                .annotate(month=ExtractMonth("reservation_date"))
-                .values("month")
-                .annotate(monthly_count=Count("id"))
-            )
-
-            yearly_reservation = (
-                ReservationHistory.objects.filter(
-                    filters,
-                    establishment=establishment_id,
-                )
-                .values(
-                    "reservation_date__year",
-                )
-                .annotate(yearly_count=Count("id"))
-            )
-
-            aggregated_data = {
-                "total_reservation": total_reservation,
-                "daily_reservations_by_day": list(daily_reservations_by_day),
-                "monthly_reservations_by_month": list(
-                    monthly_reservations_by_month
-                ),
-                "yearly_reservation": list(yearly_reservation),
-            }
-
-            serializer = AnalyticsDynamicSerializer(aggregated_data)
-            return Response(serializer.data, status=status.HTTP_200_OK)
-        else:
-            error_message = (
-                "Некорректные данные. Пожалуйста, проверьте запрос."
-            )
-            return Response(
-                {"error": error_message}, status=status.HTTP_400_BAD_REQUEST
-            )
+        return self.dynamic_response(request, establishment_id)
 
 
 @extend_schema(
@@ -220,7 +182,7 @@ class AnalyticsHistoryViewSet(APIView):
         summary="Аналитика бронирования за день, неделю и год",
     ),
 )
-class AnalyticsViewSet(APIView):
+class AnalyticsViewSet(BaseAnalyticsView):
     """
     Аналитика для 1 заведения.
 
@@ -239,7 +201,7 @@ class AnalyticsViewSet(APIView):
 
     """
 
-    permission_classes = (IsAuthenticated, IsRestorateur)
+    counter = "created"
 
     @extend_schema(
         responses=AnalyticsStaticSerializer,
@@ -258,64 +220,7 @@ class AnalyticsViewSet(APIView):
                 "Вы не являетесь владельцем этого заведения"
             )
 
-        now_date = datetime.now().date()
-
-        total_reservation = Reservation.objects.filter(
-            establishment=establishment_id
-        ).count()
-
-        daily_reservation = Reservation.objects.filter(
-            establishment=establishment_id,
-            reservation_date__year=now_date.year,
-            reservation_date__month=now_date.month,
-            reservation_date__day=now_date.day,
-        ).count()
-
-        weekly_reservation = Reservation.objects.filter(
-            establishment=establishment_id,
-            reservation_date__week=ExtractWeek(now_date),
-        ).count()
-
-        monthly_reservation = (
-            Reservation.objects.filter(
-                establishment=establishment_id,
-                reservation_date__year=now_date.year,
-            )
-            .annotate(month=ExtractMonth("reservation_date"))
-            .values("month")
-            .annotate(monthly_count=Count("id"))
-        )
-
-        yearly_reservation = (
-            Reservation.objects.filter(
-                establishment=establishment_id,
-                reservation_date__year=now_date.year,
-            )
-            .values(
-                "reservation_date__year",
-            )
-            .annotate(yearly_count=Count("id"))
-        )
-
-        daily_reservations_by_day = (
-            Reservation.objects.filter(
-                establishment=establishment_id,
-            )
-            .values("reservation_date__date")
-            .annotate(reservation_count=Count("id"))
-        )
-
-        aggregated_data = {
-            "total_reservation": total_reservation,
-            "daily_reservation": daily_reservation,
-            "weekly_reservation": weekly_reservation,
-            "monthly_reservation": list(monthly_reservation),
-            "yearly_reservation": yearly_reservation,
-            "daily_reservations_by_day": list(daily_reservations_by_day),
-        }
-
-        serializer = AnalyticsStaticSerializer(aggregated_data)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return self.static_response(establishment_id)
 
     @extend_schema(
         responses=AnalyticsDynamicSerializer,
@@ -328,69 +233,7 @@ class AnalyticsViewSet(APIView):
         :param request: Объект запроса REST API.
         :return: Данные динамической аналитики или сообщение об ошибке.
         """
-        user = self.request.user
-        serializer = AnalyticsDynamicSerializer(data=request.data)
-        if serializer.is_valid():
-            start_date = serializer.validated_data["start_date"]
-            end_date = serializer.validated_data["end_date"]
-
-            filters = Q(establishment__owner=user)
-            if start_date and end_date:
-                filters &= Q(reservation_date__range=[start_date, end_date])
-
-            total_reservation = Reservation.objects.filter(
-                filters,
-                establishment=establishment_id,
-            ).count()
-
-            daily_reservations_by_day = (
-                Reservation.objects.filter(
-                    filters,
-                    establishment=establishment_id,
-                )
-                .values("reservation_date__date")
-                .annotate(reservation_count=Count("id"))
-            )
-
-            monthly_reservations_by_month = (
-                Reservation.objects.filter(
-                    filters,
-                    establishment=establishment_id,
-                )
-                .annotate(month=ExtractMonth("reservation_date"))
-                .values("month")
-                .annotate(monthly_count=Count("id"))
-            )
-
-            yearly_reservation = (
-                Reservation.objects.filter(
-                    filters,
-                    establishment=establishment_id,
-                )
-                .values(
-                    "reservation_date__year",
-                )
-                .annotate(yearly_count=Count("id"))
-            )
-
-            aggregated_data = {
-                "total_reservation": total_reservation,
-                "daily_reservations_by_day": list(daily_reservations_by_day),
-                "monthly_reservations_by_month": list(
-                    monthly_reservations_by_month
-                ),
-                "yearly_reservation": list(yearly_reservation),
-            }
-
-            serializer = AnalyticsDynamicSerializer(aggregated_data)
-            return Response(serializer.data, status=status.HTTP_200_OK)
-        else:
-            error_message = (
-                "Некорректные данные. Пожалуйста, проверьте запрос."
-            )
-            return Response(
-                {"error": error_message}, status=status.HTTP_400_BAD_REQUEST
-            )
+        return self.dynamic_response(request, establishment_id)
 
 
 @extend_schema(
@@ -406,14 +249,14 @@ class AnalyticsViewSet(APIView):
         summary="Получить историю бронирования за день, неделю и год",
     ),
 )
-class AnalyticsHistoryListViewSet(APIView):
+class AnalyticsHistoryListViewSet(BaseAnalyticsView):
     """
     Общая аналитика по всем заведениям.
 
     Этот класс предоставляет общую аналитику для пользователей со статусом 'is_restorateur'.
     """
 
-    permission_classes = (IsAuthenticated, IsRestorateur)
+    counter = "visited"
 
     @extend_schema(
         responses=AnalyticsStaticSerializer,
@@ -425,65 +268,7 @@ class AnalyticsHistoryListViewSet(APIView):
         :param request: Объект запроса REST API.
         :return: Данные статической аналитики.
         """
-        user = self.request.user
-        now_date = now().date()
-
-        filters = {"establishment__owner": user}
-        total_reservation = ReservationHistory.objects.filter(
-            **filters
-        ).count()
-
-        daily_reservation = ReservationHistory.objects.filter(
-            **filters,
-            reservation_date__year=now_date.year,
-            reservation_date__month=now_date.month,
-            reservation_date__day=now_date.day,
-        ).count()
-
-        weekly_reservation = ReservationHistory.objects.filter(
-            **filters,
-            reservation_date__week=ExtractWeek(now_date),
-        ).count()
-
-        monthly_reservation = (
-            ReservationHistory.objects.filter(
-                **filters,
-                reservation_date__year=now_date.year,
-            )
-            .annotate(month=ExtractMonth("reservation_date"))
-            .values("month")
-            .annotate(monthly_count=Count("id"))
-        )
-
-        yearly_reservation = (
-            ReservationHistory.objects.filter(
-                **filters, reservation_date__year=now_date.year
-            )
-            .values(
-                "reservation_date__year",
-            )
-            .annotate(yearly_count=Count("id"))
-        )
-
-        daily_reservations_by_day = (
-            ReservationHistory.objects.filter(
-                **filters,
-            )
-            .values("reservation_date__date")
-            .annotate(reservation_count=Count("id"))
-        )
-
-        aggregated_data = {
-            "total_reservation": total_reservation,
-            "daily_reservation": daily_reservation,
-            "weekly_reservation": weekly_reservation,
-            "monthly_reservation": list(monthly_reservation),
-            "yearly_reservation": yearly_reservation,
-            "daily_reservations_by_day": list(daily_reservations_by_day),
-        }
-
-        serializer = AnalyticsStaticSerializer(aggregated_data)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return self.static_response()
 
     @extend_schema(
         responses=AnalyticsDynamicSerializer,
@@ -497,59 +282,7 @@ class AnalyticsHistoryListViewSet(APIView):
         :return: Данные динамической аналитики или сообщение об ошибке.
         """
 
-        user = self.request.user
-        serializer = AnalyticsDynamicSerializer(data=request.data)
-        if serializer.is_valid():
-            start_date = serializer.validated_data["start_date"]
-            end_date = serializer.validated_data["end_date"]
-
-            filters = {"establishment__owner": user}
-            if start_date and end_date:
-                filters["reservation_date__range"] = [start_date, end_date]
-
-            total_reservation = ReservationHistory.objects.filter(
-                **filters
-            ).count()
-
-            daily_reservations_by_day = (
-                ReservationHistory.objects.filter(**filters)
-                .values("reservation_date__date")
-                .annotate(reservation_count=Count("id"))
-            )
-
-            monthly_reservations_by_month = (
-                ReservationHistory.objects.filter(**filters)
-                .annotate(month=ExtractMonth("reservation_date"))
-                .values("month")
-                .annotate(monthly_count=Count("id"))
-            )
-
-            yearly_reservation = (
-                ReservationHistory.objects.filter(**filters)
-                .values(
-                    "reservation_date__year",
-                )
-                .annotate(yearly_count=Count("id"))
-            )
-
-            aggregated_data = {
-                "total_reservation": total_reservation,
-                "daily_reservations_by_day": list(daily_reservations_by_day),
-                "monthly_reservations_by_month": list(
-                    monthly_reservations_by_month
-                ),
-                "yearly_reservation": list(yearly_reservation),
-            }
-
-            serializer = AnalyticsDynamicSerializer(aggregated_data)
-            return Response(serializer.data, status=status.HTTP_200_OK)
-        else:
-            error_message = (
-                "Некорректные данные. Пожалуйста, проверьте запрос."
-            )
-            return Response(
-                {"error": error_message}, status=status.HTTP_400_BAD_REQUEST
-            )
+        return self.dynamic_response(request)
 
 
 @extend_schema(
@@ -565,14 +298,14 @@ class AnalyticsHistoryListViewSet(APIView):
         summary="Аналитика бронирования за день, неделю и год",
     ),
 )
-class AnalyticsListViewSet(APIView):
+class AnalyticsListViewSet(BaseAnalyticsView):
     """
     Общая аналитика по всем заведениям.
 
     Этот класс предоставляет общую аналитику для пользователей со статусом 'is_restorateur'.
     """
 
-    permission_classes = (IsAuthenticated, IsRestorateur)
+    counter = "created"
 
     @extend_schema(
         responses=AnalyticsStaticSerializer,
@@ -584,63 +317,7 @@ class AnalyticsListViewSet(APIView):
         :param request: Объект запроса REST API.
         :return: Данные статической аналитики.
         """
-        user = self.request.user
-        now_date = now().date()
-
-        filters = {"establishment__owner": user}
-        total_reservation = Reservation.objects.filter(**filters).count()
-
-        daily_reservation = Reservation.objects.filter(
-            **filters,
-            reservation_date__year=now_date.year,
-            reservation_date__month=now_date.month,
-            reservation_date__day=now_date.day,
-        ).count()
-
-        weekly_reservation = Reservation.objects.filter(
-            **filters,
-            reservation_date__week=ExtractWeek(now_date),
-        ).count()
-
-        monthly_reservation = (
-            Reservation.objects.filter(
-                **filters,
-                reservation_date__year=now_date.year,
-            )
-            .annotate(month=ExtractMonth("reservation_date"))
-            .values("month")
-            .annotate(monthly_count=Count("id"))
-        )
-
-        yearly_reservation = (
-            Reservation.objects.filter(
-                **filters, reservation_date__year=now_date.year
-            )
-            .values(
-                "reservation_date__year",
-            )
-            .annotate(yearly_count=Count("id"))
-        )
-
-        daily_reservations_by_day = (
-            Reservation.objects.filter(
-                **filters,
-            )
-            .values("reservation_date__date")
-            .annotate(reservation_count=Count("id"))
-        )
-
-        aggregated_data = {
-            "total_reservation": total_reservation,
-            "daily_reservation": daily_reservation,
-            "weekly_reservation": weekly_reservation,
-            "monthly_reservation": list(monthly_reservation),
-            "yearly_reservation": yearly_reservation,
-            "daily_reservations_by_day": list(daily_reservations_by_day),
-        }
-
-        serializer = AnalyticsStaticSerializer(aggregated_data)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return self.static_response()
 
     @extend_schema(
         responses=AnalyticsDynamicSerializer,
@@ -654,54 +331,179 @@ class AnalyticsListViewSet(APIView):
         :return: Данные динамической аналитики или сообщение об ошибке.
         """
 
-        user = self.request.user
-        serializer = AnalyticsDynamicSerializer(data=request.data)
-        if serializer.is_valid():
-            start_date = serializer.validated_data["start_date"]
-            end_date = serializer.validated_data["end_date"]
+        return self.dynamic_response(request)
 
-            filters = {"establishment__owner": user}
-            if start_date and end_date:
-                filters["reservation_date__range"] = [start_date, end_date]
 
-            total_reservation = Reservation.objects.filter(**filters).count()
+class SnapshotAnalyticsView(APIView):
+    """
+    Аналитика по ночному снимку броней владельца.
 
-            daily_reservations_by_day = (
-                Reservation.objects.filter(**filters)
-                .values("reservation_date__date")
-                .annotate(reservation_count=Count("id"))
-            )
+    Метрики считаются векторно по массивам снимка, без запросов
+    к броням. Если снимка еще нет, он строится при первом запросе.
+    metric - функция из analytics.metrics, строящая ответ.
+    """
 
-            monthly_reservations_by_month = (
-                Reservation.objects.filter(**filters)
-                .annotate(month=ExtractMonth("reservation_date"))
-                .values("month")
-                .annotate(monthly_count=Count("id"))
-            )
+    permission_classes = (IsAuthenticated, IsRestorateur)
+    serializer_class = None
+    metric = None
 
-            yearly_reservation = (
-                Reservation.objects.filter(**filters)
-                .values(
-                    "reservation_date__year",
-                )
-                .annotate(yearly_count=Count("id"))
-            )
+    def get(self, request):
+        query = SnapshotQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        owner_id = request.user.id
+        snapshot = load_snapshot(owner_id) or refresh_snapshot(owner_id)
+        snapshot = metrics.select(
+            snapshot, query.validated_data.get("establishment")
+        )
+        data = {
+            "snapshot_at": snapshot["snapshot_at"].item(),
+            **self.metric(snapshot),
+        }
+        return Response(
+            self.serializer_class(data).data, status=status.HTTP_200_OK
+        )
 
-            aggregated_data = {
-                "total_reservation": total_reservation,
-                "daily_reservations_by_day": list(daily_reservations_by_day),
-                "monthly_reservations_by_month": list(
-                    monthly_reservations_by_month
-                ),
-                "yearly_reservation": list(yearly_reservation),
-            }
-
-            serializer = AnalyticsDynamicSerializer(aggregated_data)
-            return Response(serializer.data, status=status.HTTP_200_OK)
-        else:
-            error_message = (
-                "Некорректные данные. Пожалуйста, проверьте запрос."
-            )
-            return Response(
-                {"error": error_message}, status=status.HTTP_400_BAD_REQUEST
-            )
+
+@extend_schema(
+    tags=["Бизнес(аналитика полная)"],
+    description="Ресторатор",
+    summary="Воронка бронирования и неявки по заведениям",
+    parameters=[SnapshotQuerySerializer],
+    responses=AnalyticsFunnelSerializer,
+)
+class AnalyticsFunnelView(SnapshotAnalyticsView):
+    """Воронка создана -> подтверждена -> посещена и доля неявок."""
+
+    serializer_class = AnalyticsFunnelSerializer
+    metric = staticmethod(metrics.funnel)
+
+
+@extend_schema(
+    tags=["Бизнес(аналитика полная)"],
+    description="Ресторатор",
+    summary="Распределение времени от создания брони до визита",
+    parameters=[SnapshotQuerySerializer],
+    responses=AnalyticsLeadTimeSerializer,
+)
+class AnalyticsLeadTimeView(SnapshotAnalyticsView):
+    """Гистограмма времени от создания брони до ее начала."""
+
+    serializer_class = AnalyticsLeadTimeSerializer
+    metric = staticmethod(metrics.lead_time)
+
+
+@extend_schema(
+    tags=["Бизнес(аналитика полная)"],
+    description="Ресторатор",
+    summary="Когорты гостей и повторные визиты",
+    parameters=[SnapshotQuerySerializer],
+    responses=AnalyticsCohortsSerializer,
+)
+class AnalyticsCohortsView(SnapshotAnalyticsView):
+    """Удержание гостей по месяцу первого визита."""
+
+    serializer_class = AnalyticsCohortsSerializer
+    metric = staticmethod(metrics.cohorts)
+
+
+@extend_schema(
+    tags=["Бизнес(аналитика полная)"],
+    description="Ресторатор",
+    summary="Загрузка зон заведений по часам недели",
+    parameters=[UtilizationQuerySerializer],
+    responses=ZoneUtilizationSerializer(many=True),
+)
+class AnalyticsUtilizationView(APIView):
+    """
+    Карта загрузки зон: доля занятых мест-часов по дням недели и часам
+    за последние days дней. Строится по заранее посчитанной почасовой
+    загрузке зон (ZoneUtilization).
+    """
+
+    permission_classes = (IsAuthenticated, IsRestorateur)
+
+    def get(self, request):
+        query = UtilizationQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        today = datetime.now().date()
+        utilization = ZoneUtilization.objects.filter(
+            establishment__owner=request.user,
+            date__gt=today - timedelta(days=query.validated_data["days"]),
+        )
+        establishment_id = query.validated_data.get("establishment")
+        if establishment_id is not None:
+            utilization = utilization.filter(establishment_id=establishment_id)
+        serializer = ZoneUtilizationSerializer(
+            utilization_heatmap(utilization), many=True
+        )
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+@extend_schema(
+    tags=["Бизнес(аналитика полная)"],
+    description="Администратор",
+    summary="Попадания и промахи кэша аналитики",
+    responses=AnalyticsCacheSerializer,
+)
+class AnalyticsCacheStatsView(APIView):
+    """Счетчики попаданий и промахов кэша ответов аналитики."""
+
+    permission_classes = (IsAdminUser,)
+
+    def get(self, request):
+        serializer = AnalyticsCacheSerializer(cache_stats())
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+@extend_schema(
+    tags=["Бизнес(аналитика полная)"],
+    description="Ресторатор",
+)
+@extend_schema_view(
+    create=extend_schema(summary="Заказать выгрузку броней в файл"),
+    list=extend_schema(summary="Список выгрузок броней"),
+    retrieve=extend_schema(summary="Статус выгрузки и ссылка на файл"),
+)
+class AnalyticsExportViewSet(
+    mixins.CreateModelMixin,
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    viewsets.GenericViewSet,
+):
+    """
+    Выгрузки броней владельца.
+
+    POST ставит выгрузку в очередь и сразу возвращает ее (202),
+    файл готовится задачей Celery. GET по id показывает статус,
+    после завершения - ссылку на скачивание. Файлы хранятся вне
+    MEDIA_ROOT и отдаются только владельцу через download.
+    """
+
+    serializer_class = AnalyticsExportSerializer
+    permission_classes = (IsAuthenticated, IsRestorateur)
+
+    def get_queryset(self):
+        return AnalyticsExport.objects.filter(owner=self.request.user)
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        export = serializer.save(owner=request.user)
+        transaction.on_commit(lambda: export_analytics.delay(export.id))
+        return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
+
+    @action(methods=["get"], detail=True)
+    def download(self, request, pk=None):
+        """Файл готовой выгрузки, доступен только ее владельцу."""
+        export = self.get_object()
+        if export.status != EXPORT_DONE or not export.file:
+            raise NotFound("Файл выгрузки не готов")
+        try:
+            file = export.file.open("rb")
+        except FileNotFoundError:
+            raise NotFound("Файл выгрузки удален")
+        return FileResponse(
+            file,
+            as_attachment=True,
+            filename=f"{export.source}_{export.id}.{export.format}",
+        )
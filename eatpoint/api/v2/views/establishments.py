@@ -1,4 +1,4 @@
-from django.db.models import Count, Avg, Prefetch
+from django.db.models import BooleanField, Exists, OuterRef, Prefetch, Value
 from django.shortcuts import get_object_or_404
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import (
@@ -6,7 +6,9 @@ from drf_spectacular.utils import (
     extend_schema_view,
     OpenApiParameter,
 )
+from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import viewsets, status
+from rest_framework.filters import OrderingFilter, SearchFilter
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.permissions import (
     SAFE_METHODS,
@@ -35,6 +37,13 @@ from api.v2.serializers.establishments import (
     CitySerializer,
     ImageSerializer,
 )
+from core.mixins import (
+    COMPACT_VIEW,
+    EXPAND_PARAM,
+    FIELDS_PARAM,
+    VIEW_PARAM,
+    SparseFieldsViewMixin,
+)
 from core.pagination import LargeResultsSetPagination
 from establishments.models import (
     Establishment,
@@ -200,6 +209,22 @@ class ImageEstablishmentViewSet(viewsets.ModelViewSet):
         return Response(status=status.HTTP_403_FORBIDDEN)
 
 
+def annotate_favorited(queryset, user):
+    """
+    Признак is_favorited у заведений одним подзапросом EXISTS
+    вместо запроса на каждое заведение в сериализаторе.
+    """
+    if user.is_anonymous:
+        return queryset.annotate(
+            is_favorited=Value(False, output_field=BooleanField())
+        )
+    return queryset.annotate(
+        is_favorited=Exists(
+            Favorite.objects.filter(establishment=OuterRef("pk"), user=user)
+        )
+    )
+
+
 @extend_schema(
     tags=["Бизнес(заведения)"],
     methods=["GET", "POST", "PATCH", "PUT", "DELETE"],
@@ -238,25 +263,18 @@ class EstablishmentBusinessViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         user = self.request.user
-        return (
-            Establishment.objects.prefetch_related(
-                "cities",
-                "types",
-                "kitchens",
-                "services",
-                "zones",
-                "socials",
-                "worked",
-                "images",
-                "review",
-                Prefetch("owner", queryset=User.objects.all().only("email")),
-            )
-            .filter(email=user.email)
-            .annotate(
-                review_count=Count("review", distinct=True),
-                rating=Avg("review__score"),
-            )
-        ).order_by("id")
+        establishments = Establishment.objects.prefetch_related(
+            "cities",
+            "types",
+            "kitchens",
+            "services",
+            "zones",
+            "socials",
+            "worked",
+            "images",
+            Prefetch("owner", queryset=User.objects.all().only("email")),
+        ).filter(email=user.email)
+        return annotate_favorited(establishments, user).order_by("id")
 
     def get_serializer_class(self):
         """Выбор serializer_class в зависимости от типа запроса"""
@@ -278,37 +296,72 @@ class EstablishmentBusinessViewSet(viewsets.ModelViewSet):
 @extend_schema_view(
     list=extend_schema(
         summary="Получить список заведений",
+        parameters=[
+            OpenApiParameter(
+                name=FIELDS_PARAM,
+                type=OpenApiTypes.STR,
+                description="Только перечисленные через запятую поля",
+            ),
+            OpenApiParameter(
+                name=VIEW_PARAM,
+                type=OpenApiTypes.STR,
+                enum=[COMPACT_VIEW],
+                description="Сокращенный список вместо полных объектов",
+            ),
+            OpenApiParameter(
+                name=EXPAND_PARAM,
+                type=OpenApiTypes.STR,
+                description=(
+                    "Поля, добавляемые к сокращенному списку "
+                    "(например images,worked)"
+                ),
+            ),
+        ],
     ),
     retrieve=extend_schema(
         summary="Детальная информация о заведении",
+        parameters=[
+            OpenApiParameter(
+                name=FIELDS_PARAM,
+                type=OpenApiTypes.STR,
+                description="Только перечисленные через запятую поля",
+            ),
+        ],
     ),
 )
-class EstablishmentViewSet(viewsets.ModelViewSet):
-    """Вьюсет: Заведение"""
-
-    queryset = (
-        (
-            Establishment.objects.filter(is_verified=True)
-            .prefetch_related(
-                "cities",
-                "types",
-                "kitchens",
-                "services",
-                "zones",
-                "socials",
-                "images",
-                "worked",
-                "review",
-                "favorite",
-            )
-        )
-        .annotate(
-            review_count=Count("review", distinct=True),
-            rating=Avg("review__score"),
-        )
-        .order_by("id")
+class EstablishmentViewSet(SparseFieldsViewMixin, viewsets.ModelViewSet):
+    """
+    Вьюсет: Заведение
+
+    По умолчанию отдается полный объект, ?view=compact - сокращенный
+    (compact_fields). Связи загружаются только для отдаваемых полей.
+    """
+
+    queryset = Establishment.objects.filter(is_verified=True).order_by("id")
+    compact_fields = (
+        "id",
+        "name",
+        "poster",
+        "cities",
+        "average_check",
+        "rating",
+        "review_count",
+        "is_favorited",
+        "distance",
     )
-
+    field_prefetches = {
+        "cities": ("cities",),
+        "types": ("types",),
+        "kitchens": ("kitchens",),
+        "services": ("services",),
+        "zones": ("zones",),
+        "socials": ("socials",),
+        "images": ("images",),
+        "worked": ("worked",),
+    }
+
+    filter_backends = (DjangoFilterBackend, SearchFilter, OrderingFilter)
+    ordering_fields = ("rating", "review_count")
     filterset_class = EstablishmentFilter
     pagination_class = LargeResultsSetPagination
     permission_classes = (ReadOnly | IsAdminUser,)
@@ -321,6 +374,12 @@ class EstablishmentViewSet(viewsets.ModelViewSet):
     serializer_class = EstablishmentSerializer
     http_method_names = ["get"]
 
+    def get_queryset(self):
+        establishments = self.prefetch_fields(super().get_queryset())
+        if self.wants_field("is_favorited"):
+            return annotate_favorited(establishments, self.request.user)
+        return establishments
+
 
 @extend_schema(
     tags=["Избранное"],
@@ -1,13 +1,12 @@
 from datetime import datetime
 
-from django.conf import settings as django_settings
-from django.core.mail import send_mail
 from django.db.models import Q, F
 from django.http import Http404
 from drf_spectacular.utils import extend_schema, extend_schema_view
 from django.shortcuts import get_object_or_404
 from rest_framework.response import Response
 from rest_framework import viewsets, status, mixins
+from rest_framework.exceptions import ValidationError
 
 from api.v2.filters.reservations import SlotsFilter
 from api.permissions import (
@@ -28,7 +27,13 @@ from api.v2.views.schema import (
     AvailableSlotsViewSet_schema,
     AvailableSlotsViewSet_schema_view,
 )
-from core.pagination import LargeResultsSetPagination, SlotsPagination
+from core.exeptions import SlotsUnavailableException
+from core.notifications import enqueue_notification
+from core.pagination import (
+    LargeResultsSetPagination,
+    SlotsCursorPagination,
+    StartsAtCursorPagination,
+)
 from core.validators import (
     validate_reserv_anonim,
 )
@@ -42,6 +47,9 @@ from api.v2.serializers.reservations import (
     ReservationsUserSerializer,
     UpdateReservationActionSerializer,
 )
+from reservation.availability import attach_slot_ids, available_slots
+from reservation.occupancy import release_slots
+from reservation.services import create_reservation, delete_reservation
 from reservation.models import (
     Reservation,
     ReservationHistory,
@@ -74,65 +82,57 @@ class ReservationsEditViewSet(
     def create(self, request, *args, **kwargs):
         establishment_id = self.kwargs.get("establishment_id")
         establishment = get_object_or_404(Establishment, id=establishment_id)
-        slots_ids = list(request.data.get("slots", []))
         user = request.user
+        serializer = self.get_serializer(data=request.data, partial=True)
+        serializer.is_valid(raise_exception=True)
+        data = dict(serializer.validated_data)
 
         if user.is_anonymous:
-            serializer = self.get_serializer(data=request.data, partial=True)
-            serializer.is_valid(raise_exception=True)
             validate_reserv_anonim(user, request.data)
             email = request.data.get("email")
             first_name = request.data.get("first_name")
             last_name = request.data.get("last_name")
             telephone = request.data.get("telephone")
 
-            try:
-                unregistered_user = ConfirmationCode.objects.get(
-                    email=email, is_verified=True
-                )
-            except unregistered_user.DoesNotExist:
+            if not ConfirmationCode.objects.filter(
+                email=email, is_verified=True
+            ).exists():
                 return Response(
                     {"detail": "email не подтвержден!"},
                     status=status.HTTP_403_FORBIDDEN,
                 )
-
-            reservation = serializer.save(
-                user=None, establishment=establishment
-            )
+            data["user"] = None
 
         else:
-            serializer = self.get_serializer(data=request.data, partial=True)
-            serializer.is_valid(raise_exception=True)
-
             first_name = user.first_name
             last_name = user.last_name
             email = user.email
             telephone = user.telephone
 
-            reservation = serializer.save(
+            data.update(
                 user=user,
-                establishment=establishment,
                 first_name=first_name,
                 last_name=last_name,
                 email=email,
                 telephone=telephone,
             )
 
-        try:
-            slots = Slot.objects.filter(
-                establishment=establishment_id, id__in=slots_ids
-            )
-            reservation.slots.set(slots)
-            reservation.date_reservation = slots[0].date
-            reservation.start_time_reservation = slots[0].time
-            reservation.save()
-            slots.update(is_active=False)
-
-        except IndexError:
+        if not data.get("slots") and not data.get("intervals"):
             return Response(
                 {"detail": "Слотов с данными id нет!"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
+        try:
+            reservation = create_reservation(establishment, data)
+        except SlotsUnavailableException as error:
+            return Response(
+                {"detail": error.message},
+                status=status.HTTP_409_CONFLICT,
+            )
+        serializer.instance = reservation
+        slots = reservation.slots.select_related("zone", "table").order_by(
+            "starts_at"
+        )
 
         message = f"""
             Подтвердите бронирование:
@@ -147,11 +147,10 @@ class ReservationsEditViewSet(
             {telephone}
         """
 
-        send_mail(
+        enqueue_notification(
             "Подтвердите бронирование",
-            message=message,
-            from_email=django_settings.EMAIL_HOST_USER,
-            recipient_list=[reservation.establishment.owner.email],
+            message,
+            [establishment.owner.email],
         )
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
@@ -191,13 +190,7 @@ class ReservationsUserListViewSet(
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        date_reservation = removable.date_reservation
-        time_reservation = datetime.strptime(
-            removable.start_time_reservation, "%H:%M"
-        ).time()
-        reservation_date_time = datetime.combine(
-            date_reservation, time_reservation
-        )
+        reservation_date_time = removable.starts_at
 
         # бронь не подтверждена, время не наступило, не клиент
         if (
@@ -260,11 +253,9 @@ class ReservationsUserListViewSet(
             not removable.is_accepted
             and datetime.now() < reservation_date_time
         ):
-            slot_ids = removable.slots.values_list("id", flat=True)
-            for slot_id in slot_ids:
-                Slot.objects.filter(id=slot_id).update(is_active=True)
+            release_slots(Slot.objects.filter(reservations=removable))
 
-        removable.delete()
+        delete_reservation(removable)
 
         return Response(
             {"message": "Бронирование удалено"},
@@ -275,10 +266,7 @@ class ReservationsUserListViewSet(
         """Изменяет статус бронирования и статус посещения"""
         instance = self.get_object()
         email = instance.email or instance.user.email
-        reservation_date_time = datetime.combine(
-            instance.date_reservation,
-            datetime.strptime(instance.start_time_reservation, "%H:%M").time(),
-        )
+        reservation_date_time = instance.starts_at
 
         action = request.data.get("action")
 
@@ -298,9 +286,7 @@ class ReservationsUserListViewSet(
                     instance.is_accepted
                     and datetime.now() < reservation_date_time
                 ):
-                    slot_ids = instance.slots.values_list("id", flat=True)
-                    for slot_id in slot_ids:
-                        Slot.objects.filter(id=slot_id).update(is_active=True)
+                    release_slots(Slot.objects.filter(reservations=instance))
                 subj = "Бронирование отменено!"
                 instance.is_deleted = True
 
@@ -322,12 +308,7 @@ class ReservationsUserListViewSet(
             {instance.establishment.address}
             """
 
-        send_mail(
-            subj,
-            message,
-            django_settings.EMAIL_HOST_USER,
-            [email],
-        )
+        enqueue_notification(subj, message, [email])
 
         return Response(
             {"complete": subj},
@@ -349,7 +330,7 @@ class ReservationsRestorateurListViewSet(
     """Вьюсет для обработки бронирования для ресторатора"""
 
     http_method_names = ["get", "delete", "patch"]
-    pagination_class = LargeResultsSetPagination
+    pagination_class = StartsAtCursorPagination
     permission_classes = [
         IsRestorateurEdit,
     ]
@@ -362,7 +343,7 @@ class ReservationsRestorateurListViewSet(
                 Q(establishment__email=user.email)
                 | Q(establishment__owner=user),
             )
-            .order_by("date_reservation", "start_time_reservation")
+            .order_by("starts_at")
         )
 
     def get_serializer_class(self):
@@ -382,13 +363,7 @@ class ReservationsRestorateurListViewSet(
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        date_reservation = removable.date_reservation
-        time_reservation = datetime.strptime(
-            removable.start_time_reservation, "%H:%M"
-        ).time()
-        reservation_date_time = datetime.combine(
-            date_reservation, time_reservation
-        )
+        reservation_date_time = removable.starts_at
 
         # бронь не подтверждена, время не наступило, не клиент
         if (
@@ -453,11 +428,9 @@ class ReservationsRestorateurListViewSet(
             not removable.is_accepted
             and datetime.now() < reservation_date_time
         ):
-            slot_ids = removable.slots.values_list("id", flat=True)
-            for slot_id in slot_ids:
-                Slot.objects.filter(id=slot_id).update(is_active=True)
+            release_slots(Slot.objects.filter(reservations=removable))
 
-        removable.delete()
+        delete_reservation(removable)
 
         return Response(
             {"message": "Бронирование удалено"},
@@ -468,10 +441,7 @@ class ReservationsRestorateurListViewSet(
         """Изменяет статус бронирования и статус посещения"""
         instance = self.get_object()
         email = instance.email or instance.user.email
-        reservation_date_time = datetime.combine(
-            instance.date_reservation,
-            datetime.strptime(instance.start_time_reservation, "%H:%M").time(),
-        )
+        reservation_date_time = instance.starts_at
 
         subj = ""
         action = request.data.get("action")
@@ -520,9 +490,7 @@ class ReservationsRestorateurListViewSet(
                     instance.is_accepted
                     and datetime.now() < reservation_date_time
                 ):
-                    slot_ids = instance.slots.values_list("id", flat=True)
-                    for slot_id in slot_ids:
-                        Slot.objects.filter(id=slot_id).update(is_active=True)
+                    release_slots(Slot.objects.filter(reservations=instance))
 
                 subj = "Бронирование отменено!"
                 instance.is_deleted = True
@@ -539,12 +507,7 @@ class ReservationsRestorateurListViewSet(
             {instance.establishment.address}
             """
 
-        send_mail(
-            subj,
-            message,
-            django_settings.EMAIL_HOST_USER,
-            [email],
-        )
+        enqueue_notification(subj, message, [email])
 
         return Response(
             {"complete": subj},
@@ -572,9 +535,7 @@ class ReservationsHistoryListViewSet(viewsets.ModelViewSet):
         if user.is_client:
             return ReservationHistory.objects.filter(email=user.email)
         elif user.is_restorateur:
-            return ReservationHistory.objects.filter(
-                establishment__email=user.email
-            )
+            return ReservationHistory.objects.filter(owner=user)
 
 
 @extend_schema(tags=["Слоты для бронирования"], **AvailableSlotsViewSet_schema)
@@ -582,17 +543,24 @@ class ReservationsHistoryListViewSet(viewsets.ModelViewSet):
 class AvailableSlotsViewSet(
     mixins.ListModelMixin, mixins.RetrieveModelMixin, viewsets.GenericViewSet
 ):
-    """Список свободных слотов"""
+    """
+    Список свободных слотов.
+
+    При любом SLOTS_ENGINE список считается по часам работы и индексу
+    занятости столиков (TableOccupancy), записи слотов только читаются
+    ради id для бронирования. Строки без id (SLOTS_ENGINE = "computed")
+    бронируются по интервалу (table_id, date, time), запись слота
+    создается при бронировании.
+    """
 
     serializer_class = AvailableSlotsSerializer
     http_method_names = ["get"]
-    pagination_class = SlotsPagination
+    pagination_class = SlotsCursorPagination
     filterset_class = SlotsFilter
 
     def get_queryset(self):
         establishment_id = self.kwargs.get("establishment_id")
-        current_date = datetime.today().date()
-        current_time = datetime.now().strftime("%H:%M")
+        current = datetime.now().replace(second=0, microsecond=0)
 
         return (
             Slot.objects.all()
@@ -601,19 +569,41 @@ class AvailableSlotsViewSet(
                 "date",
                 "time",
                 "zone__zone",
+                "table_id",
                 "table__number",
                 "table__seats",
                 "establishment__id",
                 "establishment__name",
+                "starts_at",
             )
             .filter(is_active=True)
             .filter(establishment__id=establishment_id)
-            .filter(
-                Q(date=current_date, time__gte=current_time)
-                | Q(date__gt=current_date)
+            .filter(starts_at__gte=current)
+            .order_by("starts_at", "table_id")
+        )
+
+    def list(self, request, *args, **kwargs):
+        filterset = SlotsFilter(
+            request.query_params,
+            queryset=Slot.objects.none(),
+            request=request,
+        )
+        if not filterset.is_valid():
+            raise ValidationError(filterset.errors)
+        params = filterset.form.cleaned_data
+        page = self.paginate_queryset(
+            lambda position, reverse: available_slots(
+                self.kwargs.get("establishment_id"),
+                slot_date=params.get("date"),
+                seats=params.get("seats"),
+                zone=params.get("zone"),
+                position=position,
+                reverse=reverse,
             )
-            .order_by("id")
         )
+        page = attach_slot_ids(page)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
 
     def retrieve(self, request, *args, **kwargs):
         try:
@@ -0,0 +1,46 @@
+from django.contrib import admin
+
+from .models import Notification, NotificationDeadLetter, TaskWatermark
+
+
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    """Админка: исходящие письма"""
+
+    list_display = (
+        "id",
+        "subject",
+        "recipient",
+        "status",
+        "attempts",
+        "next_attempt_at",
+        "sent_at",
+    )
+    list_filter = ("status",)
+    search_fields = ("recipient",)
+
+
+@admin.register(NotificationDeadLetter)
+class NotificationDeadLetterAdmin(admin.ModelAdmin):
+    """Админка: неотправленные письма"""
+
+    list_display = (
+        "id",
+        "subject",
+        "recipient",
+        "attempts",
+        "last_error",
+        "failed_at",
+    )
+    search_fields = ("recipient",)
+
+
+@admin.register(TaskWatermark)
+class TaskWatermarkAdmin(admin.ModelAdmin):
+    """Админка: отметки периодических задач"""
+
+    list_display = (
+        "name",
+        "value",
+        "updated_at",
+    )
@@ -7,7 +7,23 @@ from core.constants import (
     EMAIL,
     TELEGRAM,
     NOTHING,
+    EXPORT_CSV,
+    EXPORT_DONE,
+    EXPORT_FAILED,
+    EXPORT_HISTORY,
+    EXPORT_PARQUET,
+    EXPORT_PENDING,
+    EXPORT_RESERVATIONS,
+    EXPORT_RUNNING,
+    NOTIFICATION_PENDING,
+    NOTIFICATION_SENDING,
+    NOTIFICATION_SENT,
+    REMINDER_CONFIRM,
+    REMINDER_ONE_DAY,
+    REMINDER_THREE_HOURS,
+    REMINDER_HALF_HOUR,
     INTERVAL_MINUTES,
+    LOCATION_ORDER_DISTANCE,
     START_TIME,
     END_TIME,
 )
@@ -44,3 +60,37 @@ RESERVATION_STATUS = (
     ("is_visited", "посещена"),
     ("is_deleted", "удалена"),
 )
+
+# Статус исходящего письма
+NOTIFICATION_STATUS = (
+    (NOTIFICATION_PENDING, "ожидает отправки"),
+    (NOTIFICATION_SENDING, "отправляется"),
+    (NOTIFICATION_SENT, "отправлено"),
+)
+
+# Вид напоминания о брони
+REMINDER_KINDS = (
+    (REMINDER_CONFIRM, "подтверждение заведением"),
+    (REMINDER_ONE_DAY, "за 1 день"),
+    (REMINDER_THREE_HOURS, "за 3 часа"),
+    (REMINDER_HALF_HOUR, "за 30 минут"),
+)
+
+# Выгрузка аналитики: источник, формат и статус
+EXPORT_SOURCES = (
+    (EXPORT_HISTORY, "архив броней"),
+    (EXPORT_RESERVATIONS, "брони"),
+)
+EXPORT_FORMATS = (
+    (EXPORT_CSV, "CSV"),
+    (EXPORT_PARQUET, "Parquet"),
+)
+EXPORT_STATUS = (
+    (EXPORT_PENDING, "ожидает"),
+    (EXPORT_RUNNING, "выполняется"),
+    (EXPORT_DONE, "готова"),
+    (EXPORT_FAILED, "ошибка"),
+)
+
+# Сортировка заведений рядом
+LOCATION_ORDERS = ((LOCATION_ORDER_DISTANCE, "по расстоянию"),)
@@ -22,11 +22,13 @@ START_TIME = "00:00"
 # Конечное время(для генератора времени работы)
 END_TIME = "23:30"
 
-# Размер страницы
+# Размер страницы и наибольший размер, который можно запросить
 PAGE_SIZE = 10
+MAX_PAGE_SIZE = 100
 
-# Размер страницы для слотов
+# Размер страницы для слотов и наибольший размер, который можно запросить
 SLOTS_PAGE_SIZE = 100
+SLOTS_MAX_PAGE_SIZE = 500
 
 # Дни недели
 DAYS = [
@@ -42,6 +44,105 @@ DAYS = [
 # Количество дней для формирования слотов
 AVAILABLE_DAYS = 30
 
+# Размер пакета при массовой вставке слотов
+SLOTS_BATCH_SIZE = 1000
+
+# Количество столиков, обрабатываемых за один проход генератора слотов
+SLOTS_TABLES_CHUNK = 200
+
+# Источники свободных слотов
+SLOTS_ENGINE_MATERIALIZED = "materialized"
+SLOTS_ENGINE_COMPUTED = "computed"
+
+# Количество броней, переносимых в архив за один пакет
+ARCHIVE_BATCH_SIZE = 1000
+
+# На сколько месяцев вперед создаются секции архива броней
+HISTORY_PARTITIONS_AHEAD = 3
+
+# Количество броней, удаляемых за одну транзакцию
+PURGE_BATCH_SIZE = 500
+
+# За сколько последних дней сводная статистика броней сверяется с бронями
+STATS_RECONCILE_DAYS = 7
+
+# Поиск заведений рядом: радиус по умолчанию и наибольший радиус в км,
+# радиус Земли и длина градуса широты в км
+LOCATION_RADIUS_KM = 5
+LOCATION_MAX_RADIUS_KM = 100
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = 111.32
+LOCATION_ORDER_DISTANCE = "distance"
+
+# Количество заведений в пакете при сверке рейтинга с отзывами
+RATING_BATCH_SIZE = 1000
+
+# Исходящие письма: размер пакета отправки, число попыток
+# и базовая задержка повтора в минутах (удваивается с каждой попыткой)
+NOTIFICATION_BATCH_SIZE = 100
+NOTIFICATION_MAX_ATTEMPTS = 5
+NOTIFICATION_RETRY_MINUTES = 1
+
+# На сколько минут письма пакета закрепляются за воркером на время
+# отправки: если воркер не записал результат, пакет снова в очереди
+NOTIFICATION_CLAIM_MINUTES = 10
+
+# Сколько дней хранятся отправленные письма
+NOTIFICATION_KEEP_DAYS = 7
+
+# Виды напоминаний о брони
+REMINDER_CONFIRM = "confirm"
+REMINDER_ONE_DAY = "one_day"
+REMINDER_THREE_HOURS = "three_hours"
+REMINDER_HALF_HOUR = "half_hour"
+
+# За сколько минут до начала брони отправляется напоминание
+REMINDER_BEFORE_MINUTES = {
+    REMINDER_HALF_HOUR: 30,
+    REMINDER_THREE_HOURS: 3 * 60,
+    REMINDER_ONE_DAY: 24 * 60,
+}
+
+# Окно планирования напоминаний в минутах и размер порции броней
+REMINDER_PLAN_WINDOW = 60
+REMINDER_PLAN_CHUNK = 500
+
+# Выгрузки аналитики: источники, форматы и статусы
+EXPORT_HISTORY = "history"
+EXPORT_RESERVATIONS = "reservations"
+EXPORT_CSV = "csv"
+EXPORT_PARQUET = "parquet"
+EXPORT_PENDING = "pending"
+EXPORT_RUNNING = "running"
+EXPORT_DONE = "done"
+EXPORT_FAILED = "failed"
+
+# Строк выгрузки, читаемых из базы и записываемых в файл за раз
+EXPORT_CHUNK_SIZE = 2000
+
+# Сколько дней хранятся файлы выгрузок
+EXPORT_KEEP_DAYS = 7
+
+# Через сколько минут выполняющаяся выгрузка считается прерванной
+EXPORT_RUNNING_TIMEOUT = 60
+
+# Границы интервалов распределения времени от создания брони
+# до ее начала, в часах
+LEAD_TIME_BINS = (0, 1, 3, 24, 72, 168, 720)
+
+# На сколько месяцев после первого визита строятся когорты гостей
+COHORT_MONTHS = 12
+
+# За сколько дней по умолчанию строится карта загрузки зон
+# и сколько дней хранится почасовая загрузка
+UTILIZATION_DAYS = 90
+UTILIZATION_KEEP_DAYS = 365
+
+# Статусы исходящих писем
+NOTIFICATION_PENDING = "pending"
+NOTIFICATION_SENDING = "sending"
+NOTIFICATION_SENT = "sent"
+
 # Средний чек
 CHECKS = ["до 1000", "1000 - 2000", "2000 - 3000", "от 3000"]
 
@@ -15,3 +15,16 @@ class SuchEventExistsException(BaseException):
     def __init__(self, message="Событие с таким именем и датой уже создано"):
         self.message = message
         super().__init__(message)
+
+
+class SlotsUnavailableException(BaseException):
+    """
+    Ошибка при бронировании, когда выбранные слоты уже заняты,
+    не существуют или не принадлежат заведению.
+    """
+
+    def __init__(
+        self, message="Выбранные слоты уже заняты или недоступны в заведении"
+    ):
+        self.message = message
+        super().__init__(message)
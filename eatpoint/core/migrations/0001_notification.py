@@ -0,0 +1,142 @@
+# Generated by Django 4.2.5 on 2026-10-18 16:33
+
+import datetime
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="NotificationDeadLetter",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "subject",
+                    models.CharField(max_length=255, verbose_name="Тема"),
+                ),
+                ("message", models.TextField(verbose_name="Текст")),
+                (
+                    "recipient",
+                    models.EmailField(
+                        max_length=254, verbose_name="Получатель"
+                    ),
+                ),
+                (
+                    "attempts",
+                    models.PositiveSmallIntegerField(
+                        verbose_name="Попыток отправки"
+                    ),
+                ),
+                (
+                    "last_error",
+                    models.TextField(
+                        blank=True, verbose_name="Последняя ошибка"
+                    ),
+                ),
+                ("created_at", models.DateTimeField(verbose_name="Создано")),
+                (
+                    "failed_at",
+                    models.DateTimeField(
+                        auto_now_add=True,
+                        verbose_name="Перенесено в архив ошибок",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Неотправленное письмо",
+                "verbose_name_plural": "Неотправленные письма",
+                "ordering": ["-failed_at"],
+            },
+        ),
+        migrations.CreateModel(
+            name="Notification",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "subject",
+                    models.CharField(max_length=255, verbose_name="Тема"),
+                ),
+                ("message", models.TextField(verbose_name="Текст")),
+                (
+                    "recipient",
+                    models.EmailField(
+                        max_length=254, verbose_name="Получатель"
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "ожидает отправки"),
+                            ("sent", "отправлено"),
+                        ],
+                        default="pending",
+                        max_length=10,
+                        verbose_name="Статус",
+                    ),
+                ),
+                (
+                    "attempts",
+                    models.PositiveSmallIntegerField(
+                        default=0, verbose_name="Попыток отправки"
+                    ),
+                ),
+                (
+                    "next_attempt_at",
+                    models.DateTimeField(
+                        default=datetime.datetime.now,
+                        verbose_name="Следующая попытка",
+                    ),
+                ),
+                (
+                    "last_error",
+                    models.TextField(
+                        blank=True, verbose_name="Последняя ошибка"
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="Создано"
+                    ),
+                ),
+                (
+                    "sent_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Отправлено"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Исходящее письмо",
+                "verbose_name_plural": "Исходящие письма",
+                "ordering": ["next_attempt_at", "id"],
+                "indexes": [
+                    models.Index(
+                        fields=["status", "next_attempt_at"],
+                        name="notification_queue_idx",
+                    )
+                ],
+            },
+        ),
+    ]
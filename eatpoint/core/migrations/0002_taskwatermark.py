@@ -0,0 +1,48 @@
+# Generated by Django 4.2.5 on 2026-10-18 16:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0001_notification"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TaskWatermark",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "name",
+                    models.CharField(
+                        max_length=100, unique=True, verbose_name="Задача"
+                    ),
+                ),
+                (
+                    "value",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Обработано до"
+                    ),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(
+                        auto_now=True, verbose_name="Обновлено"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Отметка задачи",
+                "verbose_name_plural": "Отметки задач",
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.5 on 2026-10-18 17:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0002_taskwatermark"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="notification",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("pending", "ожидает отправки"),
+                    ("sending", "отправляется"),
+                    ("sent", "отправлено"),
+                ],
+                default="pending",
+                max_length=10,
+                verbose_name="Статус",
+            ),
+        ),
+    ]
@@ -0,0 +1,98 @@
+from functools import cached_property
+
+from rest_framework.exceptions import ValidationError
+
+FIELDS_PARAM = "fields"
+EXPAND_PARAM = "expand"
+VIEW_PARAM = "view"
+COMPACT_VIEW = "compact"
+
+
+def split_param(value: str | None) -> set[str]:
+    """Имена полей из параметра запроса вида "a,b,c"."""
+    return {name.strip() for name in (value or "").split(",") if name.strip()}
+
+
+class SparseFieldsSerializerMixin:
+    """
+    Сериализатор, отдающий только поля fields (если переданы).
+    Остальные поля удаляются до сериализации и не вычисляются.
+    """
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class SparseFieldsViewMixin:
+    """
+    Выборочные поля ответа: ?fields=a,b - только перечисленные поля,
+    ?view=compact - сокращенный список, ?expand=c,d - поля, добавляемые
+    к сокращенному списку. Без параметров отдаются все поля.
+
+    compact_fields - поля сокращенного списка (None - сокращенного
+    списка нет). field_prefetches - связи, которые нужно загрузить
+    для поля: загружаются только связи отдаваемых полей.
+    """
+
+    compact_fields = None
+    field_prefetches = {}
+
+    @cached_property
+    def serializer_field_names(self) -> set[str]:
+        """Имена полей сериализатора (вычисляются один раз за запрос)."""
+        return set(self.get_serializer_class()().fields)
+
+    def check_fields(self, param: str) -> set[str]:
+        """Имена полей из параметра param, неизвестные поля - ошибка 400."""
+        names = split_param(self.request.query_params.get(param))
+        if not names:
+            return names
+        unknown = names - self.serializer_field_names
+        if unknown:
+            raise ValidationError(
+                {param: f"Неизвестные поля: {', '.join(sorted(unknown))}"}
+            )
+        return names
+
+    @cached_property
+    def response_fields(self) -> set[str] | None:
+        """Поля ответа, выбранные параметрами запроса."""
+        params = self.request.query_params
+        expand = self.check_fields(EXPAND_PARAM)
+        if FIELDS_PARAM in params:
+            return self.check_fields(FIELDS_PARAM)
+        view = params.get(VIEW_PARAM)
+        if view is None:
+            return None
+        if view != COMPACT_VIEW or self.compact_fields is None:
+            raise ValidationError(
+                {VIEW_PARAM: f"Неизвестное представление: {view}"}
+            )
+        return set(self.compact_fields) | expand
+
+    def get_fields(self) -> set[str] | None:
+        """Поля ответа или None, если отдаются все поля."""
+        return self.response_fields
+
+    def wants_field(self, name: str) -> bool:
+        """Отдается ли поле name в ответе."""
+        fields = self.get_fields()
+        return fields is None or name in fields
+
+    def prefetch_fields(self, queryset):
+        """Загружает связи только для отдаваемых полей."""
+        lookups = [
+            lookup
+            for name, field_lookups in self.field_prefetches.items()
+            if self.wants_field(name)
+            for lookup in field_lookups
+        ]
+        return queryset.prefetch_related(*lookups)
+
+    def get_serializer(self, *args, **kwargs):
+        if self.request is not None and self.request.method == "GET":
+            kwargs.setdefault("fields", self.get_fields())
+        return super().get_serializer(*args, **kwargs)
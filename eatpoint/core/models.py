@@ -0,0 +1,125 @@
+from datetime import datetime
+
+from django.db import models
+
+from core.choices import NOTIFICATION_STATUS
+from core.constants import NOTIFICATION_PENDING
+
+
+class Notification(models.Model):
+    """Исходящее письмо, ожидающее отправки"""
+
+    subject = models.CharField(
+        verbose_name="Тема",
+        max_length=255,
+    )
+    message = models.TextField(
+        verbose_name="Текст",
+    )
+    recipient = models.EmailField(
+        verbose_name="Получатель",
+    )
+    status = models.CharField(
+        verbose_name="Статус",
+        max_length=10,
+        choices=NOTIFICATION_STATUS,
+        default=NOTIFICATION_PENDING,
+    )
+    attempts = models.PositiveSmallIntegerField(
+        verbose_name="Попыток отправки",
+        default=0,
+    )
+    next_attempt_at = models.DateTimeField(
+        verbose_name="Следующая попытка",
+        default=datetime.now,
+    )
+    last_error = models.TextField(
+        verbose_name="Последняя ошибка",
+        blank=True,
+    )
+    created_at = models.DateTimeField(
+        verbose_name="Создано",
+        auto_now_add=True,
+    )
+    sent_at = models.DateTimeField(
+        verbose_name="Отправлено",
+        null=True,
+        blank=True,
+    )
+
+    class Meta:
+        verbose_name = "Исходящее письмо"
+        verbose_name_plural = "Исходящие письма"
+        ordering = ["next_attempt_at", "id"]
+        indexes = [
+            models.Index(
+                fields=["status", "next_attempt_at"],
+                name="notification_queue_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {self.recipient}"
+
+
+class NotificationDeadLetter(models.Model):
+    """Письмо, которое не удалось отправить за все попытки"""
+
+    subject = models.CharField(
+        verbose_name="Тема",
+        max_length=255,
+    )
+    message = models.TextField(
+        verbose_name="Текст",
+    )
+    recipient = models.EmailField(
+        verbose_name="Получатель",
+    )
+    attempts = models.PositiveSmallIntegerField(
+        verbose_name="Попыток отправки",
+    )
+    last_error = models.TextField(
+        verbose_name="Последняя ошибка",
+        blank=True,
+    )
+    created_at = models.DateTimeField(
+        verbose_name="Создано",
+    )
+    failed_at = models.DateTimeField(
+        verbose_name="Перенесено в архив ошибок",
+        auto_now_add=True,
+    )
+
+    class Meta:
+        verbose_name = "Неотправленное письмо"
+        verbose_name_plural = "Неотправленные письма"
+        ordering = ["-failed_at"]
+
+    def __str__(self):
+        return f"{self.subject} -> {self.recipient}"
+
+
+class TaskWatermark(models.Model):
+    """Отметка, до которой периодическая задача обработала данные"""
+
+    name = models.CharField(
+        verbose_name="Задача",
+        max_length=100,
+        unique=True,
+    )
+    value = models.DateTimeField(
+        verbose_name="Обработано до",
+        null=True,
+        blank=True,
+    )
+    updated_at = models.DateTimeField(
+        verbose_name="Обновлено",
+        auto_now=True,
+    )
+
+    class Meta:
+        verbose_name = "Отметка задачи"
+        verbose_name_plural = "Отметки задач"
+
+    def __str__(self):
+        return f"{self.name}: {self.value}"
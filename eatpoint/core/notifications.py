@@ -0,0 +1,402 @@
+import logging
+from datetime import datetime, timedelta
+from time import monotonic, sleep
+from uuid import uuid4
+
+from celery import current_app
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import F, Q
+
+from core.constants import (
+    NOTIFICATION_BATCH_SIZE,
+    NOTIFICATION_CLAIM_MINUTES,
+    NOTIFICATION_MAX_ATTEMPTS,
+    NOTIFICATION_PENDING,
+    NOTIFICATION_RETRY_MINUTES,
+    NOTIFICATION_SENDING,
+    NOTIFICATION_SENT,
+    REMINDER_BEFORE_MINUTES,
+    REMINDER_HALF_HOUR,
+    REMINDER_ONE_DAY,
+    REMINDER_PLAN_CHUNK,
+    REMINDER_THREE_HOURS,
+)
+from core.models import Notification, NotificationDeadLetter
+from core.services import chunked
+from reservation.models import ReminderSchedule, Reservation
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_messages(messages: list[EmailMessage]) -> None:
+    """
+    Ставит готовые письма в очередь отправки.
+
+    Записи создаются в текущей транзакции, задача отправки
+    запускается только после ее фиксации.
+    """
+    Notification.objects.bulk_create(
+        [
+            Notification(
+                subject=message.subject, message=message.body, recipient=email
+            )
+            for message in messages
+            for email in message.to
+            if email
+        ]
+    )
+    transaction.on_commit(
+        current_app.signature("core.tasks.send_notifications").delay
+    )
+
+
+def enqueue_notification(subject: str, message: str, recipients) -> None:
+    """Ставит письмо в очередь отправки каждому из получателей."""
+    enqueue_messages(
+        [EmailMessage(subject=subject, body=message, to=list(recipients))]
+    )
+
+
+def notification_message(notification: Notification) -> EmailMessage:
+    """Письмо из записи очереди."""
+    return EmailMessage(
+        subject=notification.subject,
+        body=notification.message,
+        from_email=settings.EMAIL_HOST_USER,
+        to=[notification.recipient],
+    )
+
+
+def deliver(messages: dict) -> dict:
+    """
+    Отправляет письма {ключ: EmailMessage} через одно SMTP-соединение.
+
+    Возвращает {ключ: текст ошибки} для неотправленных писем.
+    """
+    errors = {}
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as error:
+        logger.exception("Нет соединения с почтовым сервером")
+        return {key: repr(error) for key in messages}
+    try:
+        for key, message in messages.items():
+            message.connection = connection
+            try:
+                message.send()
+            except Exception as error:
+                logger.exception("Письмо %s не отправлено", message.to)
+                errors[key] = repr(error)
+    finally:
+        connection.close()
+    return errors
+
+
+def dead_letter(notifications: list[Notification]) -> None:
+    """Переносит письма из очереди в архив ошибок."""
+    NotificationDeadLetter.objects.bulk_create(
+        [
+            NotificationDeadLetter(
+                subject=notification.subject,
+                message=notification.message,
+                recipient=notification.recipient,
+                attempts=notification.attempts,
+                last_error=notification.last_error,
+                created_at=notification.created_at,
+            )
+            for notification in notifications
+        ]
+    )
+    Notification.objects.filter(
+        id__in=[notification.id for notification in notifications]
+    ).delete()
+
+
+def claim_pending(batch_size: int) -> list[Notification]:
+    """
+    Закрепляет за воркером пакет писем очереди.
+
+    Строки блокируются только на время короткой транзакции (параллельные
+    воркеры берут другие письма) и помечаются как отправляемые
+    на NOTIFICATION_CLAIM_MINUTES. Письма, результат отправки которых
+    не записан за это время, снова попадают в очередь.
+
+    Попытка засчитывается при закреплении: письма, на которых воркер
+    падал NOTIFICATION_MAX_ATTEMPTS раз, переносятся в архив ошибок.
+    """
+    with transaction.atomic():
+        now = datetime.now()
+        exhausted = list(
+            Notification.objects.select_for_update(skip_locked=True).filter(
+                status=NOTIFICATION_SENDING,
+                next_attempt_at__lte=now,
+                attempts__gte=NOTIFICATION_MAX_ATTEMPTS,
+            )
+        )
+        for notification in exhausted:
+            notification.last_error = (
+                notification.last_error or "Результат отправки не записан"
+            )
+        dead_letter(exhausted)
+        batch = list(
+            Notification.objects.select_for_update(skip_locked=True)
+            .filter(
+                status__in=(NOTIFICATION_PENDING, NOTIFICATION_SENDING),
+                next_attempt_at__lte=now,
+            )
+            .order_by("next_attempt_at", "id")[:batch_size]
+        )
+        Notification.objects.filter(
+            id__in=[notification.id for notification in batch]
+        ).update(
+            status=NOTIFICATION_SENDING,
+            attempts=F("attempts") + 1,
+            next_attempt_at=now
+            + timedelta(minutes=NOTIFICATION_CLAIM_MINUTES),
+        )
+    for notification in batch:
+        notification.attempts += 1
+    return batch
+
+
+def record_delivery(batch: list[Notification], errors: dict) -> dict:
+    """
+    Записывает результат отправки пакета.
+
+    Неудачные письма откладываются с растущей задержкой, после
+    NOTIFICATION_MAX_ATTEMPTS попыток переносятся в архив ошибок.
+    """
+    now = datetime.now()
+    sent, failed, dead = [], [], []
+    for notification in batch:
+        if notification.id not in errors:
+            notification.status = NOTIFICATION_SENT
+            notification.sent_at = now
+            notification.last_error = ""
+            sent.append(notification)
+            continue
+        notification.status = NOTIFICATION_PENDING
+        notification.last_error = errors[notification.id]
+        if notification.attempts >= NOTIFICATION_MAX_ATTEMPTS:
+            dead.append(notification)
+            continue
+        notification.next_attempt_at = now + timedelta(
+            minutes=NOTIFICATION_RETRY_MINUTES
+            * 2 ** (notification.attempts - 1)
+        )
+        failed.append(notification)
+
+    with transaction.atomic():
+        Notification.objects.bulk_update(
+            sent + failed,
+            [
+                "status",
+                "attempts",
+                "next_attempt_at",
+                "last_error",
+                "sent_at",
+            ],
+        )
+        dead_letter(dead)
+    return {"sent": len(sent), "failed": len(failed), "dead": len(dead)}
+
+
+def send_pending(batch_size: int = NOTIFICATION_BATCH_SIZE) -> dict:
+    """
+    Отправляет очередь писем пакетами.
+
+    Пакет закрепляется за воркером в короткой транзакции, письма
+    отправляются вне транзакции, результат записывается отдельно:
+    медленный SMTP-сервер не держит блокировки строк очереди.
+    """
+    report = {"sent": 0, "failed": 0, "dead": 0}
+    while True:
+        batch = claim_pending(batch_size)
+        if not batch:
+            return report
+        errors = deliver(
+            {
+                notification.id: notification_message(notification)
+                for notification in batch
+            }
+        )
+        result = record_delivery(batch, errors)
+        for key, count in result.items():
+            report[key] += count
+
+
+# Поле брони, включающее напоминание каждого вида
+REMINDER_FIELDS = {
+    REMINDER_HALF_HOUR: "reminder_half_on_hour",
+    REMINDER_THREE_HOURS: "reminder_three_hours",
+    REMINDER_ONE_DAY: "reminder_one_day",
+}
+
+
+def window_reminders(start: datetime, end: datetime):
+    """
+    Напоминания подтвержденных броней со временем отправки в [start, end).
+
+    Брони выбираются по индексу начала брони (starts_at) порциями
+    по REMINDER_PLAN_CHUNK с продолжением от последней (starts_at, id).
+    Возвращает пары (id брони, вид, время отправки).
+    """
+    bookings = Reservation.objects.filter(
+        is_accepted=True,
+        is_deleted=False,
+        starts_at__gte=start
+        + timedelta(minutes=min(REMINDER_BEFORE_MINUTES.values())),
+        starts_at__lt=end
+        + timedelta(minutes=max(REMINDER_BEFORE_MINUTES.values())),
+    ).order_by("starts_at", "id")
+    last = None
+    while True:
+        chunk = bookings
+        if last is not None:
+            chunk = chunk.filter(
+                Q(starts_at__gt=last["starts_at"])
+                | Q(starts_at=last["starts_at"], id__gt=last["id"])
+            )
+        chunk = list(
+            chunk.values("id", "starts_at", *REMINDER_FIELDS.values())[
+                :REMINDER_PLAN_CHUNK
+            ]
+        )
+        if not chunk:
+            return
+        for booking in chunk:
+            for kind, field in REMINDER_FIELDS.items():
+                eta = booking["starts_at"] - timedelta(
+                    minutes=REMINDER_BEFORE_MINUTES[kind]
+                )
+                if booking[field] and start <= eta < end:
+                    yield booking["id"], kind, eta
+        last = chunk[-1]
+
+
+def plan_reminders(reminders) -> dict:
+    """
+    Записывает напоминания в расписание.
+
+    reminders - пары (id брони, вид, время отправки). Уже
+    запланированные находятся одним запросом и пропускаются. Новые
+    строки помечаются меткой запуска: к отправке возвращаются только
+    строки, вставленные этим запуском, - при параллельных запусках
+    напоминание отправляет тот, чья вставка прошла.
+    Возвращает новые напоминания: {время отправки: [id броней]}.
+    """
+    reminders = set(reminders)
+    if not reminders:
+        return {}
+    booking_ids = {booking_id for booking_id, _, _ in reminders}
+    planned = set(
+        ReminderSchedule.objects.filter(
+            reservation_id__in=booking_ids,
+            eta__gte=min(eta for _, _, eta in reminders),
+        ).values_list("reservation_id", "kind", "eta")
+    )
+    claim = uuid4()
+    ReminderSchedule.objects.bulk_create(
+        [
+            ReminderSchedule(
+                reservation_id=booking_id, kind=kind, eta=eta, claim=claim
+            )
+            for booking_id, kind, eta in reminders - planned
+        ],
+        ignore_conflicts=True,
+    )
+    claimed = (
+        ReminderSchedule.objects.filter(
+            reservation_id__in=booking_ids, claim=claim
+        )
+        .order_by("eta", "reservation_id")
+        .values_list("reservation_id", "eta")
+    )
+    due = {}
+    for booking_id, eta in claimed:
+        due.setdefault(eta, []).append(booking_id)
+    return due
+
+
+def render_reminder(booking: Reservation, for_client: bool) -> EmailMessage:
+    """Письмо-напоминание о брони для клиента или заведения."""
+    subj = (
+        "Подтвердите бронирование"
+        if not for_client
+        else "Напоминание о бронировании"
+    )
+    context = (
+        f"телефон: {booking.telephone}"
+        if not for_client
+        else f"адрес: {booking.establishment.address}"
+    )
+    recipient_email = (
+        booking.establishment.email if not for_client else booking.email
+    )
+    slot = next(iter(booking.slots.all()), None)
+    message = f"""
+            {subj}:
+            заведение: {booking.establishment},
+            {context},
+            дата: {booking.date_reservation},
+            время: {booking.start_time_reservation},
+            зона: {slot.table.zone if slot else "-"},
+            гостей: {slot.table.seats if slot else "-"}
+        """
+    return EmailMessage(
+        subject=subj,
+        body=message,
+        from_email=settings.EMAIL_HOST_USER,
+        to=[recipient_email],
+    )
+
+
+def send_reminders(booking_ids, for_client: bool = False) -> dict:
+    """
+    Рассылка напоминаний по броням пакетами.
+
+    Каждый пакет из REMINDER_BATCH_SIZE писем отправляется через одно
+    SMTP-соединение, между пакетами выдерживается REMINDER_RATE_LIMIT.
+    Неотправленные письма ставятся в очередь исходящих писем
+    с повторами и архивом ошибок.
+    Возвращает метрики: писем, отправлено, ошибок, пакетов, время
+    и скорость отправки в письмах в секунду.
+    """
+    started = monotonic()
+    bookings = (
+        Reservation.objects.filter(id__in=booking_ids)
+        .select_related("establishment")
+        .prefetch_related("slots__table__zone")
+        .order_by("id")
+    )
+    report = {"total": 0, "sent": 0, "failed": 0, "batches": 0}
+    for batch in chunked(
+        bookings.iterator(chunk_size=settings.REMINDER_BATCH_SIZE),
+        settings.REMINDER_BATCH_SIZE,
+    ):
+        batch_started = monotonic()
+        messages = {
+            booking.id: render_reminder(booking, for_client)
+            for booking in batch
+        }
+        errors = deliver(messages)
+        if errors:
+            enqueue_messages([messages[key] for key in errors])
+        report["total"] += len(messages)
+        report["sent"] += len(messages) - len(errors)
+        report["failed"] += len(errors)
+        report["batches"] += 1
+        if settings.REMINDER_RATE_LIMIT:
+            pause = len(messages) / settings.REMINDER_RATE_LIMIT
+            sleep(max(0, pause - (monotonic() - batch_started)))
+
+    report["elapsed"] = round(monotonic() - started, 2)
+    report["rate"] = (
+        round(report["sent"] / report["elapsed"], 1)
+        if report["elapsed"]
+        else report["sent"]
+    )
+    return report
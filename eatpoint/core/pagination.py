@@ -1,6 +1,20 @@
-from rest_framework.pagination import PageNumberPagination
+from datetime import datetime
+from itertools import islice
 
-from core.constants import PAGE_SIZE, SLOTS_PAGE_SIZE
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (
+    CursorPagination,
+    Cursor,
+    PageNumberPagination,
+)
+
+from core.constants import (
+    MAX_PAGE_SIZE,
+    PAGE_SIZE,
+    SLOTS_MAX_PAGE_SIZE,
+    SLOTS_PAGE_SIZE,
+)
 
 
 class LargeResultsSetPagination(PageNumberPagination):
@@ -8,6 +22,7 @@ class LargeResultsSetPagination(PageNumberPagination):
 
     page_size = PAGE_SIZE
     page_size_query_param = "page_size"
+    max_page_size = MAX_PAGE_SIZE
 
 
 class SlotsPagination(PageNumberPagination):
@@ -15,3 +30,104 @@ class SlotsPagination(PageNumberPagination):
 
     page_size = SLOTS_PAGE_SIZE
     page_size_query_param = "page_size"
+    max_page_size = SLOTS_MAX_PAGE_SIZE
+
+
+class KeysetCursorPagination(CursorPagination):
+    """
+    Курсорная пагинация по ключу из двух колонок ordering.
+
+    Курсор хранит ключ крайней строки страницы, соседняя страница
+    выбирается условием (a > x) OR (a = x AND b > y) по индексу
+    без OFFSET, общее количество (COUNT) не считается.
+
+    Вместо queryset можно передать функцию rows(position, reverse),
+    возвращающую строки после позиции (перед ней при reverse) в порядке
+    ordering (обратном при reverse): так листаются вычисляемые списки.
+    """
+
+    page_size = PAGE_SIZE
+    page_size_query_param = "page_size"
+    max_page_size = MAX_PAGE_SIZE
+    ordering = ("starts_at", "id")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        cursor = self.decode_cursor(request)
+        reverse = cursor is not None and cursor.reverse
+        position = self.parse_position(cursor)
+        if callable(queryset):
+            rows = queryset(position, reverse)
+        else:
+            rows = self.filter_position(queryset, position, reverse)
+        self.page = list(islice(rows, self.page_size + 1))
+        has_more = len(self.page) > self.page_size
+        if has_more:
+            self.page.pop()
+        if reverse:
+            self.page.reverse()
+        self.has_next = position is not None if reverse else has_more
+        self.has_previous = has_more if reverse else position is not None
+        return self.page
+
+    def parse_position(self, cursor) -> tuple | None:
+        """Ключ (datetime, int) из курсора."""
+        if cursor is None or cursor.position is None:
+            return None
+        try:
+            moment, key = cursor.position.split("|")
+            return datetime.fromisoformat(moment), int(key)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+
+    def filter_position(self, queryset, position, reverse):
+        """Строки queryset после позиции (перед ней при reverse)."""
+        first, second = self.ordering
+        if position is not None:
+            lookup = "lt" if reverse else "gt"
+            queryset = queryset.filter(
+                Q(**{f"{first}__{lookup}": position[0]})
+                | Q(**{first: position[0], f"{second}__{lookup}": position[1]})
+            )
+        ordering = [
+            f"-{field}" if reverse else field for field in self.ordering
+        ]
+        return queryset.order_by(*ordering)[: self.page_size + 1]
+
+    def row_cursor(self, row, reverse: bool) -> str:
+        """Ссылка на страницу после строки row (перед ней при reverse)."""
+        moment, key = (
+            row[field] if isinstance(row, dict) else getattr(row, field)
+            for field in self.ordering
+        )
+        return self.encode_cursor(
+            Cursor(
+                offset=0,
+                reverse=reverse,
+                position=f"{moment.isoformat()}|{key}",
+            )
+        )
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.row_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.row_cursor(self.page[0], reverse=True)
+
+
+class StartsAtCursorPagination(KeysetCursorPagination):
+    """Курсорная пагинация по времени начала (starts_at, id)"""
+
+
+class SlotsCursorPagination(KeysetCursorPagination):
+    """Курсорная пагинация для слотов по (starts_at, table_id)"""
+
+    page_size = SLOTS_PAGE_SIZE
+    max_page_size = SLOTS_MAX_PAGE_SIZE
+    ordering = ("starts_at", "table_id")
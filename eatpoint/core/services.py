@@ -23,6 +23,39 @@ def time_generator(start, end, interval, time="00:00"):
     return time_list
 
 
+def combine_date_time(date, time):
+    """Дата и время "HH:MM" в datetime"""
+    if not date or not time:
+        return None
+    return datetime.combine(date, datetime.strptime(time, "%H:%M").time())
+
+
+def day_range(day):
+    """Начало дня и начало следующего дня"""
+    start = datetime.combine(day, datetime.min.time())
+    return start, start + timedelta(days=1)
+
+
+def week_range(day):
+    """Начало недели (понедельник) и начало следующей недели"""
+    start = datetime.combine(
+        day - timedelta(days=day.weekday()), datetime.min.time()
+    )
+    return start, start + timedelta(weeks=1)
+
+
+def chunked(iterable, size):
+    """Разбивает последовательность на списки длиной не более size"""
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
 def choices_generator(data: list):
     """Генерирует choices из списка"""
     return [(item, item) for item in data]
@@ -1,276 +1,295 @@
 from datetime import datetime, timedelta
 
 import pytz
-from celery import shared_task, current_app
+from celery import shared_task
 from django.conf import settings as django_settings
-from django.core.mail import send_mail
-from django.db import transaction
-
-from core.constants import AVAILABLE_DAYS, DAYS, INTERVAL_MINUTES
-from core.services import time_generator
-from establishments.models import Table
-from reservation.models import Reservation, Slot, ReservationHistory
+from django.db import connection, transaction
+
+from analytics.exports import expire_running_exports, run_export
+from analytics.models import AnalyticsExport
+from analytics.services import reconcile_recent
+from analytics.snapshots import refresh_snapshots
+from analytics.utilization import refresh_utilization
+from core.constants import (
+    EXPORT_KEEP_DAYS,
+    NOTIFICATION_KEEP_DAYS,
+    NOTIFICATION_SENT,
+    REMINDER_CONFIRM,
+    REMINDER_PLAN_WINDOW,
+    STATS_RECONCILE_DAYS,
+)
+from core.models import Notification, TaskWatermark
+from core.notifications import (
+    plan_reminders,
+    send_pending,
+    window_reminders,
+    send_reminders as send_batch_reminders,
+)
+from reservation.models import (
+    Reservation,
+    Slot,
+    TableOccupancy,
+)
+from reservation.partitions import maintain_partitions
+from reservation.services import (
+    archive_visited,
+    generate_slots,
+    purge_archived,
+    sync_establishment_slots as sync_establishment,
+    sync_table_slots as sync_table,
+)
 
 tz_moscow = pytz.timezone(django_settings.CELERY_TIMEZONE)
 
 
 @shared_task()
 def send_reminder(booking_id: int, for_client: bool = False):
-    try:
-        booking = Reservation.objects.get(id=booking_id)
-        subj = (
-            "Подтвердите бронирование"
-            if not for_client
-            else "Напоминание о бронировании"
-        )
-        context = (
-            f"телефон: {booking.telephone}"
-            if not for_client
-            else f"адрес: {booking.establishment.address}"
-        )
-        recipient_email = (
-            booking.establishment.email if not for_client else booking.email
-        )
-        slot = booking.slots.first()
-        message = f"""
-            {subj}:
-            заведение: {booking.establishment},
-            {context},
-            дата: {booking.date_reservation},
-            время: {booking.start_time_reservation},
-            зона: {slot.table.zone},
-            гостей: {slot.table.seats}
-        """
-
-        send_mail(
-            subject=subj,
-            message=message,
-            from_email=django_settings.EMAIL_HOST_USER,
-            recipient_list=[recipient_email],
-        )
-        return message
+    """Напоминание по одной брони."""
+    return send_reminders(booking_ids=[booking_id], for_client=for_client)
 
-    except Reservation.DoesNotExist:
-        return None
+
+@shared_task()
+def send_reminders(booking_ids: list[int], for_client: bool = False):
+    """Пакетная рассылка напоминаний."""
+    report = send_batch_reminders(booking_ids, for_client)
+    return (
+        f"Напоминания отправлены: {report['sent']} из {report['total']}, "
+        f"ошибок {report['failed']}, пакетов {report['batches']}, "
+        f"за {report['elapsed']} с ({report['rate']} писем/с)"
+    )
 
 
 @shared_task
 def check_unconfirmed_booking():
-    try:
-        bookings = Reservation.objects.filter(
-            is_accepted=False, is_deleted=False
+    """Напоминание заведению о неподтвержденных бронях."""
+    bookings = Reservation.objects.filter(
+        is_accepted=False, is_deleted=False, starts_at__gt=datetime.now()
+    ).values_list("id", "reservation_date")
+    due = plan_reminders(
+        (booking_id, REMINDER_CONFIRM, created)
+        for booking_id, created in bookings
+    )
+    booking_ids = [booking_id for ids in due.values() for booking_id in ids]
+    if booking_ids:
+        send_reminders.apply_async(
+            args=[booking_ids], kwargs={"for_client": False}
         )
-        for booking in bookings:
-            booking_data = booking.date_reservation
-            booking_time = datetime.strptime(
-                booking.start_time_reservation, "%H:%M"
-            ).time()
-            booking_date_time = datetime.combine(booking_data, booking_time)
-            if (
-                not booking.is_accepted
-                and booking_date_time > datetime.now()
-                and not is_task_scheduled(send_reminder, booking.id, None)
-            ):
-                send_reminder.apply_async(
-                    args=[booking.id], kwargs={"for_client": False}
-                )
-
-    except Reservation.DoesNotExist:
-        return None
+    return f"Напоминаний о подтверждении: {len(booking_ids)}"
 
 
 @shared_task
 def find_bookings_with_remind():
-    """Поиск броней с напоминанием."""
-    try:
-        bookings = Reservation.objects.filter(
-            is_accepted=True, is_deleted=False
+    """
+    Планирование напоминаний, время отправки которых попадает в окно
+    до now + REMINDER_PLAN_WINDOW.
+
+    Окно начинается с отметки прошлого запуска, если она отстает
+    (например, после простоя воркеров), иначе с текущего времени:
+    пересечение с прошлым окном подхватывает брони, подтвержденные
+    после него, повторы отсекает расписание напоминаний.
+    """
+    now = datetime.now()
+    watermark, _ = TaskWatermark.objects.get_or_create(
+        name="find_bookings_with_remind"
+    )
+    window = timedelta(minutes=REMINDER_PLAN_WINDOW)
+    start = max(min(watermark.value or now, now), now - window)
+    end = now + window
+
+    # Одна задача на каждое время отправки вместо задачи на бронь
+    due = plan_reminders(window_reminders(start, end))
+    for reminder_time, booking_ids in due.items():
+        send_reminders.apply_async(
+            args=[booking_ids],
+            kwargs={"for_client": True},
+            eta=tz_moscow.localize(reminder_time).isoformat(),
         )
-    except Reservation.DoesNotExist:
-        return "Подтвержденных броней не найдено"
-
-    for booking in bookings:
-        booking_data = booking.date_reservation
-        booking_time = datetime.strptime(
-            booking.start_time_reservation, "%H:%M"
-        ).time()
-        booking_date_time = datetime.combine(booking_data, booking_time)
-        time_now_iso = (datetime.now() - timedelta(minutes=1)).isoformat()
-
-        # За 30 минут до начала
-        reminder_time = booking_date_time - timedelta(minutes=30)
-        reminder_time = tz_moscow.localize(reminder_time).isoformat()
-        if (
-            not is_task_scheduled(send_reminder, booking.id, reminder_time)
-            and booking.reminder_half_on_hour
-            and reminder_time > time_now_iso
-        ):
-            send_reminder.apply_async(
-                args=[booking.id],
-                kwargs={"for_client": True},
-                eta=reminder_time,
-            )
-
-        # За 3 часа до начала
-        reminder_time = booking_date_time - timedelta(hours=3)
-        reminder_time = tz_moscow.localize(reminder_time).isoformat()
-        if (
-            not is_task_scheduled(send_reminder, booking.id, reminder_time)
-            and booking.reminder_three_hours
-            and reminder_time > time_now_iso
-        ):
-            send_reminder.apply_async(
-                args=[booking.id],
-                kwargs={"for_client": True},
-                eta=reminder_time,
-            )
-
-        # За 1 день до начала
-        reminder_time = booking_date_time - timedelta(days=1)
-        reminder_time = tz_moscow.localize(reminder_time).isoformat()
-        if (
-            not is_task_scheduled(send_reminder, booking.id, reminder_time)
-            and booking.reminder_one_day is True
-            and reminder_time > time_now_iso
-        ):
-            send_reminder.apply_async(
-                args=[booking.id],
-                kwargs={"for_client": True},
-                eta=reminder_time,
-            )
-
-
-def is_task_scheduled(task, booking_id, reminder_time):
-    scheduled_tasks = current_app.control.inspect().scheduled()
-    for tasks in scheduled_tasks.values():
-        for scheduled_task in tasks:
-            if (
-                scheduled_task["request"]["name"] == task.name
-                and scheduled_task["request"]["args"] == [booking_id]
-                and scheduled_task["eta"] == reminder_time
-            ):
-                return True
-    return False
+    watermark.value = end
+    watermark.save()
+    return f"Запланировано напоминаний: {sum(map(len, due.values()))}"
 
 
 @shared_task
 def delete_old_slots():
-    """Удаление слотов с датой меньше сегодняшней."""
+    """
+    Удаление слотов с датой меньше сегодняшней.
+
+    Перед удалением загрузка зон за прошедшие дни переносится
+    в почасовую загрузку, иначе она будет потеряна.
+    """
+    refresh_utilization()
     Slot.objects.filter(date__lt=datetime.now().date()).delete()
+    TableOccupancy.objects.filter(date__lt=datetime.now().date()).delete()
     return "Слоты далее сегодняшней даты удалены"
 
 
+@shared_task
+def refresh_zone_utilization():
+    """Обновление почасовой загрузки зон заведений."""
+    report = refresh_utilization()
+    return (
+        f"Загрузка зон обновлена: дней {report['days']}, "
+        f"строк {report['rows']}"
+    )
+
+
 @shared_task
 def create_slots():
     """Создание слотов."""
-    start_date = datetime.now().date()
-    days = AVAILABLE_DAYS
-
-    with transaction.atomic():
-        tables = Table.objects.filter(
-            establishment__is_verified=True, is_active=True
-        ).prefetch_related("zone__establishment")
-
-        for table in tables:
-            establishment = table.zone.establishment
-
-            for day in range(days):
-                current_date = start_date + timedelta(days=day)
-                week_day = establishment.worked.filter(
-                    day=DAYS[current_date.weekday()]
-                )
-
-                if week_day.exists() and not week_day.first().day_off:
-                    start_time = week_day.first().start
-                    end_time = week_day.first().end
-                    worked_time = time_generator(
-                        start_time, end_time, INTERVAL_MINUTES
-                    )
-
-                    for time in worked_time:
-                        if table.is_active:
-                            Slot.objects.get_or_create(
-                                establishment=establishment,
-                                zone=table.zone,
-                                date=current_date,
-                                time=time,
-                                table=table,
-                                seats=table.seats,
-                            )
-    return "Новые слоты созданы"
+    report = generate_slots()
+    return (
+        f"Новые слоты созданы: столиков {report['tables']}, "
+        f"слотов по расписанию {report['candidates']}, "
+        f"создано {report['created']}, за {report['elapsed']} с"
+    )
+
+
+@shared_task
+def sync_table_slots(table_id: int, changed: list[str] | None = None):
+    """Обновление слотов столика после его изменения."""
+    report = sync_table(table_id, changed)
+    return (
+        f"Слоты столика {table_id} обновлены: удалено {report['retired']}, "
+        f"изменено {report['updated']}, создано {report['created']}"
+    )
+
+
+@shared_task
+def sync_establishment_slots(
+    establishment_id: int, days: list[str] | None = None
+):
+    """Обновление слотов заведения после изменения времени работы."""
+    report = sync_establishment(establishment_id, days)
+    return (
+        f"Слоты заведения {establishment_id} обновлены: "
+        f"удалено {report['retired']}, создано {report['created']}"
+    )
 
 
 @shared_task
 def copy_reservation_to_archive_after_visit():
     """Копирование бронирования в архив после посещения"""
-    subj = None
-    reservations = Reservation.objects.filter(
-        is_accepted=True, is_visited=True, is_deleted=False
-    ).prefetch_related("slots")
-    for reservation in reservations:
-        slots = ";\n".join([str(slot) for slot in reservation.slots.all()])
-
-        try:
-            ReservationHistory.objects.get(reservation_id=reservation.id)
-        except ReservationHistory.DoesNotExist:
-            ReservationHistory.objects.create(
-                reservation_date=reservation.reservation_date,
-                reservation_id=reservation.id,
-                establishment=reservation.establishment,
-                date_reservation=reservation.date_reservation,
-                start_time_reservation=reservation.start_time_reservation,
-                is_accepted=reservation.is_accepted,
-                is_visited=reservation.is_visited,
-                first_name=reservation.first_name,
-                last_name=reservation.last_name,
-                email=reservation.email,
-                telephone=reservation.telephone,
-                slots=slots,
-                comment=reservation.comment,
-                reminder_one_day=reservation.reminder_one_day,
-                reminder_three_hours=reservation.reminder_three_hours,
-                reminder_half_on_hour=reservation.reminder_half_on_hour,
-            )
-            subj = "Исполненные брони скопированы в архив"
-    return subj
+    report = archive_visited()
+    if not report["archived"]:
+        return None
+    return (
+        f"Исполненные брони скопированы в архив: {report['archived']}, "
+        f"за {report['elapsed']} с"
+    )
 
 
 @shared_task
 def delete_reservation_after_visit():
     """Удаление бронирования исполненные (более 30 дней назад)"""
-
-    reservations = Reservation.objects.filter(
-        is_accepted=True,
-        is_visited=True,
-        date_reservation__lt=(datetime.now().date() - timedelta(days=30)),
+    report = purge_archived(
+        Reservation.objects.filter(
+            is_accepted=True,
+            is_visited=True,
+            date_reservation__lt=(datetime.now().date() - timedelta(days=30)),
+        )
+    )
+    if not report["deleted"]:
+        return None
+    return (
+        f"Исполненные (более 30 дней назад) брони удалены: "
+        f"{report['deleted']}, за {report['elapsed']} с"
     )
-    subj = None
-    for reservation in reservations:
-        try:
-            ReservationHistory.objects.get(reservation_id=reservation.id)
-            reservation.delete()
-        except ReservationHistory.DoesNotExist:
-            continue
-        else:
-            subj = "Исполненные (более 30 дней назад) брони удалены"
-    return subj
 
 
 @shared_task
 def delete_rejected_reservation():
     """Удаление отмененных бронирований (выполняется каждое 1 число)"""
+    report = purge_archived(
+        Reservation.objects.filter(
+            is_deleted=True,
+            date_reservation__lt=(datetime.now().date()),
+        )
+    )
+    if not report["deleted"]:
+        return None
+    return (
+        f"Отменённые брони удалены: {report['deleted']}, "
+        f"за {report['elapsed']} с"
+    )
+
+
+@shared_task
+def create_history_partitions():
+    """Создание секций архива броней на ближайшие месяцы (Postgres)."""
+    if connection.vendor != "postgresql":
+        return None
+    with transaction.atomic(), connection.cursor() as cursor:
+        report = maintain_partitions(cursor, datetime.now().date())
+    return f"Создано секций архива: {len(report['created'])}"
+
+
+@shared_task
+def reconcile_daily_stats():
+    """Сверка статистики броней за последние дни с самими бронями."""
+    report = reconcile_recent(STATS_RECONCILE_DAYS)
+    return (
+        f"Статистика броней сверена: дней {report['days']}, "
+        f"исправлено {report['fixed']}"
+    )
+
+
+@shared_task
+def export_analytics(export_id: int):
+    """Выгрузка броней владельца в файл."""
+    export = AnalyticsExport.objects.filter(id=export_id).first()
+    if export is None:
+        return None
+    run_export(export)
+    return (
+        f"Выгрузка {export_id}: {export.get_status_display()}, "
+        f"строк {export.rows}"
+    )
 
-    reservations = Reservation.objects.filter(
-        is_deleted=True,
-        date_reservation__lt=(datetime.now().date()),
+
+@shared_task
+def expire_exports():
+    """Завершение выгрузок, прерванных вместе с воркером."""
+    return f"Прерванных выгрузок: {expire_running_exports()}"
+
+
+@shared_task
+def delete_old_exports():
+    """Удаление старых выгрузок вместе с файлами."""
+    exports = AnalyticsExport.objects.filter(
+        created_at__lt=datetime.now() - timedelta(days=EXPORT_KEEP_DAYS)
+    )
+    for export in exports.iterator():
+        export.file.delete(save=False)
+    deleted, _ = exports.delete()
+    return f"Старые выгрузки удалены: {deleted}"
+
+
+@shared_task
+def build_analytics_snapshots():
+    """Ночные снимки броней владельцев для аналитики воронки и когорт."""
+    report = refresh_snapshots()
+    return (
+        f"Снимки броней построены: владельцев {report['owners']}, "
+        f"ошибок {report['failed']}, строк {report['rows']}, "
+        f"{report['elapsed']} с"
+    )
+
+
+@shared_task
+def send_notifications():
+    """Отправка очереди исходящих писем."""
+    report = send_pending()
+    return (
+        f"Письма отправлены: {report['sent']}, "
+        f"отложено {report['failed']}, в архив ошибок {report['dead']}"
     )
-    subj = None
-    for reservation in reservations:
-        try:
-            ReservationHistory.objects.get(reservation_id=reservation.id)
-            reservation.delete()
-        except ReservationHistory.DoesNotExist:
-            continue
-        else:
-            subj = "Отменённые брони (более 30 дней назад) удалены"
-    return subj
+
+
+@shared_task
+def delete_sent_notifications():
+    """Удаление давно отправленных писем."""
+    Notification.objects.filter(
+        status=NOTIFICATION_SENT,
+        sent_at__lt=datetime.now() - timedelta(days=NOTIFICATION_KEEP_DAYS),
+    ).delete()
+    return "Отправленные письма удалены"
@@ -28,6 +28,10 @@ app.conf.beat_schedule = {
         "task": "core.tasks.delete_old_slots",
         "schedule": crontab(hour=0, minute=5),
     },
+    "refresh_zone_utilization": {
+        "task": "core.tasks.refresh_zone_utilization",
+        "schedule": crontab(minute=50),
+    },
     "copy_reservation_to_archive_after_visit": {
         "task": "core.tasks.copy_reservation_to_archive_after_visit",
         "schedule": crontab(minute="*/3"),
@@ -36,6 +40,34 @@ app.conf.beat_schedule = {
         "task": "core.tasks.delete_reservation_after_visit",
         "schedule": crontab(minute="*/3"),
     },
+    "create_history_partitions": {
+        "task": "core.tasks.create_history_partitions",
+        "schedule": crontab(hour=0, minute=20),
+    },
+    "reconcile_daily_stats": {
+        "task": "core.tasks.reconcile_daily_stats",
+        "schedule": crontab(hour=0, minute=30),
+    },
+    "expire_exports": {
+        "task": "core.tasks.expire_exports",
+        "schedule": crontab(minute="*/15"),
+    },
+    "delete_old_exports": {
+        "task": "core.tasks.delete_old_exports",
+        "schedule": crontab(hour=0, minute=40),
+    },
+    "build_analytics_snapshots": {
+        "task": "core.tasks.build_analytics_snapshots",
+        "schedule": crontab(hour=1, minute=0),
+    },
+    "send_notifications": {
+        "task": "core.tasks.send_notifications",
+        "schedule": crontab(minute="*/1"),
+    },
+    "delete_sent_notifications": {
+        "task": "core.tasks.delete_sent_notifications",
+        "schedule": crontab(hour=0, minute=15),
+    },
     "delete_rejected_reservation": {
         "task": "core.tasks.delete_rejected_reservation",
         "schedule": crontab(day_of_month=1, hour=0, minute=0),
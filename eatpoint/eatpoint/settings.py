@@ -262,6 +262,60 @@ EMAIL_ADMIN = EMAIL_HOST_USER
 TIME_INPUT_FORMATS = ("%I:%M",)
 PHONENUMBER_DEFAULT_REGION = "RU"
 
+# Источник свободных слотов: "materialized" - слоты создаются заранее
+# на AVAILABLE_DAYS дней, "computed" - вычисляются по времени работы
+# и занятым слотам при запросе
+SLOTS_ENGINE = os.getenv("SLOTS_ENGINE", default="materialized")
+
+# Рассылка напоминаний: писем на одно SMTP-соединение и ограничение
+# скорости в письмах в секунду (0 - без ограничения)
+REMINDER_BATCH_SIZE = int(os.getenv("REMINDER_BATCH_SIZE", default=100))
+REMINDER_RATE_LIMIT = float(os.getenv("REMINDER_RATE_LIMIT", default=0))
+
+# Кэш ответов аналитики (Redis). Без ANALYTICS_CACHE_URL используется
+# кэш в памяти процесса. Записи живут ANALYTICS_CACHE_TTL секунд
+# и сбрасываются раньше при изменении броней владельца
+ANALYTICS_CACHE_URL = os.getenv(
+    "ANALYTICS_CACHE_URL", default="redis://redis:6379/1"
+)
+ANALYTICS_CACHE_TTL = int(os.getenv("ANALYTICS_CACHE_TTL", default=60))
+
+# Каталог ночных снимков броней владельцев для когортной аналитики
+# (не раздается как MEDIA: в снимках есть данные гостей)
+ANALYTICS_SNAPSHOT_ROOT = os.getenv(
+    "ANALYTICS_SNAPSHOT_ROOT",
+    default=os.path.join(BASE_DIR, "snapshots"),
+)
+
+# Каталог файлов выгрузок броней (не раздается как MEDIA: в выгрузках
+# есть данные гостей, файлы отдаются только владельцу через API)
+ANALYTICS_EXPORT_ROOT = os.getenv(
+    "ANALYTICS_EXPORT_ROOT",
+    default=os.path.join(BASE_DIR, "exports"),
+)
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "analytics": {
+        "BACKEND": "django_redis.cache.RedisCache",
+        "LOCATION": ANALYTICS_CACHE_URL,
+        "TIMEOUT": ANALYTICS_CACHE_TTL,
+        "OPTIONS": {
+            "SOCKET_CONNECT_TIMEOUT": 1,
+            "SOCKET_TIMEOUT": 1,
+            "IGNORE_EXCEPTIONS": True,
+        },
+    }
+    if ANALYTICS_CACHE_URL
+    else {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "analytics",
+        "TIMEOUT": ANALYTICS_CACHE_TTL,
+    },
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.MinimumLengthValidator",
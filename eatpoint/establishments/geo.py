@@ -0,0 +1,106 @@
+from math import cos, radians
+
+from django.db import connection
+from django.db.models import BooleanField, F, FloatField, Func, QuerySet, Value
+from django.db.models.functions import ASin, Cos, Power, Radians, Sin, Sqrt
+
+from core.constants import EARTH_RADIUS_KM, KM_PER_DEGREE
+
+
+class LlToEarth(Func):
+    """Точка на поверхности Земли из широты и долготы (earthdistance)"""
+
+    function = "ll_to_earth"
+    output_field = FloatField()
+
+
+class EarthBox(Func):
+    """Куб, содержащий окружность радиусом в метрах (earthdistance)"""
+
+    function = "earth_box"
+    output_field = FloatField()
+
+
+class EarthDistance(Func):
+    """Расстояние между точками в метрах (earthdistance)"""
+
+    function = "earth_distance"
+    output_field = FloatField()
+
+
+class CubeContains(Func):
+    """Первый куб содержит второй: оператор @> (cube)"""
+
+    arg_joiner = " @> "
+    template = "(%(expressions)s)"
+    output_field = BooleanField()
+
+
+def postgres_nearby(
+    queryset: QuerySet, latitude: float, longitude: float, radius: float
+) -> QuerySet:
+    """
+    Заведения в радиусе radius км на Postgres.
+
+    Грубый отбор по earth_box идет по GiST-индексу
+    establishment_earth_idx, точное расстояние считается
+    earth_distance только для отобранных заведений.
+    """
+    center = LlToEarth(Value(latitude), Value(longitude))
+    point = LlToEarth(F("latitude"), F("longitude"))
+    return (
+        queryset.filter(
+            CubeContains(EarthBox(center, Value(radius * 1000)), point)
+        )
+        .annotate(distance=EarthDistance(center, point) / 1000)
+        .filter(distance__lte=radius)
+    )
+
+
+def haversine_nearby(
+    queryset: QuerySet, latitude: float, longitude: float, radius: float
+) -> QuerySet:
+    """
+    Заведения в радиусе radius км без расширений Postgres: отбор
+    по ограничивающему прямоугольнику и расстояние по формуле гаверсинуса.
+    """
+    delta_latitude = radius / KM_PER_DEGREE
+    delta_longitude = radius / (
+        KM_PER_DEGREE * max(cos(radians(latitude)), 0.01)
+    )
+    sin_latitude = Sin(Radians(F("latitude") - latitude) / 2)
+    sin_longitude = Sin(Radians(F("longitude") - longitude) / 2)
+    cos_latitudes = Cos(Radians(Value(latitude))) * Cos(Radians(F("latitude")))
+    half_chord = Power(sin_latitude, 2) + cos_latitudes * Power(
+        sin_longitude, 2
+    )
+    return (
+        queryset.filter(
+            latitude__range=(
+                latitude - delta_latitude,
+                latitude + delta_latitude,
+            ),
+            longitude__range=(
+                longitude - delta_longitude,
+                longitude + delta_longitude,
+            ),
+        )
+        .annotate(
+            distance=2
+            * EARTH_RADIUS_KM
+            * ASin(Sqrt(half_chord), output_field=FloatField())
+        )
+        .filter(distance__lte=radius)
+    )
+
+
+def nearby(
+    queryset: QuerySet, latitude: float, longitude: float, radius: float
+) -> QuerySet:
+    """
+    Заведения не дальше radius км от точки, с расстоянием в км
+    в аннотации distance.
+    """
+    if connection.vendor == "postgresql":
+        return postgres_nearby(queryset, latitude, longitude, radius)
+    return haversine_nearby(queryset, latitude, longitude, radius)
@@ -0,0 +1,68 @@
+import random
+from time import monotonic
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Max, Min
+
+from core.constants import LOCATION_RADIUS_KM
+from establishments.geo import nearby
+from establishments.models import Establishment
+
+
+class Command(BaseCommand):
+    help = (
+        "Замер поиска заведений рядом: запросы из случайных точек "
+        "в пределах координат заведений, сортировка по расстоянию"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--queries", type=int, default=100)
+        parser.add_argument("--radius", type=float, default=LOCATION_RADIUS_KM)
+        parser.add_argument("--limit", type=int, default=20)
+
+    def handle(self, *args, **options):
+        located = Establishment.objects.filter(
+            latitude__isnull=False, longitude__isnull=False
+        )
+        bounds = located.aggregate(
+            min_latitude=Min("latitude"),
+            max_latitude=Max("latitude"),
+            min_longitude=Min("longitude"),
+            max_longitude=Max("longitude"),
+        )
+        if bounds["min_latitude"] is None:
+            raise CommandError("Нет заведений с координатами")
+
+        timings, found = [], 0
+        for _ in range(options["queries"]):
+            latitude = random.uniform(
+                bounds["min_latitude"], bounds["max_latitude"]
+            )
+            longitude = random.uniform(
+                bounds["min_longitude"], bounds["max_longitude"]
+            )
+            query = nearby(
+                located, latitude, longitude, options["radius"]
+            ).order_by("distance", "id")[: options["limit"]]
+            started = monotonic()
+            found += len(list(query.values_list("id", "distance")))
+            timings.append(monotonic() - started)
+
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                sql, params = query.query.sql_with_params()
+                cursor.execute(f"EXPLAIN {sql}", params)
+                for (line,) in cursor.fetchall():
+                    self.stdout.write(line)
+
+        timings.sort()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Заведений с координатами {located.count()}, "
+                f"запросов {len(timings)}, найдено в среднем "
+                f"{found / len(timings):.1f}, медиана "
+                f"{timings[len(timings) // 2] * 1000:.1f} мс, "
+                f"макс. {timings[-1] * 1000:.1f} мс"
+            )
+        )
@@ -0,0 +1,69 @@
+# Generated by Django 4.2.5 on 2026-10-18 17:02
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def fill_rating(apps, schema_editor):
+    """Заполняет рейтинг заведений по уже оставленным отзывам"""
+    Establishment = apps.get_model("establishments", "Establishment")
+    Review = apps.get_model("reviews", "Review")
+    rated = (
+        Review.objects.values("establishment_id")
+        .annotate(total=Sum("score"), count=Count("id"))
+        .order_by()
+    )
+    Establishment.objects.bulk_update(
+        [
+            Establishment(
+                id=row["establishment_id"],
+                rating_sum=row["total"],
+                review_count=row["count"],
+                rating=row["total"] / row["count"],
+            )
+            for row in rated
+        ],
+        ["rating_sum", "review_count", "rating"],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("establishments", "0009_table"),
+        ("reviews", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="establishment",
+            name="rating",
+            field=models.FloatField(
+                default=0,
+                editable=False,
+                verbose_name="Средняя оценка (0 - нет отзывов)",
+            ),
+        ),
+        migrations.AddField(
+            model_name="establishment",
+            name="rating_sum",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Сумма оценок"
+            ),
+        ),
+        migrations.AddField(
+            model_name="establishment",
+            name="review_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Количество отзывов"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="establishment",
+            index=models.Index(
+                fields=["is_verified", "rating"],
+                name="establishment_rating_idx",
+            ),
+        ),
+        migrations.RunPython(fill_rating, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+from django.db import migrations
+
+EARTH_INDEX = "establishment_earth_idx"
+
+
+def create_earth_index(apps, schema_editor):
+    """
+    Расширения cube и earthdistance и GiST-индекс по точке заведения
+    для поиска в радиусе. Только для Postgres.
+    """
+    connection = schema_editor.connection
+    if connection.vendor != "postgresql":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS cube")
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS earthdistance")
+        cursor.execute(
+            f"CREATE INDEX IF NOT EXISTS {EARTH_INDEX} "
+            f"ON establishments_establishment "
+            f"USING gist (ll_to_earth(latitude, longitude))"
+        )
+
+
+def drop_earth_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != "postgresql":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DROP INDEX IF EXISTS {EARTH_INDEX}")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("establishments", "0010_establishment_rating"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_earth_index, drop_earth_index),
+    ]
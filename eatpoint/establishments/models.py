@@ -7,6 +7,9 @@ from core.choices import DAY_CHOICES, TIME_CHOICES, CHECK_CHOICES
 from core.constants import MAX_SEATS, MIN_SEATS
 from users.models import User
 
+# Поля рейтинга заведения, которые поддерживаются отзывами
+RATING_FIELDS = ("rating_sum", "review_count", "rating")
+
 
 class Kitchen(models.Model):
     """Кухня"""
@@ -186,16 +189,50 @@ class Establishment(models.Model):
         verbose_name="Верификация заведения",
         default=False,
     )
+    rating_sum = models.PositiveIntegerField(
+        verbose_name="Сумма оценок",
+        default=0,
+        editable=False,
+    )
+    review_count = models.PositiveIntegerField(
+        verbose_name="Количество отзывов",
+        default=0,
+        editable=False,
+    )
+    rating = models.FloatField(
+        verbose_name="Средняя оценка (0 - нет отзывов)",
+        default=0,
+        editable=False,
+    )
 
     class Meta:
         verbose_name = "Заведение"
         verbose_name_plural = "Заведения"
+        indexes = [
+            models.Index(
+                fields=["is_verified", "rating"],
+                name="establishment_rating_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
     def save(self, *args, **kwargs):
-        self.full_clean()
+        # Отложенные поля (.only()/.defer()) не изменялись: их не
+        # проверяем и не сохраняем, чтобы не загружать по одному запросу
+        deferred = self.get_deferred_fields()
+        self.full_clean(exclude=deferred)
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            # Рейтинг меняют только отзывы выражениями F(), сохранение
+            # заведения не должно затирать его устаревшими значениями
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in RATING_FIELDS
+                and field.attname not in deferred
+            ]
         super().save(*args, **kwargs)
 
 
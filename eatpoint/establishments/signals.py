@@ -1,19 +1,29 @@
-from datetime import datetime, timedelta
+from threading import local
+
 from geopy import Nominatim
 
-from core.services import days_available, time_generator
-from core.constants import AVAILABLE_DAYS, INTERVAL_MINUTES, DAYS
+from core import tasks
+from core.services import days_available
 from establishments.models import (
     WorkEstablishment,
     ZoneEstablishment,
     Establishment,
     Table,
 )
-from django.db.models.signals import post_save, pre_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 
 from reservation.models import Availability
-from reservation.models import Slot
+
+# Поля, изменение которых требует пересчета слотов
+TABLE_SLOT_FIELDS = ("is_active", "seats", "zone_id")
+WORK_SLOT_FIELDS = ("day", "day_off", "start", "end")
+ZONE_SLOT_FIELDS = ("establishment_id",)
+ESTABLISHMENT_SLOT_FIELDS = ("is_verified",)
+
+# Заведения, ожидающие обновления слотов после коммита (по потокам)
+_pending_slots = local()
 
 
 @receiver(post_save, sender=WorkEstablishment)
@@ -60,38 +70,122 @@ def create_coordinates_by_address(sender, instance, **kwargs):
         )
 
 
+def remember_state(sender, instance, fields):
+    """Запоминает значения полей до сохранения"""
+    instance._slots_state = (
+        sender.objects.filter(pk=instance.pk).values(*fields).first()
+        if instance.pk
+        else None
+    )
+
+
+def changed_fields(instance, fields):
+    """Поля, изменившиеся при сохранении"""
+    state = getattr(instance, "_slots_state", None)
+    if state is None:
+        return list(fields)
+    return [
+        field for field in fields if state[field] != getattr(instance, field)
+    ]
+
+
+@receiver(pre_save, sender=Table)
+def remember_table(sender, instance, **kwargs):
+    remember_state(sender, instance, TABLE_SLOT_FIELDS)
+
+
 @receiver(post_save, sender=Table)
-def create_slots(sender, instance, **kwargs):
-    table = instance
-    zone = table.zone
-    establishment = zone.establishment
-    start_date = datetime.now().date()
-    days = AVAILABLE_DAYS
-
-    for day in range(days):
-        current_date = start_date + timedelta(days=day)
-
-        # Проверяем, является ли текущий день рабочим для заведения
-        week_day = establishment.worked.filter(
-            day=DAYS[current_date.weekday()]
+def sync_table_slots(sender, instance, **kwargs):
+    """Обновляет слоты столика, если изменились влияющие на них поля"""
+    changed = changed_fields(instance, TABLE_SLOT_FIELDS)
+    if changed:
+        transaction.on_commit(
+            lambda: tasks.sync_table_slots.delay(instance.id, changed)
         )
 
-        if week_day.exists() and not week_day.first().day_off:
-            # Получаем рабочие часы заведения
-            start_time = week_day.first().start
-            end_time = week_day.first().end
-            worked_time = time_generator(
-                start_time, end_time, INTERVAL_MINUTES
-            )
-
-            # Создаем слоты для каждой половины часа в рабочие часы
-            for time in worked_time:
-                if table.is_active:
-                    Slot.objects.get_or_create(
-                        establishment=establishment,
-                        zone=zone,
-                        date=current_date,
-                        time=time,
-                        table=table,
-                        seats=table.seats,
-                    )
+
+@receiver(pre_save, sender=WorkEstablishment)
+def remember_work(sender, instance, **kwargs):
+    remember_state(sender, instance, WORK_SLOT_FIELDS)
+
+
+@receiver(post_save, sender=WorkEstablishment)
+def sync_work_slots(sender, instance, **kwargs):
+    """Обновляет слоты заведения на измененные дни недели"""
+    if not changed_fields(instance, WORK_SLOT_FIELDS):
+        return
+    days = [instance.day]
+    state = instance._slots_state
+    if state is not None and state["day"] != instance.day:
+        days.append(state["day"])
+    enqueue_establishment_slots(instance.establishment_id, days)
+
+
+@receiver(post_delete, sender=WorkEstablishment)
+def retire_work_slots(sender, instance, **kwargs):
+    """Удаляет слоты заведения на удаленный день недели"""
+    enqueue_establishment_slots(instance.establishment_id, [instance.day])
+
+
+@receiver(pre_save, sender=ZoneEstablishment)
+def remember_zone(sender, instance, **kwargs):
+    remember_state(sender, instance, ZONE_SLOT_FIELDS)
+
+
+@receiver(post_save, sender=ZoneEstablishment)
+def sync_zone_slots(sender, instance, created, **kwargs):
+    """Переносит слоты столиков зоны в другое заведение"""
+    if created or not changed_fields(instance, ZONE_SLOT_FIELDS):
+        return
+    table_ids = list(instance.tables.values_list("id", flat=True))
+    transaction.on_commit(
+        lambda: [
+            tasks.sync_table_slots.delay(table_id, ["zone_id"])
+            for table_id in table_ids
+        ]
+    )
+
+
+@receiver(pre_save, sender=Establishment)
+def remember_establishment(sender, instance, **kwargs):
+    remember_state(sender, instance, ESTABLISHMENT_SLOT_FIELDS)
+
+
+@receiver(post_save, sender=Establishment)
+def sync_verified_slots(sender, instance, created, **kwargs):
+    """Создает или удаляет слоты при смене верификации заведения"""
+    if created or not changed_fields(instance, ESTABLISHMENT_SLOT_FIELDS):
+        return
+    enqueue_establishment_slots(instance.id)
+
+
+def enqueue_establishment_slots(establishment_id, days=None):
+    """
+    Ставит в очередь обновление слотов заведения после коммита.
+
+    Вызовы в одной транзакции (например, удаление всего расписания
+    и запись нового) объединяются: на заведение ставится одна задача
+    по объединению дней (None - все дни). Обновление слотов
+    идемпотентно, поэтому остаток после отката транзакции безопасно
+    отправить со следующей.
+    """
+    if establishment_id is None:
+        return
+    pending = getattr(_pending_slots, "establishments", None)
+    if pending is None:
+        pending = _pending_slots.establishments = {}
+    if days is None or pending.get(establishment_id, set()) is None:
+        pending[establishment_id] = None
+    else:
+        pending.setdefault(establishment_id, set()).update(days)
+    transaction.on_commit(send_establishment_slots)
+
+
+def send_establishment_slots():
+    """Отправляет накопленные обновления слотов заведений"""
+    pending = getattr(_pending_slots, "establishments", None) or {}
+    _pending_slots.establishments = {}
+    for establishment_id, days in pending.items():
+        tasks.sync_establishment_slots.delay(
+            establishment_id, sorted(days) if days is not None else None
+        )
@@ -26,7 +26,7 @@ class ReservationHistory(admin.ModelAdmin):
     list_display = (
         "id",
         "reservation_id",
-        "establishment",
+        "establishment_name",
         "date_reservation",
         "start_time_reservation",
         "is_visited",
@@ -39,6 +39,7 @@ class ReservationHistory(admin.ModelAdmin):
         "establishment",
         "date_reservation",
     )
+    raw_id_fields = ("establishment", "owner")
     empty_value_display = "-пусто-"
 
 
@@ -0,0 +1,114 @@
+from datetime import date, datetime
+from math import ceil
+
+from core.constants import DAYS, INTERVAL_MINUTES
+from core.services import combine_date_time
+from reservation.models import Slot
+from reservation.occupancy import (
+    bit_to_time,
+    mask_to_bits,
+    occupancy_masks,
+    times_to_mask,
+)
+from reservation.services import active_tables, get_work_schedule, window_dates
+
+
+def available_slots(
+    establishment_id: int,
+    slot_date: date | None = None,
+    seats: int | None = None,
+    zone: str | None = None,
+    position: tuple | None = None,
+    reverse: bool = False,
+):
+    """
+    Свободные слоты заведения без предварительно созданных записей.
+
+    Для каждого столика и дня маска часов работы заведения очищается
+    от занятых интервалов из индекса занятости (TableOccupancy),
+    оставшиеся биты превращаются в слоты.
+    Строки выдаются по порядку (starts_at, table_id) после ключа
+    position (в обратном порядке перед ним при reverse) и совпадают
+    по ключам с AvailableSlotsViewSet.get_queryset, id заполняется
+    только для уже существующих записей.
+    """
+    tables = active_tables().filter(zone__establishment_id=establishment_id)
+    if seats is not None:
+        tables = tables.filter(seats=seats)
+    if zone:
+        tables = tables.filter(zone__zone=zone)
+    tables = list(
+        tables.select_related("zone", "zone__establishment").order_by("id")
+    )
+    dates = window_dates()
+    if slot_date is not None:
+        dates = [item for item in dates if item == slot_date]
+    if position is not None:
+        first = position[0].date()
+        dates = [
+            item
+            for item in dates
+            if (item <= first if reverse else item >= first)
+        ]
+    if not tables or not dates:
+        return
+
+    schedule = {
+        day: times_to_mask(times)
+        for (_, day), times in get_work_schedule([establishment_id]).items()
+    }
+    booked = occupancy_masks([table.id for table in tables], dates)
+    now = datetime.now()
+    # Начавшийся интервал уже не предлагается, как и в выборке
+    # слотов по starts_at >= текущей минуты
+    started = ceil((now.hour * 60 + now.minute) / INTERVAL_MINUTES)
+    passed = (1 << started) - 1
+    if reverse:
+        dates.reverse()
+        tables.reverse()
+
+    for current_date in dates:
+        day_mask = schedule.get(DAYS[current_date.weekday()], 0)
+        if current_date == now.date():
+            day_mask &= ~passed
+        bits = list(mask_to_bits(day_mask))
+        for bit in reversed(bits) if reverse else bits:
+            time = bit_to_time(bit)
+            starts_at = combine_date_time(current_date, time)
+            for table in tables:
+                if booked.get((table.id, current_date), 0) >> bit & 1:
+                    continue
+                key = (starts_at, table.id)
+                if position is not None and (
+                    key >= position if reverse else key <= position
+                ):
+                    continue
+                yield {
+                    "id": None,
+                    "date": current_date,
+                    "time": time,
+                    "starts_at": starts_at,
+                    "zone_id": table.zone_id,
+                    "zone__zone": table.zone.zone,
+                    "table_id": table.id,
+                    "table__number": table.number,
+                    "table__seats": table.seats,
+                    "establishment__id": establishment_id,
+                    "establishment__name": table.zone.establishment.name,
+                }
+
+
+def attach_slot_ids(rows: list[dict]) -> list[dict]:
+    """Проставляет строкам id уже созданных записей слотов."""
+    if not rows:
+        return rows
+    ids = {
+        (table_id, slot_date, time): slot_id
+        for table_id, slot_date, time, slot_id in Slot.objects.filter(
+            table_id__in={row["table_id"] for row in rows},
+            date__in={row["date"] for row in rows},
+        ).values_list("table_id", "date", "time", "id")
+    }
+    for row in rows:
+        row["id"] = ids.get((row["table_id"], row["date"], row["time"]))
+    return rows
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from core.constants import ARCHIVE_BATCH_SIZE
+from reservation.services import backfill_history_establishments
+
+
+class Command(BaseCommand):
+    help = (
+        "Заполняет заведение и владельца в архивных записях броней "
+        "по сохраненному названию заведения"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=ARCHIVE_BATCH_SIZE
+        )
+
+    def handle(self, *args, **options):
+        report = backfill_history_establishments(
+            batch_size=options["batch_size"]
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Обновлено записей: {report['updated']} "
+                f"за {report['elapsed']} с"
+            )
+        )
+        if report["unresolved"]:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"Не найдено заведение для записей: "
+                    f"{report['unresolved']}"
+                )
+            )
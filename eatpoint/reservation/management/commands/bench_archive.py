@@ -0,0 +1,84 @@
+from time import monotonic
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from core.constants import ARCHIVE_BATCH_SIZE
+from core.services import chunked
+from reservation.models import Reservation, ReservationHistory, Slot
+from reservation.services import archive_visited
+
+BENCH_EMAIL = "bench-archive@eatpoint.local"
+
+
+class Command(BaseCommand):
+    help = (
+        "Нагрузочная проверка архивации: создает посещенные брони, "
+        "переносит их в архив и удаляет тестовые данные"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=100_000)
+        parser.add_argument(
+            "--batch-size", type=int, default=ARCHIVE_BATCH_SIZE
+        )
+
+    def create_reservations(self, slot, count):
+        Through = Reservation.slots.through
+        for chunk in chunked(range(count), ARCHIVE_BATCH_SIZE):
+            reservations = Reservation.objects.bulk_create(
+                [
+                    Reservation(
+                        establishment_id=slot.establishment_id,
+                        date_reservation=slot.date,
+                        start_time_reservation=slot.time,
+                        starts_at=slot.starts_at,
+                        is_accepted=True,
+                        is_visited=True,
+                        first_name="bench",
+                        email=BENCH_EMAIL,
+                    )
+                    for _ in chunk
+                ]
+            )
+            Through.objects.bulk_create(
+                [
+                    Through(reservation_id=reservation.id, slot_id=slot.id)
+                    for reservation in reservations
+                ]
+            )
+
+    def handle(self, *args, **options):
+        slot = Slot.objects.first()
+        if slot is None:
+            raise CommandError("Нет слотов для тестовых броней")
+
+        count = options["count"]
+        started = monotonic()
+        self.create_reservations(slot, count)
+        self.stdout.write(
+            f"Создано броней: {count} за {monotonic() - started:.1f} с"
+        )
+
+        reservations = Reservation.objects.filter(email=BENCH_EMAIL)
+        try:
+            with CaptureQueriesContext(connection) as queries:
+                report = archive_visited(batch_size=options["batch_size"])
+            rate = (
+                report["archived"] / report["elapsed"]
+                if report["elapsed"]
+                else report["archived"]
+            )
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"В архив перенесено: {report['archived']} "
+                    f"за {report['elapsed']} с ({rate:.0f} броней/с), "
+                    f"запросов: {len(queries)}"
+                )
+            )
+        finally:
+            ReservationHistory.objects.filter(
+                reservation_id__in=reservations.values("id")
+            ).delete()
+            reservations.delete()
@@ -0,0 +1,80 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier
+from time import monotonic
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from core.exeptions import SlotsUnavailableException
+from reservation.models import Reservation, Slot
+from reservation.occupancy import release_slots
+from reservation.services import create_reservation, delete_reservation
+
+BENCH_EMAIL = "bench-booking@eatpoint.local"
+
+
+class Command(BaseCommand):
+    help = (
+        "Нагрузочная проверка бронирования: параллельные запросы "
+        "бронируют один и тот же слот, успешной должна быть ровно одна бронь"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--slot", type=int, help="id свободного слота")
+        parser.add_argument("--workers", type=int, default=20)
+        parser.add_argument("--rounds", type=int, default=5)
+
+    def book(self, barrier, slot):
+        barrier.wait()
+        started = monotonic()
+        try:
+            create_reservation(
+                slot.establishment,
+                {
+                    "slots": [slot],
+                    "first_name": "bench",
+                    "email": BENCH_EMAIL,
+                },
+            )
+            return True, monotonic() - started
+        except SlotsUnavailableException:
+            return False, monotonic() - started
+        finally:
+            connection.close()
+
+    def handle(self, *args, **options):
+        slots = Slot.objects.select_related("establishment").filter(
+            is_active=True
+        )
+        if options["slot"]:
+            slots = slots.filter(id=options["slot"])
+        slot = slots.first()
+        if slot is None:
+            raise CommandError("Нет свободного слота для проверки")
+
+        workers = options["workers"]
+        for current in range(1, options["rounds"] + 1):
+            barrier = Barrier(workers)
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(
+                    executor.map(
+                        lambda _: self.book(barrier, slot), range(workers)
+                    )
+                )
+            booked = sum(1 for success, _ in results if success)
+            latency = max(elapsed for _, elapsed in results)
+            reservations = Reservation.objects.filter(
+                slots=slot, email=BENCH_EMAIL
+            )
+            style = self.style.SUCCESS if booked == 1 else self.style.ERROR
+            self.stdout.write(
+                style(
+                    f"Раунд {current}: слот {slot.id}, запросов {workers}, "
+                    f"броней {booked}, отказов {workers - booked}, "
+                    f"макс. время {latency * 1000:.1f} мс"
+                )
+            )
+            release_slots(Slot.objects.filter(id=slot.id))
+            # Через сервис: бронь убирается и из статистики броней
+            for reservation in reservations:
+                delete_reservation(reservation)
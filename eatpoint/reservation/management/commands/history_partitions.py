@@ -0,0 +1,57 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from core.constants import HISTORY_PARTITIONS_AHEAD
+from reservation.partitions import maintain_partitions
+
+
+class Command(BaseCommand):
+    help = (
+        "Создает помесячные секции архива броней на несколько месяцев "
+        "вперед и отключает старые секции (только Postgres)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--ahead",
+            type=int,
+            default=HISTORY_PARTITIONS_AHEAD,
+            help="На сколько месяцев вперед создать секции",
+        )
+        parser.add_argument(
+            "--keep",
+            type=int,
+            help="Сколько последних месяцев оставить подключенными",
+        )
+        parser.add_argument(
+            "--drop",
+            action="store_true",
+            help="Удалять отключенные секции",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            self.stdout.write(
+                self.style.WARNING(
+                    "Секционирование доступно только в Postgres"
+                )
+            )
+            return
+        with transaction.atomic(), connection.cursor() as cursor:
+            report = maintain_partitions(
+                cursor,
+                datetime.now().date(),
+                ahead=options["ahead"],
+                keep=options["keep"],
+                drop=options["drop"],
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Создано секций: {len(report['created'])}, "
+                f"отключено: {len(report['detached'])}"
+            )
+        )
+        for name in report["created"] + report["detached"]:
+            self.stdout.write(f"  {name}")
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from reservation.occupancy import rebuild_occupancy
+
+
+class Command(BaseCommand):
+    help = "Пересобирает индекс занятости столиков по занятым слотам"
+
+    def handle(self, *args, **options):
+        count = rebuild_occupancy()
+        self.stdout.write(
+            self.style.SUCCESS(f"Индекс занятости пересобран: {count} записей")
+        )
@@ -0,0 +1,48 @@
+# Generated by Django 4.2.5 on 2026-10-18 16:24
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def remove_duplicate_slots(apps, schema_editor):
+    """Оставляет один слот на (столик, дата, время), переносит брони"""
+    Slot = apps.get_model("reservation", "Slot")
+    Reservation = apps.get_model("reservation", "Reservation")
+    Through = Reservation.slots.through
+    duplicates = (
+        Slot.objects.values("table", "date", "time")
+        .annotate(count=Count("id"))
+        .filter(count__gt=1)
+        .order_by()
+    )
+    for duplicate in duplicates:
+        slots = Slot.objects.filter(
+            table=duplicate["table"],
+            date=duplicate["date"],
+            time=duplicate["time"],
+        ).order_by("is_active", "id")
+        keep = slots.first()
+        removable = slots.exclude(id=keep.id)
+        linked = Through.objects.filter(slot=keep).values("reservation")
+        Through.objects.filter(slot__in=removable).exclude(
+            reservation__in=linked
+        ).update(slot=keep)
+        removable.delete()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("reservation", "0006_alter_slot_options_reservation_is_deleted"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            remove_duplicate_slots, migrations.RunPython.noop
+        ),
+        migrations.AddConstraint(
+            model_name="slot",
+            constraint=models.UniqueConstraint(
+                fields=("table", "date", "time"), name="unique_slot"
+            ),
+        ),
+    ]
@@ -0,0 +1,82 @@
+# Generated by Django 4.2.5 on 2026-10-18 16:28
+
+from datetime import datetime
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+# Длина интервала слота на момент миграции (core.constants)
+INTERVAL_MINUTES = 30
+
+
+def fill_occupancy(apps, schema_editor):
+    """Заполняет индекс занятости по уже занятым будущим слотам"""
+    Slot = apps.get_model("reservation", "Slot")
+    TableOccupancy = apps.get_model("reservation", "TableOccupancy")
+    masks = {}
+    booked = Slot.objects.filter(
+        date__gte=datetime.now().date(), is_active=False
+    ).values_list("table_id", "date", "time")
+    for table_id, slot_date, time in booked:
+        hours, minutes = map(int, time.split(":"))
+        bit = (hours * 60 + minutes) // INTERVAL_MINUTES
+        key = (table_id, slot_date)
+        masks[key] = masks.get(key, 0) | (1 << bit)
+    TableOccupancy.objects.bulk_create(
+        [
+            TableOccupancy(table_id=table_id, date=slot_date, mask=mask)
+            for (table_id, slot_date), mask in masks.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("establishments", "0009_table"),
+        ("reservation", "0007_slot_unique_slot"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TableOccupancy",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField(verbose_name="Дата")),
+                (
+                    "mask",
+                    models.BigIntegerField(
+                        default=0, verbose_name="Маска занятых интервалов"
+                    ),
+                ),
+                (
+                    "table",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="occupancy",
+                        to="establishments.table",
+                        verbose_name="Столик",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Занятость столика",
+                "verbose_name_plural": "Занятость столиков",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="tableoccupancy",
+            constraint=models.UniqueConstraint(
+                fields=("table", "date"), name="unique_table_occupancy"
+            ),
+        ),
+        migrations.RunPython(fill_occupancy, migrations.RunPython.noop),
+    ]
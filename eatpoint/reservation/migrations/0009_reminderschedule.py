@@ -0,0 +1,60 @@
+# Generated by Django 4.2.5 on 2026-10-18 16:35
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("reservation", "0008_tableoccupancy"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ReminderSchedule",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("confirm", "подтверждение заведением"),
+                            ("one_day", "за 1 день"),
+                            ("three_hours", "за 3 часа"),
+                            ("half_hour", "за 30 минут"),
+                        ],
+                        max_length=20,
+                        verbose_name="Вид напоминания",
+                    ),
+                ),
+                ("eta", models.DateTimeField(verbose_name="Время отправки")),
+                (
+                    "reservation",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="reminders",
+                        to="reservation.reservation",
+                        verbose_name="Бронь",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Напоминание о брони",
+                "verbose_name_plural": "Напоминания о бронях",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="reminderschedule",
+            constraint=models.UniqueConstraint(
+                fields=("reservation", "kind", "eta"), name="unique_reminder"
+            ),
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 4.2.5 on 2026-10-18 16:36
+
+from datetime import datetime
+
+from django.db import migrations, models
+
+
+# Копии core.services на момент миграции: миграция не должна зависеть
+# от последующих изменений кода приложения
+def combine_date_time(date, time):
+    """Дата и время "HH:MM" в datetime"""
+    if not date or not time:
+        return None
+    return datetime.combine(date, datetime.strptime(time, "%H:%M").time())
+
+
+def chunked(iterable, size):
+    """Разбивает последовательность на списки длиной не более size"""
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def fill_starts_at(apps, schema_editor):
+    """Заполняет начало брони по дате и времени бронирования"""
+    Reservation = apps.get_model("reservation", "Reservation")
+    reservations = Reservation.objects.filter(
+        date_reservation__isnull=False, start_time_reservation__isnull=False
+    ).only("id", "date_reservation", "start_time_reservation")
+    for chunk in chunked(reservations.iterator(chunk_size=1000), 1000):
+        for reservation in chunk:
+            reservation.starts_at = combine_date_time(
+                reservation.date_reservation,
+                reservation.start_time_reservation,
+            )
+        Reservation.objects.bulk_update(chunk, ["starts_at"])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("reservation", "0009_reminderschedule"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="reservation",
+            name="starts_at",
+            field=models.DateTimeField(
+                blank=True,
+                editable=False,
+                null=True,
+                verbose_name="Начало брони",
+            ),
+        ),
+        migrations.RunPython(fill_starts_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="reservation",
+            index=models.Index(
+                fields=["starts_at", "id"], name="reservation_starts_at_idx"
+            ),
+        ),
+    ]
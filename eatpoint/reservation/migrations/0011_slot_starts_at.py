@@ -0,0 +1,48 @@
+# Generated by Django 4.2.5 on 2026-10-18 16:38
+
+from django.db import migrations, models
+from django.db.models import CharField, DateTimeField, Value
+from django.db.models.functions import Cast, Concat
+
+
+def fill_starts_at(apps, schema_editor):
+    """Заполняет начало слота по дате и времени одним запросом"""
+    Slot = apps.get_model("reservation", "Slot")
+    Slot.objects.update(
+        starts_at=Cast(
+            Concat(
+                Cast("date", output_field=CharField()),
+                Value(" "),
+                "time",
+                output_field=CharField(),
+            ),
+            output_field=DateTimeField(),
+        )
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("reservation", "0010_reservation_starts_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="slot",
+            name="starts_at",
+            field=models.DateTimeField(
+                blank=True,
+                editable=False,
+                null=True,
+                verbose_name="Начало слота",
+            ),
+        ),
+        migrations.RunPython(fill_starts_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="slot",
+            index=models.Index(
+                fields=["establishment", "starts_at"],
+                name="slot_establishment_starts_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.5 on 2026-10-18 16:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("reservation", "0011_slot_starts_at"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="reservationhistory",
+            name="reservation_id",
+            field=models.BigIntegerField(
+                db_index=True, verbose_name="id брони"
+            ),
+        ),
+    ]
@@ -0,0 +1,132 @@
+from datetime import date, datetime
+
+from django.db import migrations
+
+# SQL миграции не зависит от reservation.partitions: код приложения может
+# меняться, историческая миграция - нет
+TABLE = "reservation_reservationhistory"
+OLD_TABLE = f"{TABLE}_old"
+SEQUENCE = f"{TABLE}_id_seq"
+PARTITIONS_AHEAD = 3
+
+
+def add_months(month: date, months: int) -> date:
+    """Первое число месяца, отстоящего на months месяцев."""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def table_indexes(cursor, table: str) -> list:
+    """Индексы таблицы, кроме первичного ключа: [(имя, определение)]."""
+    cursor.execute(
+        "SELECT indexname, indexdef FROM pg_indexes "
+        "WHERE tablename = %s AND indexname <> %s",
+        [table, f"{TABLE}_pkey"],
+    )
+    return cursor.fetchall()
+
+
+def rename_indexes(cursor, indexes) -> None:
+    """Освобождает имена индексов для пересоздаваемой таблицы."""
+    cursor.execute(
+        f'ALTER INDEX "{TABLE}_pkey" RENAME TO "{TABLE[:54]}_pkey_old"'
+    )
+    for name, _ in indexes:
+        cursor.execute(f'ALTER INDEX "{name}" RENAME TO "{name[:59]}_old"')
+
+
+def restore_sequence(cursor) -> None:
+    """Последовательность id, продолжающая максимальный id архива."""
+    cursor.execute(f"CREATE SEQUENCE {SEQUENCE} OWNED BY {TABLE}.id")
+    cursor.execute(
+        f"ALTER TABLE {TABLE} ALTER COLUMN id "
+        f"SET DEFAULT nextval('{SEQUENCE}')"
+    )
+    cursor.execute(
+        f"SELECT setval('{SEQUENCE}', coalesce(max(id), 0) + 1, false) "
+        f"FROM {TABLE}"
+    )
+
+
+def partition_history(apps, schema_editor):
+    """
+    Пересоздает архив броней как секционированную по месяцам таблицу.
+
+    Только для Postgres: первичный ключ секционированной таблицы должен
+    включать ключ секционирования, поэтому он становится
+    (id, reservation_date). Индексы сохраняются под прежними именами.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        indexes = table_indexes(cursor, TABLE)
+        cursor.execute(f"ALTER TABLE {TABLE} RENAME TO {OLD_TABLE}")
+        rename_indexes(cursor, indexes)
+
+        cursor.execute(
+            f"CREATE TABLE {TABLE} "
+            f"(LIKE {OLD_TABLE} INCLUDING CONSTRAINTS) "
+            f"PARTITION BY RANGE (reservation_date)"
+        )
+        cursor.execute(
+            f"ALTER TABLE {TABLE} ADD CONSTRAINT {TABLE}_pkey "
+            f"PRIMARY KEY (id, reservation_date)"
+        )
+        for _, definition in indexes:
+            cursor.execute(definition)
+        cursor.execute(
+            f"CREATE TABLE {TABLE}_default PARTITION OF {TABLE} DEFAULT"
+        )
+
+        cursor.execute(f"SELECT min(reservation_date) FROM {OLD_TABLE}")
+        (first,) = cursor.fetchone()
+        today = datetime.now().date()
+        month = date((first or today).year, (first or today).month, 1)
+        last = add_months(date(today.year, today.month, 1), PARTITIONS_AHEAD)
+        while month <= last:
+            cursor.execute(
+                f"CREATE TABLE {TABLE}_y{month.year}m{month.month:02d} "
+                f"PARTITION OF {TABLE} FOR VALUES FROM (%s) TO (%s)",
+                [month.isoformat(), add_months(month, 1).isoformat()],
+            )
+            month = add_months(month, 1)
+
+        cursor.execute(f"INSERT INTO {TABLE} SELECT * FROM {OLD_TABLE}")
+        cursor.execute(f"DROP TABLE {OLD_TABLE}")
+        restore_sequence(cursor)
+
+
+def unpartition_history(apps, schema_editor):
+    """
+    Возвращает архив броней в обычную таблицу с первичным ключом id.
+    Секции удаляются вместе с секционированной таблицей.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        indexes = table_indexes(cursor, TABLE)
+        cursor.execute(f"ALTER TABLE {TABLE} RENAME TO {OLD_TABLE}")
+        rename_indexes(cursor, indexes)
+
+        cursor.execute(
+            f"CREATE TABLE {TABLE} (LIKE {OLD_TABLE} INCLUDING CONSTRAINTS)"
+        )
+        cursor.execute(
+            f"ALTER TABLE {TABLE} ADD CONSTRAINT {TABLE}_pkey PRIMARY KEY (id)"
+        )
+        for _, definition in indexes:
+            cursor.execute(definition.replace(" ON ONLY ", " ON "))
+
+        cursor.execute(f"INSERT INTO {TABLE} SELECT * FROM {OLD_TABLE}")
+        cursor.execute(f"DROP TABLE {OLD_TABLE}")
+        restore_sequence(cursor)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("reservation", "0012_reservationhistory_reservation_id"),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_history, unpartition_history),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 4.2.5 on 2026-10-18 18:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("establishments", "0009_table"),
+        ("reservation", "0013_partition_reservationhistory"),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name="reservationhistory",
+            old_name="establishment",
+            new_name="establishment_name",
+        ),
+        migrations.AlterField(
+            model_name="reservationhistory",
+            name="establishment_name",
+            field=models.CharField(
+                blank=True,
+                max_length=200,
+                null=True,
+                verbose_name="Название ресторана",
+            ),
+        ),
+        migrations.AddField(
+            model_name="reservationhistory",
+            name="establishment",
+            field=models.ForeignKey(
+                blank=True,
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="reservation_history",
+                to="establishments.establishment",
+                verbose_name="Ресторан",
+            ),
+        ),
+        migrations.AddField(
+            model_name="reservationhistory",
+            name="owner",
+            field=models.ForeignKey(
+                blank=True,
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="owned_reservation_history",
+                to=settings.AUTH_USER_MODEL,
+                verbose_name="Владелец ресторана",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="reservationhistory",
+            index=models.Index(
+                fields=["establishment", "reservation_date"],
+                name="history_establishment_date_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="reservationhistory",
+            index=models.Index(
+                fields=["owner", "reservation_date"],
+                name="history_owner_date_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.5 on 2026-10-18 17:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("reservation", "0014_reservationhistory_establishment_owner"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="reminderschedule",
+            name="claim",
+            field=models.UUIDField(
+                blank=True,
+                null=True,
+                verbose_name="Запуск планирования, создавший напоминание",
+            ),
+        ),
+    ]
@@ -0,0 +1,78 @@
+# Generated by Django 4.2.5 on 2026-10-18 17:22
+
+import datetime
+from django.db import migrations, models
+
+
+def copy_reservation_data(apps, schema_editor):
+    """
+    Дата создания и количество гостей в архиве для броней, которые еще
+    не удалены. У удаленных броней эти данные не сохранились, у их
+    архивных записей остается дата архивации.
+    """
+    Reservation = apps.get_model("reservation", "Reservation")
+    ReservationHistory = apps.get_model("reservation", "ReservationHistory")
+    rows = ReservationHistory.objects.filter(
+        reservation_id__in=Reservation.objects.values("id")
+    ).order_by("id")
+    last_id = 0
+    while True:
+        batch = list(
+            rows.filter(id__gt=last_id).values_list("id", "reservation_id")[
+                :1000
+            ]
+        )
+        if not batch:
+            break
+        reservation_ids = [reservation_id for _, reservation_id in batch]
+        created = dict(
+            Reservation.objects.filter(id__in=reservation_ids).values_list(
+                "id", "reservation_date"
+            )
+        )
+        guests = {}
+        booked = (
+            Reservation.slots.through.objects.filter(
+                reservation_id__in=reservation_ids
+            )
+            .values_list("reservation_id", "slot__table_id", "slot__seats")
+            .distinct()
+        )
+        for reservation_id, _, seats in booked:
+            guests[reservation_id] = guests.get(reservation_id, 0) + seats
+        ReservationHistory.objects.bulk_update(
+            [
+                ReservationHistory(
+                    id=row_id,
+                    reservation_date=created[reservation_id],
+                    guests=guests.get(reservation_id, 0),
+                )
+                for row_id, reservation_id in batch
+            ],
+            ["reservation_date", "guests"],
+        )
+        last_id = batch[-1][0]
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("reservation", "0015_reminderschedule_claim"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="reservationhistory",
+            name="guests",
+            field=models.PositiveIntegerField(
+                default=0, verbose_name="Количество гостей"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="reservationhistory",
+            name="reservation_date",
+            field=models.DateTimeField(
+                default=datetime.datetime.now, verbose_name="Дата создания"
+            ),
+        ),
+        migrations.RunPython(copy_reservation_data, migrations.RunPython.noop),
+    ]
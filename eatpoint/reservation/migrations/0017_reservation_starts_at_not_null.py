@@ -0,0 +1,31 @@
+# Generated by Django 4.2.5 on 2026-10-18 19:10
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def fill_missing_starts_at(apps, schema_editor):
+    """Брони без даты и времени начинаются в момент создания"""
+    Reservation = apps.get_model("reservation", "Reservation")
+    Reservation.objects.filter(starts_at__isnull=True).update(
+        starts_at=F("reservation_date")
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("reservation", "0016_reservationhistory_created_date_guests"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            fill_missing_starts_at, migrations.RunPython.noop
+        ),
+        migrations.AlterField(
+            model_name="reservation",
+            name="starts_at",
+            field=models.DateTimeField(
+                editable=False, verbose_name="Начало брони"
+            ),
+        ),
+    ]
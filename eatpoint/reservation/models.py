@@ -1,8 +1,11 @@
+from datetime import datetime
+
 from django.db import models
 from phonenumber_field.modelfields import PhoneNumberField
 from rest_framework.exceptions import ValidationError
 
-from core.choices import TIME_CHOICES
+from core.choices import REMINDER_KINDS, TIME_CHOICES
+from core.services import combine_date_time
 from establishments.models import Establishment, ZoneEstablishment, Table
 
 from users.models import User
@@ -52,11 +55,33 @@ class Slot(models.Model):
         verbose_name="Статус слота",
         default=True,
     )
+    starts_at = models.DateTimeField(
+        verbose_name="Начало слота",
+        null=True,
+        blank=True,
+        editable=False,
+    )
 
     class Meta:
         verbose_name = "Свободный слот"
         verbose_name_plural = "Свободные слоты"
         ordering = ["date", "time"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["table", "date", "time"],
+                name="unique_slot",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["establishment", "starts_at"],
+                name="slot_establishment_starts_idx",
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.starts_at = combine_date_time(self.date, self.time)
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return (
@@ -66,6 +91,37 @@ class Slot(models.Model):
         )
 
 
+class TableOccupancy(models.Model):
+    """Занятость столика на день: бит на каждый интервал бронирования"""
+
+    table = models.ForeignKey(
+        Table,
+        verbose_name="Столик",
+        on_delete=models.CASCADE,
+        related_name="occupancy",
+    )
+    date = models.DateField(
+        verbose_name="Дата",
+    )
+    mask = models.BigIntegerField(
+        verbose_name="Маска занятых интервалов",
+        default=0,
+    )
+
+    class Meta:
+        verbose_name = "Занятость столика"
+        verbose_name_plural = "Занятость столиков"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["table", "date"],
+                name="unique_table_occupancy",
+            ),
+        ]
+
+    def __str__(self):
+        return f"стол №{self.table.number}, {self.date}"
+
+
 class Availability(models.Model):
     """Свободные слоты"""
 
@@ -165,11 +221,33 @@ class Reservation(models.Model):
         verbose_name="Напоминание за 30 минут",
         default=False,
     )
+    starts_at = models.DateTimeField(
+        verbose_name="Начало брони",
+        editable=False,
+    )
 
     class Meta:
         verbose_name = "Бронирование"
         verbose_name_plural = "Бронирования"
         ordering = ["-reservation_date"]
+        indexes = [
+            models.Index(
+                fields=["starts_at", "id"],
+                name="reservation_starts_at_idx",
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        # Без даты и времени брони (старые записи) началом считается
+        # время создания: starts_at - ключ курсора и не может быть пустым
+        self.starts_at = (
+            combine_date_time(
+                self.date_reservation, self.start_time_reservation
+            )
+            or self.reservation_date
+            or datetime.now()
+        )
+        super().save(*args, **kwargs)
 
     def clean(self):
         if not self.user and not self.email:
@@ -195,21 +273,76 @@ class Reservation(models.Model):
         return f"заведение: {establishment_name}, {table_info}"
 
 
+class ReminderSchedule(models.Model):
+    """Запланированные напоминания о брони"""
+
+    reservation = models.ForeignKey(
+        Reservation,
+        verbose_name="Бронь",
+        on_delete=models.CASCADE,
+        related_name="reminders",
+    )
+    kind = models.CharField(
+        verbose_name="Вид напоминания",
+        max_length=20,
+        choices=REMINDER_KINDS,
+    )
+    eta = models.DateTimeField(
+        verbose_name="Время отправки",
+    )
+    claim = models.UUIDField(
+        verbose_name="Запуск планирования, создавший напоминание",
+        null=True,
+        blank=True,
+    )
+
+    class Meta:
+        verbose_name = "Напоминание о брони"
+        verbose_name_plural = "Напоминания о бронях"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["reservation", "kind", "eta"],
+                name="unique_reminder",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.reservation_id}: {self.kind} {self.eta}"
+
+
 class ReservationHistory(models.Model):
     """История бронирований"""
 
-    reservation_id = models.CharField(
+    reservation_id = models.BigIntegerField(
         verbose_name="id брони",
-        max_length=200,
-        blank=False,
+        db_index=True,
     )
 
+    # Дата создания брони (а не архивации): копируется из брони
     reservation_date = models.DateTimeField(
         verbose_name="Дата создания",
-        auto_now_add=True,
+        default=datetime.now,
     )
-    establishment = models.CharField(
+    establishment = models.ForeignKey(
+        Establishment,
+        on_delete=models.SET_NULL,
         verbose_name="Ресторан",
+        related_name="reservation_history",
+        db_index=False,
+        blank=True,
+        null=True,
+    )
+    owner = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        verbose_name="Владелец ресторана",
+        related_name="owned_reservation_history",
+        db_index=False,
+        blank=True,
+        null=True,
+    )
+    establishment_name = models.CharField(
+        verbose_name="Название ресторана",
         max_length=200,
         blank=True,
         null=True,
@@ -255,6 +388,10 @@ class ReservationHistory(models.Model):
         max_length=1500,
         blank=True,
     )
+    guests = models.PositiveIntegerField(
+        verbose_name="Количество гостей",
+        default=0,
+    )
     comment = models.CharField(
         verbose_name="Пожелания к заказу",
         max_length=200,
@@ -277,6 +414,16 @@ class ReservationHistory(models.Model):
         verbose_name = "Бронирование(архив)"
         verbose_name_plural = "Бронирования(архив)"
         ordering = ["-date_reservation"]
+        indexes = [
+            models.Index(
+                fields=["establishment", "reservation_date"],
+                name="history_establishment_date_idx",
+            ),
+            models.Index(
+                fields=["owner", "reservation_date"],
+                name="history_owner_date_idx",
+            ),
+        ]
 
     def __str__(self):
-        return self.establishment
+        return self.establishment_name or ""
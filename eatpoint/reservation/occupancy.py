@@ -0,0 +1,122 @@
+from datetime import datetime
+
+from django.db import transaction
+from django.db.models import F, QuerySet
+
+from core.constants import INTERVAL_MINUTES, SLOTS_BATCH_SIZE
+from reservation.models import Slot, TableOccupancy
+
+
+def time_to_bit(time: str) -> int:
+    """Номер интервала дня для времени "HH:MM"."""
+    hours, minutes = map(int, time.split(":"))
+    return (hours * 60 + minutes) // INTERVAL_MINUTES
+
+
+def bit_to_time(bit: int) -> str:
+    """Время "HH:MM" для номера интервала дня."""
+    minutes = bit * INTERVAL_MINUTES
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def times_to_mask(times) -> int:
+    """Битовая маска дня из списка времени."""
+    mask = 0
+    for time in times:
+        mask |= 1 << time_to_bit(time)
+    return mask
+
+
+def mask_to_bits(mask: int):
+    """Номера установленных битов маски по возрастанию."""
+    bit = 0
+    while mask:
+        if mask & 1:
+            yield bit
+        mask >>= 1
+        bit += 1
+
+
+def slots_masks(slots) -> dict:
+    """Маски слотов: {(id столика, дата): маска}."""
+    masks = {}
+    for table_id, slot_date, time in slots:
+        key = (table_id, slot_date)
+        masks[key] = masks.get(key, 0) | (1 << time_to_bit(time))
+    return masks
+
+
+def occupancy_masks(table_ids, dates) -> dict:
+    """Маски занятых интервалов из индекса занятости."""
+    return {
+        (table_id, occupancy_date): mask
+        for table_id, occupancy_date, mask in TableOccupancy.objects.filter(
+            table_id__in=table_ids, date__in=dates
+        ).values_list("table_id", "date", "mask")
+    }
+
+
+def occupy(slots: QuerySet[Slot]) -> None:
+    """Отмечает интервалы слотов занятыми в индексе занятости."""
+    masks = slots_masks(slots.values_list("table_id", "date", "time"))
+    if not masks:
+        return
+    TableOccupancy.objects.bulk_create(
+        [
+            TableOccupancy(table_id=table_id, date=occupancy_date)
+            for table_id, occupancy_date in masks
+        ],
+        ignore_conflicts=True,
+    )
+    for (table_id, occupancy_date), mask in masks.items():
+        TableOccupancy.objects.filter(
+            table_id=table_id, date=occupancy_date
+        ).update(mask=F("mask").bitor(mask))
+
+
+def release(slots: QuerySet[Slot]) -> None:
+    """Освобождает интервалы слотов в индексе занятости."""
+    masks = slots_masks(slots.values_list("table_id", "date", "time"))
+    for (table_id, occupancy_date), mask in masks.items():
+        TableOccupancy.objects.filter(
+            table_id=table_id, date=occupancy_date
+        ).update(mask=F("mask").bitand(~mask))
+
+
+def occupy_slots(slots: QuerySet[Slot]) -> None:
+    """Занимает слоты и обновляет индекс занятости в одной транзакции."""
+    with transaction.atomic():
+        occupy(slots)
+        slots.update(is_active=False)
+
+
+def release_slots(slots: QuerySet[Slot]) -> None:
+    """Освобождает слоты и обновляет индекс занятости в одной транзакции."""
+    with transaction.atomic():
+        release(slots)
+        slots.update(is_active=True)
+
+
+def rebuild_occupancy() -> int:
+    """
+    Пересобирает индекс занятости по занятым слотам начиная с сегодняшнего
+    дня. Возвращает количество записей индекса.
+    """
+    today = datetime.now().date()
+    masks = slots_masks(
+        Slot.objects.filter(date__gte=today, is_active=False).values_list(
+            "table_id", "date", "time"
+        )
+    )
+    with transaction.atomic():
+        TableOccupancy.objects.filter(date__gte=today).delete()
+        TableOccupancy.objects.bulk_create(
+            [
+                TableOccupancy(
+                    table_id=table_id, date=occupancy_date, mask=mask
+                )
+                for (table_id, occupancy_date), mask in masks.items()
+            ],
+            batch_size=SLOTS_BATCH_SIZE,
+        )
+    return len(masks)
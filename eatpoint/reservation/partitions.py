@@ -0,0 +1,117 @@
+import re
+from datetime import date
+
+from core.constants import HISTORY_PARTITIONS_AHEAD
+
+# Архив броней секционирован по месяцам reservation_date (только Postgres).
+# Секции нужны прежде всего для хранения: старые месяцы отключаются
+# и удаляются целиком (history_partitions --keep). По дате создания
+# отбирают записи архивация, удаление и пересчет статистики броней;
+# история гостя и владельца читается целиком по индексам секций.
+HISTORY_TABLE = "reservation_reservationhistory"
+HISTORY_DEFAULT_PARTITION = f"{HISTORY_TABLE}_default"
+PARTITION_NAME = re.compile(rf"^{HISTORY_TABLE}_y(\d{{4}})m(\d{{2}})$")
+
+
+def month_start(day: date) -> date:
+    """Первое число месяца."""
+    return date(day.year, day.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    """Первое число месяца, отстоящего на months месяцев."""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    """Имя секции архива за месяц."""
+    return f"{HISTORY_TABLE}_y{month.year}m{month.month:02d}"
+
+
+def history_partitions(cursor) -> dict:
+    """Подключенные помесячные секции архива: {первое число месяца: имя}."""
+    cursor.execute(
+        """
+        SELECT child.relname
+        FROM pg_inherits
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE pg_inherits.inhparent = %s::regclass
+        """,
+        [HISTORY_TABLE],
+    )
+    partitions = {}
+    for (name,) in cursor.fetchall():
+        match = PARTITION_NAME.match(name)
+        if match:
+            partitions[date(int(match[1]), int(match[2]), 1)] = name
+    return partitions
+
+
+def create_partition(cursor, month: date) -> bool:
+    """
+    Создает секцию архива за месяц, если ее еще нет.
+
+    Строки этого месяца, попавшие в секцию по умолчанию, переносятся
+    в новую секцию до ее подключения.
+    """
+    name = partition_name(month)
+    cursor.execute("SELECT to_regclass(%s)", [name])
+    if cursor.fetchone()[0] is not None:
+        return False
+    bounds = [month.isoformat(), add_months(month, 1).isoformat()]
+    cursor.execute(
+        f"CREATE TABLE {name} "
+        f"(LIKE {HISTORY_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+    )
+    cursor.execute(
+        f"""
+        WITH moved AS (
+            DELETE FROM {HISTORY_DEFAULT_PARTITION}
+            WHERE reservation_date >= %s AND reservation_date < %s
+            RETURNING *
+        )
+        INSERT INTO {name} SELECT * FROM moved
+        """,
+        bounds,
+    )
+    cursor.execute(
+        f"ALTER TABLE {HISTORY_TABLE} ATTACH PARTITION {name} "
+        f"FOR VALUES FROM (%s) TO (%s)",
+        bounds,
+    )
+    return True
+
+
+def detach_partition(cursor, name: str, drop: bool = False) -> None:
+    """Отключает секцию от архива, при drop - удаляет ее."""
+    cursor.execute(f"ALTER TABLE {HISTORY_TABLE} DETACH PARTITION {name}")
+    if drop:
+        cursor.execute(f"DROP TABLE {name}")
+
+
+def maintain_partitions(
+    cursor,
+    today: date,
+    ahead: int = HISTORY_PARTITIONS_AHEAD,
+    keep: int | None = None,
+    drop: bool = False,
+) -> dict:
+    """
+    Создает секции с текущего месяца на ahead месяцев вперед и отключает
+    секции старше keep месяцев (если keep задан).
+    """
+    current = month_start(today)
+    created = [
+        partition_name(add_months(current, months))
+        for months in range(ahead + 1)
+        if create_partition(cursor, add_months(current, months))
+    ]
+    detached = []
+    if keep is not None:
+        oldest = add_months(current, -keep)
+        for month, name in sorted(history_partitions(cursor).items()):
+            if month < oldest:
+                detach_partition(cursor, name, drop)
+                detached.append(name)
+    return {"created": created, "detached": detached}
@@ -0,0 +1,519 @@
+import logging
+from datetime import date, datetime, timedelta
+from time import monotonic
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Prefetch, QuerySet
+
+from analytics.services import untrack_reservation
+from core.constants import (
+    ARCHIVE_BATCH_SIZE,
+    AVAILABLE_DAYS,
+    DAYS,
+    INTERVAL_MINUTES,
+    PURGE_BATCH_SIZE,
+    SLOTS_BATCH_SIZE,
+    SLOTS_ENGINE_COMPUTED,
+    SLOTS_TABLES_CHUNK,
+)
+from core.exeptions import SlotsUnavailableException
+from core.services import chunked, combine_date_time, time_generator
+from establishments.models import Establishment, Table, WorkEstablishment
+from reservation.models import Reservation, ReservationHistory, Slot
+from reservation.occupancy import occupancy_masks, occupy_slots, time_to_bit
+
+logger = logging.getLogger(__name__)
+
+
+def get_work_schedule(establishment_ids) -> dict:
+    """
+    Расписание заведений одним запросом.
+
+    Возвращает словарь {(id заведения, день недели): [время слотов]}.
+    """
+    schedule = {}
+    worked = WorkEstablishment.objects.filter(
+        establishment_id__in=establishment_ids,
+        day_off=False,
+        start__isnull=False,
+        end__isnull=False,
+    ).values_list("establishment_id", "day", "start", "end")
+    for establishment_id, day, start, end in worked:
+        schedule[(establishment_id, day)] = time_generator(
+            start, end, INTERVAL_MINUTES
+        )
+    return schedule
+
+
+def active_tables() -> QuerySet[Table]:
+    """Активные столики верифицированных заведений."""
+    return Table.objects.filter(
+        establishment__is_verified=True,
+        is_active=True,
+        zone__isnull=False,
+    )
+
+
+def window_dates(
+    start_date: date | None = None,
+    days: int = AVAILABLE_DAYS,
+    weekdays: list[str] | None = None,
+) -> list[date]:
+    """Даты окна бронирования, при необходимости только по дням недели."""
+    start_date = start_date or datetime.now().date()
+    dates = [start_date + timedelta(days=day) for day in range(days)]
+    if weekdays is None:
+        return dates
+    return [item for item in dates if DAYS[item.weekday()] in weekdays]
+
+
+def future_slots(slots: QuerySet[Slot]) -> QuerySet[Slot]:
+    """Слоты, время которых еще не наступило."""
+    return slots.filter(
+        starts_at__gte=datetime.now().replace(second=0, microsecond=0)
+    )
+
+
+def retire_slots(slots: QuerySet[Slot]) -> int:
+    """Удаляет будущие свободные слоты, не привязанные к броням."""
+    deleted, _ = (
+        future_slots(slots)
+        .filter(is_active=True, reservations__isnull=True)
+        .delete()
+    )
+    return deleted
+
+
+def generate_slots(
+    tables: QuerySet[Table] | None = None,
+    start_date: date | None = None,
+    days: int = AVAILABLE_DAYS,
+    weekdays: list[str] | None = None,
+) -> dict:
+    """
+    Создание недостающих слотов для столиков на days дней вперед.
+
+    Расписание заведений загружается один раз, недостающие пары
+    (столик, дата, время) вычисляются в памяти и вставляются пакетами.
+    Возвращает отчет с количеством столиков, слотов по расписанию,
+    созданных слотов и временем работы.
+    При SLOTS_ENGINE = "computed" слоты заранее не создаются.
+    """
+    started = monotonic()
+    report = {"tables": 0, "candidates": 0, "created": 0}
+    dates = window_dates(start_date, days, weekdays)
+    if not dates or settings.SLOTS_ENGINE == SLOTS_ENGINE_COMPUTED:
+        report["elapsed"] = round(monotonic() - started, 2)
+        return report
+    if tables is None:
+        tables = active_tables()
+    schedule = get_work_schedule(tables.values("zone__establishment_id"))
+    clock = {}
+
+    tables = tables.select_related("zone").order_by("id")
+    for chunk in chunked(
+        tables.iterator(chunk_size=SLOTS_TABLES_CHUNK), SLOTS_TABLES_CHUNK
+    ):
+        existing = set(
+            Slot.objects.filter(
+                table__in=[table.id for table in chunk],
+                date__range=(dates[0], dates[-1]),
+            ).values_list("table_id", "date", "time")
+        )
+        new_slots = []
+        for table in chunk:
+            establishment_id = table.zone.establishment_id
+            for current_date in dates:
+                week_day = DAYS[current_date.weekday()]
+                for time in schedule.get((establishment_id, week_day), ()):
+                    report["candidates"] += 1
+                    if (table.id, current_date, time) in existing:
+                        continue
+                    if time not in clock:
+                        clock[time] = datetime.strptime(time, "%H:%M").time()
+                    new_slots.append(
+                        Slot(
+                            establishment_id=establishment_id,
+                            zone_id=table.zone_id,
+                            date=current_date,
+                            time=time,
+                            starts_at=datetime.combine(
+                                current_date, clock[time]
+                            ),
+                            table_id=table.id,
+                            seats=table.seats,
+                        )
+                    )
+        with transaction.atomic():
+            Slot.objects.bulk_create(
+                new_slots,
+                batch_size=SLOTS_BATCH_SIZE,
+                ignore_conflicts=True,
+            )
+        report["tables"] += len(chunk)
+        report["created"] += len(new_slots)
+
+    report["elapsed"] = round(monotonic() - started, 2)
+    return report
+
+
+def sync_table_slots(table_id: int, changed: list[str] | None = None) -> dict:
+    """
+    Приводит слоты столика в соответствие с его состоянием.
+
+    Неактивный столик теряет будущие свободные слоты. У активного
+    обновляются места и зона свободных слотов (если они изменились)
+    и создаются недостающие слоты.
+    """
+    slots = future_slots(Slot.objects.filter(table_id=table_id))
+    table = active_tables().select_related("zone").filter(id=table_id).first()
+    if table is None:
+        return {"retired": retire_slots(slots), "updated": 0, "created": 0}
+
+    updated = 0
+    if changed and {"seats", "zone_id"} & set(changed):
+        updated = slots.filter(is_active=True).update(
+            seats=table.seats,
+            zone_id=table.zone_id,
+            establishment_id=table.zone.establishment_id,
+        )
+    report = generate_slots(tables=Table.objects.filter(id=table_id))
+    return {"retired": 0, "updated": updated, "created": report["created"]}
+
+
+def sync_establishment_slots(
+    establishment_id: int, days: list[str] | None = None
+) -> dict:
+    """
+    Приводит слоты заведения в соответствие с временем работы.
+
+    Обрабатываются только даты, приходящиеся на дни недели days:
+    слоты вне часов работы удаляются, недостающие создаются.
+    У заведения, снятого с верификации, удаляются все будущие
+    свободные слоты.
+    """
+    if not Establishment.objects.filter(
+        id=establishment_id, is_verified=True
+    ).exists():
+        retired = retire_slots(
+            Slot.objects.filter(establishment_id=establishment_id)
+        )
+        return {"retired": retired, "created": 0}
+    days = days or DAYS
+    schedule = get_work_schedule([establishment_id])
+    retired = 0
+    for day in days:
+        retired += retire_slots(
+            Slot.objects.filter(
+                establishment_id=establishment_id,
+                date__in=window_dates(weekdays=[day]),
+            ).exclude(time__in=schedule.get((establishment_id, day), ()))
+        )
+    report = generate_slots(
+        tables=active_tables().filter(zone__establishment_id=establishment_id),
+        weekdays=days,
+    )
+    return {"retired": retired, "created": report["created"]}
+
+
+def lock_slots(establishment: Establishment, slot_ids) -> list[Slot]:
+    """
+    Блокирует свободные слоты заведения до конца транзакции.
+
+    Слоты, уже заблокированные параллельным бронированием, пропускаются,
+    поэтому при гонке запрос не ждет, а получает ошибку.
+    """
+    slot_ids = set(slot_ids)
+    slots = list(
+        Slot.objects.select_for_update(skip_locked=True, of=("self",))
+        .select_related("zone", "table")
+        .filter(id__in=slot_ids, establishment=establishment, is_active=True)
+        .order_by("starts_at")
+    )
+    if not slot_ids or len(slots) != len(slot_ids):
+        raise SlotsUnavailableException()
+    return slots
+
+
+def interval_slots(establishment: Establishment, intervals) -> list[int]:
+    """
+    Записи слотов для свободных интервалов (id столика, дата, время).
+
+    При SLOTS_ENGINE = "computed" слоты заранее не создаются: запись
+    создается при бронировании, если интервал в окне бронирования,
+    в часах работы, еще не начался и свободен по индексу занятости.
+    """
+    if not intervals:
+        return []
+    tables = {
+        table.id: table
+        for table in active_tables()
+        .select_related("zone")
+        .filter(
+            zone__establishment=establishment,
+            id__in={interval["table_id"] for interval in intervals},
+        )
+    }
+    dates = {interval["date"] for interval in intervals}
+    booked = occupancy_masks(tables, dates)
+    schedule = get_work_schedule([establishment.id])
+    window = set(window_dates())
+    current = datetime.now().replace(second=0, microsecond=0)
+    slots = []
+    for interval in intervals:
+        table = tables.get(interval["table_id"])
+        slot_date, time = interval["date"], interval["time"]
+        starts_at = combine_date_time(slot_date, time)
+        working = schedule.get((establishment.id, DAYS[slot_date.weekday()]))
+        if (
+            table is None
+            or slot_date not in window
+            or starts_at < current
+            or time not in (working or ())
+            or booked.get((table.id, slot_date), 0) >> time_to_bit(time) & 1
+        ):
+            raise SlotsUnavailableException()
+        slots.append(
+            Slot(
+                establishment=establishment,
+                zone_id=table.zone_id,
+                date=slot_date,
+                time=time,
+                starts_at=starts_at,
+                table=table,
+                seats=table.seats,
+            )
+        )
+    Slot.objects.bulk_create(slots, ignore_conflicts=True)
+    keys = {(slot.table_id, slot.date, slot.time) for slot in slots}
+    return [
+        slot_id
+        for table_id, slot_date, time, slot_id in Slot.objects.filter(
+            table_id__in=tables, date__in=dates
+        ).values_list("table_id", "date", "time", "id")
+        if (table_id, slot_date, time) in keys
+    ]
+
+
+@transaction.atomic
+def create_reservation(
+    establishment: Establishment, data: dict
+) -> Reservation:
+    """
+    Создание брони: слоты блокируются, проверяются и занимаются
+    в одной транзакции с созданием брони. Для интервалов без записей
+    слотов (intervals) записи создаются здесь же.
+    """
+    data = data.copy()
+    slot_ids = [slot.id for slot in data.pop("slots", [])]
+    slot_ids += interval_slots(establishment, data.pop("intervals", []))
+    slots = lock_slots(establishment, slot_ids)
+    reservation = Reservation.objects.create(
+        **data,
+        establishment=establishment,
+        date_reservation=slots[0].date,
+        start_time_reservation=slots[0].time,
+    )
+    reservation.slots.set(slots)
+    occupy_slots(Slot.objects.filter(id__in=slot_ids))
+    return reservation
+
+
+@transaction.atomic
+def delete_reservation(reservation: Reservation) -> None:
+    """Удаление брони вместе с ее вкладом в статистику броней."""
+    untrack_reservation(reservation)
+    reservation.delete()
+
+
+def alias_archived(
+    reservations: QuerySet[Reservation],
+) -> QuerySet[Reservation]:
+    """
+    Добавляет броням признак archived - есть ли бронь в архиве.
+
+    Подзапрос подключается через alias, а не прямо в filter: так
+    cachalot учитывает таблицу архива и сбрасывает кэш при ее изменении.
+    Архивная запись ищется и по дате создания брони (ключ секций архива):
+    Postgres просматривает только секцию месяца создания брони.
+    """
+    return reservations.alias(
+        archived=Exists(
+            ReservationHistory.objects.filter(
+                reservation_id=OuterRef("pk"),
+                reservation_date=OuterRef("reservation_date"),
+            )
+        )
+    )
+
+
+def not_archived(reservations: QuerySet[Reservation]) -> QuerySet[Reservation]:
+    """Брони, которых еще нет в архиве."""
+    return alias_archived(reservations).filter(archived=False)
+
+
+def history_row(reservation: Reservation) -> ReservationHistory:
+    """Архивная запись брони (заведение брони могло быть удалено)."""
+    establishment = reservation.establishment
+    slots = reservation.slots.all()
+    return ReservationHistory(
+        reservation_id=reservation.id,
+        establishment_id=reservation.establishment_id,
+        owner_id=establishment.owner_id if establishment else None,
+        establishment_name=establishment.name if establishment else "",
+        reservation_date=reservation.reservation_date,
+        date_reservation=reservation.date_reservation,
+        start_time_reservation=reservation.start_time_reservation,
+        is_accepted=reservation.is_accepted,
+        is_visited=reservation.is_visited,
+        first_name=reservation.first_name,
+        last_name=reservation.last_name,
+        email=reservation.email,
+        telephone=reservation.telephone,
+        slots=";\n".join(str(slot) for slot in slots),
+        guests=sum({slot.table_id: slot.seats for slot in slots}.values()),
+        comment=reservation.comment,
+        reminder_one_day=reservation.reminder_one_day,
+        reminder_three_hours=reservation.reminder_three_hours,
+        reminder_half_on_hour=reservation.reminder_half_on_hour,
+    )
+
+
+def archive_visited(batch_size: int = ARCHIVE_BATCH_SIZE) -> dict:
+    """
+    Копирование посещенных броней в архив.
+
+    Еще не заархивированные брони выбираются пакетами по id, описания
+    слотов строятся по заранее загруженным слотам, архивные записи
+    вставляются одним запросом на пакет.
+    """
+    started = monotonic()
+    reservations = (
+        not_archived(
+            Reservation.objects.filter(
+                is_accepted=True, is_visited=True, is_deleted=False
+            )
+        )
+        .select_related("establishment")
+        .prefetch_related(
+            Prefetch(
+                "slots",
+                queryset=Slot.objects.select_related(
+                    "establishment", "zone", "table"
+                ),
+            )
+        )
+        .order_by("id")
+    )
+    archived, last_id = 0, 0
+    while True:
+        batch = list(reservations.filter(id__gt=last_id)[:batch_size])
+        if not batch:
+            break
+        ReservationHistory.objects.bulk_create(
+            [history_row(reservation) for reservation in batch]
+        )
+        archived += len(batch)
+        last_id = batch[-1].id
+    return {"archived": archived, "elapsed": round(monotonic() - started, 2)}
+
+
+def purge_archived(
+    reservations: QuerySet[Reservation], batch_size: int = PURGE_BATCH_SIZE
+) -> dict:
+    """
+    Удаление уже заархивированных броней из выборки.
+
+    Брони удаляются пакетами по id, каждый пакет - отдельная короткая
+    транзакция. Скорость удаления пишется в лог.
+    """
+    started = monotonic()
+    archived = (
+        alias_archived(reservations).filter(archived=True).order_by("id")
+    )
+    deleted, last_id = 0, 0
+    while True:
+        batch_started = monotonic()
+        ids = list(
+            archived.filter(id__gt=last_id).values_list("id", flat=True)[
+                :batch_size
+            ]
+        )
+        if not ids:
+            break
+        with transaction.atomic():
+            Reservation.objects.filter(id__in=ids).delete()
+        deleted += len(ids)
+        last_id = ids[-1]
+        logger.info(
+            "Удалено броней: %s (%.0f в секунду)",
+            len(ids),
+            len(ids) / max(monotonic() - batch_started, 1e-6),
+        )
+
+    elapsed = round(monotonic() - started, 2)
+    logger.info("Удаление броней завершено: %s за %s с", deleted, elapsed)
+    return {"deleted": deleted, "elapsed": elapsed}
+
+
+def backfill_history_establishments(
+    batch_size: int = ARCHIVE_BATCH_SIZE,
+) -> dict:
+    """
+    Заполнение заведения и владельца в старых архивных записях.
+
+    Заведение находится по сохраненному названию (оно уникально),
+    а если заведение переименовано - по еще не удаленной брони.
+    Записи обновляются одним запросом на заведение в каждом пакете.
+    """
+    started = monotonic()
+    by_name = {
+        name: (establishment_id, owner_id)
+        for establishment_id, name, owner_id in Establishment.objects.values_list(
+            "id", "name", "owner_id"
+        )
+    }
+    owners = {
+        establishment_id: owner_id
+        for establishment_id, owner_id in by_name.values()
+    }
+    rows = ReservationHistory.objects.filter(
+        establishment__isnull=True
+    ).order_by("id")
+    report = {"updated": 0, "unresolved": 0}
+    last_id = 0
+    while True:
+        batch = list(
+            rows.filter(id__gt=last_id).values_list(
+                "id", "reservation_id", "establishment_name"
+            )[:batch_size]
+        )
+        if not batch:
+            break
+        by_reservation = dict(
+            Reservation.objects.filter(
+                id__in=[reservation_id for _, reservation_id, _ in batch]
+            ).values_list("id", "establishment_id")
+        )
+        resolved = {}
+        for row_id, reservation_id, name in batch:
+            establishment_id, _ = by_name.get(
+                name, (by_reservation.get(reservation_id), None)
+            )
+            if establishment_id is None:
+                report["unresolved"] += 1
+                continue
+            resolved.setdefault(establishment_id, []).append(row_id)
+        with transaction.atomic():
+            for establishment_id, ids in resolved.items():
+                report["updated"] += ReservationHistory.objects.filter(
+                    id__in=ids
+                ).update(
+                    establishment_id=establishment_id,
+                    owner_id=owners.get(establishment_id),
+                )
+        last_id = batch[-1][0]
+
+    report["elapsed"] = round(monotonic() - started, 2)
+    return report
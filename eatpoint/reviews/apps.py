@@ -1,6 +1,12 @@
+# fmt: off
 from django.apps import AppConfig
 
 
 class ReviewsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "reviews"
+
+    def ready(self):
+        """Слушатель сигнала"""
+        import reviews.signals
+# fmt: on
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from reviews.services import reconcile_ratings
+
+
+class Command(BaseCommand):
+    help = "Сверяет рейтинг и число отзывов заведений с отзывами"
+
+    def handle(self, *args, **options):
+        report = reconcile_ratings()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Рейтинг сверен: заведений {report['establishments']}, "
+                f"исправлено {report['fixed']}"
+            )
+        )
@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from django.core.validators import MaxValueValidator, MinValueValidator
 
 from establishments.models import Establishment
@@ -45,6 +45,16 @@ class Review(models.Model):
     def __str__(self):
         return self.text
 
+    @transaction.atomic
+    def save(self, *args, **kwargs):
+        """Отзыв и рейтинг заведения (сигнал) сохраняются вместе"""
+        super().save(*args, **kwargs)
+
+    @transaction.atomic
+    def delete(self, *args, **kwargs):
+        """Отзыв удаляется вместе с его оценкой в рейтинге заведения"""
+        return super().delete(*args, **kwargs)
+
 
 class OwnerResponse(models.Model):
     """Модель для ответа владельца на отзыв о заведении."""
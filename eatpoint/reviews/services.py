@@ -0,0 +1,77 @@
+from django.db.models import Case, Count, F, FloatField, Sum, Value, When
+from django.db.models.functions import Cast
+
+from core.constants import RATING_BATCH_SIZE
+from establishments.models import Establishment
+from reviews.models import Review
+
+
+def apply_rating(establishment_id: int, score: int, count: int) -> None:
+    """
+    Изменяет сумму оценок заведения на score и число отзывов на count.
+
+    Сумма, число отзывов и средняя оценка меняются одним UPDATE
+    с выражениями F(), поэтому параллельные отзывы не теряются.
+    Вызывается из сигналов внутри транзакции сохранения отзыва.
+    """
+    if not score and not count:
+        return
+    rating_sum = F("rating_sum") + score
+    review_count = F("review_count") + count
+    Establishment.objects.filter(id=establishment_id).update(
+        rating_sum=rating_sum,
+        review_count=review_count,
+        rating=Case(
+            When(
+                review_count__gt=-count,
+                then=Cast(rating_sum, FloatField()) / review_count,
+            ),
+            default=Value(0.0),
+            output_field=FloatField(),
+        ),
+    )
+
+
+def establishment_rating(rating_sum: int, review_count: int) -> float:
+    """Средняя оценка по сумме оценок и числу отзывов."""
+    return rating_sum / review_count if review_count else 0
+
+
+def reconcile_ratings() -> dict:
+    """
+    Сверка рейтинга заведений с отзывами.
+
+    Сумма оценок и число отзывов пересчитываются одним запросом,
+    перезаписываются только разошедшиеся заведения.
+    Возвращает количество проверенных и исправленных заведений.
+    """
+    fresh = {
+        row["establishment_id"]: (row["total"], row["count"])
+        for row in Review.objects.values("establishment_id")
+        .annotate(total=Sum("score"), count=Count("id"))
+        .order_by()
+    }
+    checked, stale = 0, []
+    establishments = Establishment.objects.only(
+        "id", "rating_sum", "review_count", "rating"
+    ).order_by("id")
+    for establishment in establishments.iterator(chunk_size=RATING_BATCH_SIZE):
+        checked += 1
+        rating_sum, review_count = fresh.get(establishment.id, (0, 0))
+        rating = establishment_rating(rating_sum, review_count)
+        if (
+            establishment.rating_sum,
+            establishment.review_count,
+            establishment.rating,
+        ) == (rating_sum, review_count, rating):
+            continue
+        establishment.rating_sum = rating_sum
+        establishment.review_count = review_count
+        establishment.rating = rating
+        stale.append(establishment)
+    Establishment.objects.bulk_update(
+        stale,
+        ["rating_sum", "review_count", "rating"],
+        batch_size=RATING_BATCH_SIZE,
+    )
+    return {"establishments": checked, "fixed": len(stale)}
@@ -0,0 +1,40 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from reviews.models import Review
+from reviews.services import apply_rating
+
+
+@receiver(pre_save, sender=Review)
+def remember_review_score(sender, instance, raw=False, **kwargs):
+    """Запоминает заведение и оценку отзыва до сохранения"""
+    if raw or instance.pk is None:
+        return
+    instance._rating_before = (
+        Review.objects.filter(pk=instance.pk)
+        .values_list("establishment_id", "score")
+        .first()
+    )
+
+
+@receiver(post_save, sender=Review)
+def update_rating(sender, instance, created, raw=False, **kwargs):
+    """Обновляет рейтинг заведения при создании и изменении отзыва"""
+    if raw:
+        return
+    before = getattr(instance, "_rating_before", None)
+    if created or before is None:
+        apply_rating(instance.establishment_id, instance.score, 1)
+        return
+    establishment_id, score = before
+    if establishment_id != instance.establishment_id:
+        apply_rating(establishment_id, -score, -1)
+        apply_rating(instance.establishment_id, instance.score, 1)
+        return
+    apply_rating(instance.establishment_id, instance.score - score, 0)
+
+
+@receiver(post_delete, sender=Review)
+def remove_rating(sender, instance, **kwargs):
+    """Убирает оценку удаленного отзыва из рейтинга заведения"""
+    apply_rating(instance.establishment_id, -instance.score, -1)